@@ -0,0 +1,362 @@
+#!/usr/bin/python3
+import concurrent.futures
+import numpy as np
+import simpy
+import random
+import sys
+from . import netsimutils
+from . import autoscaling
+from . import collectors
+from . import fastsim
+from . import plotting
+from . import rates
+from . import runcontrol
+from . import simulator
+
+
+# **********************************************************************************************************************
+# Constants
+# **********************************************************************************************************************
+
+RANDOM_SEED = 45
+INTER_ARRIVAL = 2
+SERVICE_TIME = 9
+NUM_MACHINES = 4
+QUEUE_SIZE = 50
+
+SIM_TIME = 10000
+
+# "simpy" runs one process per packet, "fast" uses the engines in fastsim
+ENGINE = "simpy"
+# run each of the n independent queues in its own worker process
+PARALLEL_QUEUES = False
+# n_services: stop as soon as the mean response time is known within this relative precision (SIM_TIME is then the
+# longest run), after removing the warm-up from re_times; None runs until SIM_TIME
+PRECISION = None
+# autoscaled: the arrival rate goes around 1/INTER_ARRIVAL in a cycle of DAY time units, peaking DIURNAL_AMPLITUDE
+# above it, and the pool is resized every SCALE_EVERY time units to keep 0.5 to 2 packets in the system per server,
+# between 1 and MAX_MACHINES servers; a new server takes BOOT_TIME to come up
+DAY = 10000
+DIURNAL_AMPLITUDE = 0.8
+SCALE_EVERY = 100
+BOOT_TIME = 0
+MAX_MACHINES = 12
+
+
+def independent_queue(engine, arrival_time, s_time, queue_size, sim_time, seed_seq):
+    """One queue of n_independent_queues, with its own random stream; runs in a worker process"""
+    if engine == "fast":
+        return fastsim.mm1k(arrival_time, s_time, queue_size, sim_time, np.random.default_rng(seed_seq))
+
+    rand = random.Random(int(seed_seq.generate_state(1, np.uint64)[0]))
+    env = simpy.Environment()
+    packet_arrival = netsimutils.PacketArrival(env, arrival_time, rand=rand)
+    server_farm = netsimutils.Service(env, 1, s_time, queue_size, sim_time, rand=rand)
+    env.process(packet_arrival.arrival_process(server_farm))
+    env.run(sim_time)
+    # the environment and the Resource can't be sent back to the parent process
+    packet_arrival.env = server_farm.environment = server_farm.servers = None
+    packet_arrival.rand = server_farm.rand = None
+    return packet_arrival, server_farm
+
+
+# **********************************************************************************************************************
+# Simulation - each run_* function sets up and performs a scenario with the constants of a simulator.Config (the ones
+# above if None), and returns its (arrivals, servers, runcontrol.Control of a run to PRECISION or None). It draws from
+# the RANDOM of the Config, or from a random.Random(RANDOM_SEED) of its own: never from the random module.
+# **********************************************************************************************************************
+def config(**settings):
+    """The constants of this module as a simulator.Config, overridden by settings"""
+    return simulator.Config.from_module(sys.modules[__name__]).replace(**settings)
+
+
+def run_n_independent_queues(c=None):
+    c = simulator.seeded(c if c is not None else config())
+    servers = []
+    arrivals = []
+    if c.PARALLEL_QUEUES:
+        seeds = np.random.SeedSequence(c.RANDOM_SEED).spawn(c.NUM_MACHINES)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=c.NUM_MACHINES) as pool:
+            jobs = [pool.submit(independent_queue, c.ENGINE, c.NUM_MACHINES*c.INTER_ARRIVAL, c.SERVICE_TIME,
+                                c.QUEUE_SIZE, c.SIM_TIME, seed) for seed in seeds]
+            for job in jobs:
+                packet_arrival, server_farm = job.result()
+                arrivals.append(packet_arrival)
+                servers.append(server_farm)
+    else:
+        rng = np.random.default_rng(c.RANDOM_SEED)
+        for _ in range(c.NUM_MACHINES):
+            if c.ENGINE == "fast":
+                packet_arrival, server_farm = fastsim.mm1k(c.NUM_MACHINES*c.INTER_ARRIVAL, c.SERVICE_TIME,
+                                                           c.QUEUE_SIZE, c.SIM_TIME, rng)
+                arrivals.append(packet_arrival)
+                servers.append(server_farm)
+                continue
+
+            env = simpy.Environment()
+            packet_arrival = netsimutils.PacketArrival(env, c.NUM_MACHINES*c.INTER_ARRIVAL, rand=c.RANDOM)
+            server_farm = netsimutils.Service(env, 1, c.SERVICE_TIME, c.QUEUE_SIZE, c.SIM_TIME, rand=c.RANDOM)
+            arrivals.append(packet_arrival)
+            servers.append(server_farm)
+
+            # start the arrival process
+            env.process(packet_arrival.arrival_process(server_farm))
+
+            # simulate until SIM_TIME
+            env.run(c.SIM_TIME)
+    return arrivals, servers, None
+
+
+def run_n_services(c=None):
+    c = simulator.seeded(c if c is not None else config())
+    if c.ENGINE == "fast":
+        env = fastsim.EventKernel()
+        packet_arrival = fastsim.HeapArrival(env, c.INTER_ARRIVAL, rand=c.RANDOM)
+        server_farm = fastsim.HeapService(env, c.NUM_MACHINES, c.SERVICE_TIME, c.QUEUE_SIZE, c.SIM_TIME, rand=c.RANDOM)
+        packet_arrival.start(server_farm)
+    else:
+        env = simpy.Environment()
+
+        # car arrival
+        packet_arrival = netsimutils.PacketArrival(env, c.INTER_ARRIVAL, rand=c.RANDOM)
+
+        # carwash
+        server_farm = netsimutils.Service(env, c.NUM_MACHINES, c.SERVICE_TIME, c.QUEUE_SIZE, c.SIM_TIME, rand=c.RANDOM)
+
+        # start the arrival process
+        env.process(packet_arrival.arrival_process(server_farm))
+
+    # simulate until SIM_TIME, or to PRECISION
+    control = None
+    if c.PRECISION:
+        control = runcontrol.run(env, [server_farm], c.SIM_TIME, c.PRECISION)
+    else:
+        env.run(c.SIM_TIME)
+    return [packet_arrival], [server_farm], control
+
+
+def run_fast_service(c=None):
+    c = simulator.seeded(c if c is not None else config())
+    if c.ENGINE == "fast":
+        packet_arrival, server_farm = fastsim.mm1k(c.INTER_ARRIVAL, c.SERVICE_TIME/c.NUM_MACHINES, c.QUEUE_SIZE,
+                                                   c.SIM_TIME, np.random.default_rng(c.RANDOM_SEED))
+    else:
+        env = simpy.Environment()
+
+        # car arrival
+        packet_arrival = netsimutils.PacketArrival(env, c.INTER_ARRIVAL, rand=c.RANDOM)
+
+        # carwash
+        server_farm = netsimutils.Service(env, 1, c.SERVICE_TIME/c.NUM_MACHINES, c.QUEUE_SIZE, c.SIM_TIME,
+                                          rand=c.RANDOM)
+
+        # start the arrival process
+        env.process(packet_arrival.arrival_process(server_farm))
+
+        # simulate until SIM_TIME
+        env.run(c.SIM_TIME)
+    return [packet_arrival], [server_farm], None
+
+
+def run_autoscaled(c=None):
+    c = simulator.seeded(c if c is not None else config())
+    rate = rates.Diurnal(1.0/c.INTER_ARRIVAL, c.DIURNAL_AMPLITUDE, c.DAY)
+    rng = np.random.default_rng(c.RANDOM_SEED)
+    if c.ENGINE == "fast":
+        env = fastsim.EventKernel()
+        packet_arrival = fastsim.HeapArrival(env, c.INTER_ARRIVAL, rates.inter_arrivals(rate, rng))
+        server_farm = autoscaling.HeapPool(env, c.NUM_MACHINES, c.SERVICE_TIME, c.QUEUE_SIZE, c.SIM_TIME,
+                                           rand=c.RANDOM)
+        packet_arrival.start(server_farm)
+    else:
+        env = simpy.Environment()
+        packet_arrival = netsimutils.NHPPArrival(env, rate, rng=rng)
+        server_farm = netsimutils.ScalableService(env, c.NUM_MACHINES, c.SERVICE_TIME, c.QUEUE_SIZE, c.SIM_TIME,
+                                                  rand=c.RANDOM)
+        env.process(packet_arrival.arrival_process(server_farm))
+
+    scaler = autoscaling.Autoscaler(env, server_farm, autoscaling.QueueLength(2.0, 0.5), c.SCALE_EVERY, c.BOOT_TIME,
+                                    max_servers=c.MAX_MACHINES)
+    scaler.start()
+    env.run(c.SIM_TIME)
+    return [packet_arrival], [server_farm], None
+
+
+SCENARIOS = {
+    "n_services": run_n_services,
+    "n_independent_queues": run_n_independent_queues,
+    "fast_service": run_fast_service,
+    "autoscaled": run_autoscaled,
+}
+
+
+# **********************************************************************************************************************
+# Reporting - print the results, and plot them only if asked (matplotlib is imported on demand)
+# **********************************************************************************************************************
+def n_independent_queues(plot=True, c=None):
+    c = c if c is not None else config()
+    arrivals, servers, _ = run_n_independent_queues(c)
+    sketches = [collectors.sketch(server_farm.re_times) for server_farm in servers]
+    for i, s in enumerate(sketches):
+        print("mean response time = " + repr(s.mean) + " for queue n." + repr(i))
+        print("response time " + collectors.percentiles_text(s) + " for queue n." + repr(i))
+    # every packet, whatever its queue: the per-queue sketches add up
+    total = collectors.merged(sketches)
+    print("mean response time = " + repr(total.mean))
+    print("response time " + collectors.percentiles_text(total))
+
+    supertot = 0
+    superlost = 0
+    super_ia_times = []
+    for i, packet_arrival in enumerate(arrivals):
+        tot = len(packet_arrival.ia_times)
+        supertot += tot
+        superlost += servers[i].lost
+        super_ia_times.append(packet_arrival.ia_times)
+        print(repr(tot) + " total packets for queue n." + repr(i))
+        print(repr(servers[i].lost) + " packets lost for queue n." + repr(i) +
+              "(" + repr(servers[i].lost/tot * 100) + "%)")    
+        # # plot
+        # plt.subplot(311)
+        # plt.plot(packet_arrival.ia_times)
+        # plt.xlabel("Sample")
+        # plt.ylabel("Inter-arrival")
+        #
+        # plt.subplot(312)
+        # plt.hist(packet_arrival.ia_times, bins=100, normed=True)
+        # plt.xlabel("Time")
+        # plt.ylabel("Density")
+        #
+        # plt.subplot(313)
+        # plt.hist(packet_arrival.ia_times, bins=100, cumulative=True, normed=True)
+        # plt.xlabel("Time")
+        # plt.ylabel("P(Arrival time <= x)")
+        #
+        # plt.suptitle("server " + repr(i))
+        # plt.subplots_adjust(hspace=0.6)
+        # plt.show()
+
+    super_dynamic_QS = []
+    super_lost_s = []
+    for i in range(len(servers)):
+        super_dynamic_QS.append(servers[i].dynamic_QS)
+        super_lost_s.append(servers[i].lost_s)
+        
+    print(repr(supertot) + " total packets")
+    print(repr(superlost) + " packets lost (" + repr(superlost/supertot * 100) + "%)")    
+
+    if plot:
+        plot_n_independent_queues(super_ia_times, super_dynamic_QS, super_lost_s, c.NUM_MACHINES*c.INTER_ARRIVAL)
+
+
+def plot_n_independent_queues(super_ia_times, super_dynamic_QS, super_lost_s, period):
+    # period: mean inter-arrival time of each queue
+    import matplotlib.pyplot as plt
+
+    plotting.server_grid("Inter-arrival", super_ia_times, lambda ax, i, ia: plotting.draw_trace(ax, ia))
+    plotting.server_grid("Inter-arrival density", super_ia_times, lambda ax, i, ia: plotting.draw_pdf(ax, ia))
+    plotting.server_grid("P(Arrival time <= x)", super_ia_times, lambda ax, i, ia: plotting.draw_cdf(ax, ia))
+    plt.show()
+
+    # queue size is sampled at each arrival: scale the samples to (approximate) time
+    plotting.server_grid("Queue Size", super_dynamic_QS,
+                         lambda ax, i, qs: plotting.draw_trace(ax, qs, period))
+    plotting.server_grid("Losses per time unit", super_lost_s, lambda ax, i, lost_s: plotting.draw_rate(ax, lost_s))
+    plt.show()
+
+
+def report_single(arrivals, servers, control=None):
+    packet_arrival, server_farm = arrivals[0], servers[0]
+    if control is not None:
+        print(control)
+
+    #compute the average and the tail
+    s = collectors.sketch(server_farm.re_times)
+    print("mean response time = " + repr(s.mean))
+    print("response time " + collectors.percentiles_text(s))
+
+    tot = len(packet_arrival.ia_times)
+    print(repr(tot) + " total packets")
+    print(repr(server_farm.lost) + " packets lost (" + repr(server_farm.lost/tot * 100) + "%)")
+
+
+def n_services(plot=True, c=None):
+    arrivals, servers, control = run_n_services(c)
+    report_single(arrivals, servers, control)
+    if plot:
+        plot_single(arrivals[0], servers[0], 'N Services')
+
+
+def fast_service(plot=True, c=None):
+    arrivals, servers, control = run_fast_service(c)
+    report_single(arrivals, servers, control)
+    if plot:
+        plot_single(arrivals[0], servers[0], 'Fast Service')
+
+
+def autoscaled(plot=True, c=None):
+    arrivals, servers, control = run_autoscaled(c)
+    report_single(arrivals, servers, control)
+    print("mean servers = " + repr(servers[0].capacity.mean()) + " (at most " + repr(servers[0].capacity.max) + ")")
+    if plot:
+        plot_single(arrivals[0], servers[0], 'Autoscaled Services')
+
+
+def plot_single(packet_arrival, server_farm, title):
+    import matplotlib.pyplot as plt
+
+    ################
+    # PLOT SECTION #
+    ################
+
+    fig, (series, pdf, cdf) = plt.subplots(3, 1)
+    plotting.draw_trace(series, packet_arrival.ia_times)
+    series.set_xlabel("Sample")
+    series.set_ylabel("Inter-arrival")
+    plotting.draw_pdf(pdf, packet_arrival.ia_times)
+    plotting.draw_cdf(cdf, packet_arrival.ia_times)
+
+    plt.subplots_adjust(hspace=0.6)
+    plt.suptitle(title)
+    plt.show()
+
+    # PLOT LOSSES
+
+    fig, (qs, lost) = plt.subplots(2, 1)
+    plotting.draw_trace(qs, server_farm.dynamic_QS, packet_arrival.arrival_time)
+    qs.set_ylabel("Packets in queue")
+    qs.set_title("Queue Size")
+
+    plotting.draw_rate(lost, server_farm.lost_s)
+    lost.set_title("Losses")
+    lost.set_ylabel("Packets lost per time unit")
+    lost.set_xlabel("Time")
+
+    plt.subplots_adjust(hspace=0.6)
+    plt.suptitle(title)
+    plt.show()
+
+
+# **********************************************************************************************************************
+# the "main" of the simulation
+# **********************************************************************************************************************
+def main():
+    # one random stream for the whole session, as the scenarios ran one after the other
+    c = config(RANDOM=random.Random(RANDOM_SEED))
+
+    print()
+    print("M/M/n")
+    n_services(c=c)
+    print()
+    print("n x M/M/1")
+    n_independent_queues(c=c)
+    print()
+    print("M/M/1 high speed")
+    fast_service(c=c)
+    print()
+    print("M(t)/M/n autoscaled")
+    autoscaled(c=c)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+"""Discrete-event simulation of queueing systems: M/M/1, M/M/c/K, networks of stations, scheduling and autoscaling.
+
+The scenarios are run by queue_sim.simulator (or python -m queue_sim.batch); the other modules are imported on
+demand, so that importing the package loads neither SimPy nor matplotlib.
+"""
+
+__version__ = "0.1.0"
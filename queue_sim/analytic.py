@@ -0,0 +1,150 @@
+import math
+from . import replications
+
+# **********************************************************************************************************************
+# Analytic solutions - steady state of M/M/1/K and M/M/c/K, simulation only where there is no closed form
+# **********************************************************************************************************************
+#
+# Parameters are the ones of MM1.py and mixing_services.py: INTER_ARRIVAL and SERVICE_TIME are means, NUM_MACHINES
+# the number of servers and QUEUE_SIZE the most packets in the system (waiting or in service), as Service.qsize_limit.
+# Times of a Solution are in microseconds and rates per microsecond: unit is the length of the time unit of the
+# parameters in microseconds (1 if INTER_ARRIVAL and SERVICE_TIME are themselves in microseconds).
+
+# microseconds in one time unit of the scenario constants
+UNIT = 1.0
+
+
+class Solution(object):
+    """Steady-state figures of a scenario.
+
+    blocking is the probability that an arrival is lost, throughput the rate
+    of admitted packets; mean_in_system, mean_queue, response_time and
+    waiting_time are L, Lq, W and Wq, in microseconds (NaN if no packet is
+    ever admitted). exact is False when the figures come
+    from simulation, and then half_width holds the confidence interval of
+    response_time and blocking.
+    """
+    __slots__ = ('arrival_rate', 'blocking', 'throughput', 'mean_in_system', 'mean_queue', 'response_time',
+                 'waiting_time', 'exact', 'half_width')
+
+    def __init__(self, arrival_rate, blocking, throughput, mean_in_system, mean_queue, response_time, waiting_time,
+                 exact=True, half_width=None):
+        self.arrival_rate = arrival_rate
+        self.blocking = blocking
+        self.throughput = throughput
+        self.mean_in_system = mean_in_system
+        self.mean_queue = mean_queue
+        self.response_time = response_time
+        self.waiting_time = waiting_time
+        self.exact = exact
+        self.half_width = half_width
+
+    def __repr__(self):
+        return "%s(blocking=%g, mean_in_system=%g, response_time=%g us)" % (
+            "Solution" if self.exact else "Simulated", self.blocking, self.mean_in_system, self.response_time)
+
+
+def _per_packet(total, throughput):
+    # Little's law; with no packet admitted there is no time to average
+    return total / throughput if throughput else float('nan')
+
+
+def mmck(arrival_time, s_time, n_servers, queue_size, unit=UNIT):
+    """M/M/c/K: Poisson arrivals every arrival_time, n_servers exponential servers, queue_size places in all (none
+    admits no packet: every arrival is lost)"""
+    if queue_size < 0 or n_servers < 1:
+        raise ValueError("M/M/c/K needs at least one server and no negative queue size")
+    lam = 1.0 / (arrival_time * unit)
+    a = s_time / arrival_time
+    c = min(n_servers, queue_size)
+    # log of the unnormalized p_n, for n = 0..K
+    log_terms = [0.0]
+    for n in range(1, queue_size + 1):
+        log_terms.append(log_terms[-1] + math.log(a / min(n, c)))
+    top = max(log_terms)
+    weights = [math.exp(t - top) for t in log_terms]
+    total = sum(weights)
+    p = [w / total for w in weights]
+
+    blocking = p[queue_size]
+    throughput = lam * (1.0 - blocking)
+    mean_in_system = sum(n * pn for n, pn in enumerate(p))
+    mean_queue = sum((n - c) * p[n] for n in range(c + 1, queue_size + 1))
+    return Solution(lam, blocking, throughput, mean_in_system, mean_queue,
+                    _per_packet(mean_in_system, throughput), _per_packet(mean_queue, throughput))
+
+
+def mm1k(arrival_time, s_time, queue_size, unit=UNIT):
+    return mmck(arrival_time, s_time, 1, queue_size, unit)
+
+
+def combine(solutions):
+    """Aggregate of independent stations, each packet counted where it arrived"""
+    lam = sum(s.arrival_rate for s in solutions)
+    throughput = sum(s.throughput for s in solutions)
+    mean_in_system = sum(s.mean_in_system for s in solutions)
+    mean_queue = sum(s.mean_queue for s in solutions)
+    return Solution(lam, 1.0 - throughput / lam, throughput, mean_in_system, mean_queue,
+                    _per_packet(mean_in_system, throughput), _per_packet(mean_queue, throughput))
+
+
+# **********************************************************************************************************************
+# Scenarios
+# **********************************************************************************************************************
+def n_services(p, unit=UNIT):
+    return mmck(p["INTER_ARRIVAL"], p["SERVICE_TIME"], p["NUM_MACHINES"], p["QUEUE_SIZE"], unit)
+
+
+def fast_service(p, unit=UNIT):
+    return mm1k(p["INTER_ARRIVAL"], p["SERVICE_TIME"] / p["NUM_MACHINES"], p["QUEUE_SIZE"], unit)
+
+
+def n_independent_queues(p, unit=UNIT):
+    return combine([mm1k(p["NUM_MACHINES"] * p["INTER_ARRIVAL"], p["SERVICE_TIME"], p["QUEUE_SIZE"], unit)]
+                   * p["NUM_MACHINES"])
+
+
+def mixed_queues(p, unit=UNIT):
+    fast = mm1k(p["INTER_ARRIVAL"] * 2, p["SERVICE_TIME"] / p["NUM_MACHINES"], p["QUEUE_SIZE"], unit)
+    slow = mm1k(p["INTER_ARRIVAL"] * 2 * p["NUM_MACHINES"], p["SERVICE_TIME"], p["QUEUE_SIZE"], unit)
+    return combine([fast] + [slow] * p["NUM_MACHINES"])
+
+
+# every closed form has a scenario of the same name in replications.SCENARIOS, for validate()
+CLOSED_FORMS = {
+    "n_services": n_services,
+    "fast_service": fast_service,
+    "n_independent_queues": n_independent_queues,
+    "mixed_queues": mixed_queues,
+}
+
+
+def simulate(scenario, params, n=10, seed=0, workers=None, unit=UNIT):
+    """Solution estimated with n replications (see replications)"""
+    r = replications.replicate(scenario, params, n, seed, workers)
+    lam = 1.0 / (params["INTER_ARRIVAL"] * unit)
+    throughput = lam * (1.0 - r.loss_rate.mean)
+    response_time = r.response_time.mean * unit
+    return Solution(lam, r.loss_rate.mean, throughput, throughput * response_time, float('nan'),
+                    response_time, float('nan'), exact=False,
+                    half_width={"response_time": r.response_time.half_width * unit,
+                                "blocking": r.loss_rate.half_width})
+
+
+def solve(scenario, params, n=10, seed=0, workers=None, unit=UNIT):
+    """Closed form of scenario if there is one, otherwise n replications of the simulator"""
+    if scenario in CLOSED_FORMS:
+        return CLOSED_FORMS[scenario](params, unit)
+    return simulate(scenario, params, n, seed, workers, unit)
+
+
+def validate(scenario, params, n=10, seed=0, workers=None):
+    """Compares simulator and closed form: returns {figure: (exact, simulated, half width, within CI)}"""
+    exact = CLOSED_FORMS[scenario](params)
+    sim = simulate(scenario, params, n, seed, workers)
+    report = {}
+    for name in ("response_time", "blocking"):
+        e, s, h = getattr(exact, name), getattr(sim, name), sim.half_width[name]
+        # replications that all agree (e.g. no loss in any) have a zero half width: tell rounding from a miss
+        report[name] = (e, s, h, abs(e - s) <= h or math.isclose(e, s, abs_tol=1e-9))
+    return report
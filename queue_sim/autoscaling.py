@@ -0,0 +1,188 @@
+import collections
+import functools
+import math
+from . import collectors
+from . import fastsim
+from . import rates
+
+# **********************************************************************************************************************
+# Autoscaling - server pools that grow and shrink while the simulation runs, under a pluggable policy
+# **********************************************************************************************************************
+#
+#   server_farm = autoscaling.HeapPool(env, NUM_MACHINES, SERVICE_TIME, QUEUE_SIZE, SIM_TIME)   # or ScalableService
+#   scaler = autoscaling.Autoscaler(env, server_farm, autoscaling.QueueLength(2.0, 0.5), every=100, boot=30)
+#   scaler.start()
+#
+# Every `every` time units the Autoscaler shows the policy a Window of what happened since the last check, and the
+# policy answers how many servers it wants. New servers come up after `boot` time units; removed servers finish the
+# packet they are serving before they leave, nothing is preempted. A policy is any callable taking a Window and
+# returning a number of servers: QueueLength and LossRate react to the load, Schedule provisions by time of day.
+
+# what a policy sees: the time, the servers up or booting, the packets in the system, and the arrivals and losses
+# since the last check
+Window = collections.namedtuple("Window", "now servers qsize arrived lost")
+
+
+def loss_rate(window):
+    return window.lost / window.arrived if window.arrived else 0.0
+
+
+class QueueLength(object):
+    """Adds step servers when there are more than high packets in the system per server, removes step below low
+
+    """
+    __slots__ = ('high', 'low', 'step')
+
+    def __init__(self, high, low, step=1):
+        self.high = high
+        self.low = low
+        self.step = step
+
+    def __call__(self, window):
+        per_server = window.qsize / float(window.servers) if window.servers else math.inf
+        if per_server > self.high:
+            return window.servers + self.step
+        if per_server < self.low:
+            return window.servers - self.step
+        return window.servers
+
+
+class LossRate(object):
+    """Adds step servers while the loss rate is above target, removes step while the packets in the system
+    would still all be in service with step servers fewer and nothing is lost
+
+    """
+    __slots__ = ('target', 'step')
+
+    def __init__(self, target, step=1):
+        self.target = target
+        self.step = step
+
+    def __call__(self, window):
+        if loss_rate(window) > self.target:
+            return window.servers + self.step
+        if not window.lost and window.qsize < window.servers - self.step:
+            return window.servers - self.step
+        return window.servers
+
+
+class Schedule(object):
+    """counts[i] servers from edges[i] until edges[i+1], repeating every period if given (see rates.Piecewise)
+
+    """
+    __slots__ = ('counts',)
+
+    def __init__(self, edges, counts, period=None):
+        self.counts = rates.Piecewise(edges, counts, period)
+
+    def __call__(self, window):
+        return int(self.counts(window.now))
+
+
+# **********************************************************************************************************************
+# Pools
+# **********************************************************************************************************************
+class HeapPool(fastsim.HeapService):
+    """HeapService whose n_servers can be changed with resize() while it runs
+
+    capacity is the time-weighted average of n_servers: capacity.mean()
+    times the time elapsed is the server time used, e.g. machine-hours.
+    """
+    __slots__ = ('capacity',)
+
+    def __init__(self, kernel, n_servers, s_time, QUEUE_SIZE, SIM_TIME=None, variates=None, rand=None):
+        super(HeapPool, self).__init__(kernel, n_servers, s_time, QUEUE_SIZE, SIM_TIME, variates, rand)
+        # a partial rather than a lambda, so that a pool can be checkpointed
+        self.capacity = collectors.TimeAverage(functools.partial(getattr, kernel, 'now'), n_servers)
+
+    def resize(self, n_servers):
+        self.n_servers = n_servers
+        self.capacity.append(n_servers)
+        while self.waiting and self.busy < self.n_servers:
+            self.busy += 1
+            self._start(self.waiting.popleft())
+
+    def _next(self):
+        # a server removed while it was busy leaves now instead of taking the next packet
+        if self.waiting and self.busy <= self.n_servers:
+            self._start(self.waiting.popleft())
+        else:
+            self.busy -= 1
+
+
+class Autoscaler(object):
+    """Resizes pool (a HeapPool or a netsimutils.ScalableService) every `every` time units, as policy wants.
+
+    env is the pool's fastsim.EventKernel or simpy.Environment. The number
+    of servers stays within [min_servers, max_servers]; every change of the
+    servers wanted is recorded in times and counts.
+    """
+    __slots__ = ('env', 'pool', 'policy', 'every', 'boot', 'min_servers', 'max_servers', 'booting', 'cancelled',
+                 'arrived', 'lost', 'times', 'counts')
+
+    def __init__(self, env, pool, policy, every, boot=0.0, min_servers=1, max_servers=None):
+        self.env = env
+        self.pool = pool
+        self.policy = policy
+        self.every = every
+        self.boot = boot
+        self.min_servers = min_servers
+        self.max_servers = max_servers if max_servers is not None else math.inf
+        # servers asked for and not up yet, and those of them no longer wanted
+        self.booting = 0
+        self.cancelled = 0
+        self.arrived = 0
+        self.lost = 0
+        self.times = collectors.times()
+        self.counts = collectors.counts()
+
+    def start(self):
+        self.times.append(self.env.now)
+        self.counts.append(self.pool.n_servers)
+        self._after(self.every, self._check, None)
+
+    def _after(self, delay, callback, arg):
+        if isinstance(self.env, fastsim.EventKernel):
+            self.env.schedule(self.env.now + delay, callback, arg)
+        else:
+            self.env.timeout(delay).callbacks.append(lambda _: callback(arg))
+
+    @property
+    def servers(self):
+        """Servers up or booting"""
+        return self.pool.n_servers + self.booting
+
+    def _check(self, _):
+        pool = self.pool
+        arrived = pool.arrived
+        window = Window(self.env.now, self.servers, pool.qsize, arrived - self.arrived, pool.lost - self.lost)
+        self.arrived = arrived
+        self.lost = pool.lost
+        want = int(min(max(self.policy(window), self.min_servers), self.max_servers))
+        if want != window.servers:
+            self.scale(want - window.servers)
+            self.times.append(self.env.now)
+            self.counts.append(want)
+        self._after(self.every, self._check, None)
+
+    def scale(self, k):
+        """Adds k servers (after the boot time), or removes -k"""
+        if k > 0 and self.boot:
+            self.booting += k
+            self._after(self.boot, self._up, k)
+        elif k > 0:
+            self.pool.resize(self.pool.n_servers + k)
+        else:
+            # servers still booting are given up first
+            cancel = min(-k, self.booting)
+            self.booting -= cancel
+            self.cancelled += cancel
+            if cancel < -k:
+                self.pool.resize(self.pool.n_servers + k + cancel)
+
+    def _up(self, k):
+        cancel = min(k, self.cancelled)
+        self.cancelled -= cancel
+        self.booting -= k - cancel
+        if cancel < k:
+            self.pool.resize(self.pool.n_servers + k - cancel)
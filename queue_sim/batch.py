@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+import argparse
+import ast
+import csv
+import json
+import sys
+from . import simulator
+
+# **********************************************************************************************************************
+# Headless batch mode - run one scenario without plots and write its results as JSON, CSV or Parquet
+# **********************************************************************************************************************
+#
+#   python -m queue_sim.batch n_services --engine fast --set SIM_TIME=100000 --format csv --output n_services.csv
+
+FORMATS = ("json", "csv", "parquet")
+
+# the constants --set may override: RANDOM is a random.Random, made from the seed
+SETTABLE = tuple(name for name in simulator.FIELDS if name != "RANDOM")
+
+
+def parse_value(text):
+    """The Python literal text stands for (100000, 0.5, None, False, "x"...), or text itself if it is none"""
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def run(scenario, engine=None, seed=None, settings=None):
+    """Runs scenario with the constants of its module overridden by settings, returns its records"""
+    settings = dict(settings or {})
+    if engine is not None:
+        settings["ENGINE"] = engine
+    if seed is not None:
+        settings["RANDOM_SEED"] = seed
+    return simulator.run(scenario, **settings).records()
+
+
+def write(records, fmt, output=None):
+    if fmt == "parquet":
+        if output is None:
+            raise SystemExit("parquet output needs --output")
+        try:
+            import pandas
+        except ImportError:
+            raise SystemExit("parquet output needs pandas and pyarrow")
+        pandas.DataFrame(records).to_parquet(output)
+        return
+    f = open(output, "w", newline="") if output else sys.stdout
+    try:
+        if fmt == "json":
+            json.dump(records, f, indent=1)
+            f.write("\n")
+        else:
+            writer = csv.DictWriter(f, fieldnames=list(records[0]))
+            writer.writeheader()
+            writer.writerows(records)
+    finally:
+        if output:
+            f.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a queueing scenario headless")
+    parser.add_argument("scenario", choices=simulator.scenarios())
+    parser.add_argument("--engine", choices=("simpy", "fast"))
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="override a constant of the scenario module, e.g. SIM_TIME=100000")
+    parser.add_argument("--format", choices=FORMATS, default="json")
+    parser.add_argument("--output", help="file to write, standard output if omitted")
+    args = parser.parse_args(argv)
+
+    settings = {}
+    for item in args.set:
+        name, _, value = item.partition("=")
+        if name not in SETTABLE:
+            parser.error("--set %s: no constant %s in a scenario config (one of %s)" % (item, name,
+                                                                                       ", ".join(SETTABLE)))
+        settings[name] = parse_value(value)
+    write(run(args.scenario, args.engine, args.seed, settings), args.format, args.output)
+
+
+if __name__ == '__main__':
+    main()
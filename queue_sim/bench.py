@@ -0,0 +1,223 @@
+#!/usr/bin/python3
+import argparse
+import concurrent.futures
+import json
+import multiprocessing
+import random
+import resource
+import sys
+import time
+import simpy
+from . import fastsim
+from . import netsimutils
+
+# **********************************************************************************************************************
+# Benchmarks - events/s, packets/s, peak RSS and wall time of the simulator, compared with a stored baseline
+# **********************************************************************************************************************
+#
+#   python -m queue_sim.bench --save                  # measure and store the baseline
+#   python -m queue_sim.bench --compare               # measure and compare, exit status 1 on a regression
+#   python -m queue_sim.bench --topology mixed --rho 0.99 --horizon 1000000
+#
+# Every case runs in a freshly spawned interpreter, so its peak RSS is its own and not the one of the cases before.
+
+BASELINE = "bench_baseline.json"
+
+# service time of every station, the arrival rate is set from the utilization
+SERVICE_TIME = 1.0
+NUM_MACHINES = 4
+QUEUE_SIZE = 50
+RANDOM_SEED = 1234
+
+TOPOLOGIES = ("mm1", "mmn", "n_mm1", "mixed")
+ENGINES = ("simpy", "fast")
+UTILIZATIONS = (0.5, 0.8, 0.95, 0.99)
+HORIZONS = (10000, 100000)
+
+# a case is a regression when it is slower (or bigger) than the baseline by more than this fraction
+TOLERANCE = 0.10
+
+# units of ru_maxrss in a megabyte: it is in kilobytes on Linux, bytes on macOS
+MAXRSS_PER_MB = 1024.0 ** (2 if sys.platform == "darwin" else 1)
+
+
+# **********************************************************************************************************************
+# Topologies - each one builds its stations on env, drawing from the random.Random rand, and returns the arrival
+# processes
+# **********************************************************************************************************************
+def _source(engine, env, arrival_time, server_farm, rand):
+    if engine == "fast":
+        packet_arrival = fastsim.HeapArrival(env, arrival_time, rand=rand)
+        packet_arrival.start(server_farm)
+    else:
+        packet_arrival = netsimutils.PacketArrival(env, arrival_time, rand=rand)
+        env.process(packet_arrival.arrival_process(server_farm))
+    return packet_arrival
+
+
+def _station(engine):
+    return fastsim.HeapService if engine == "fast" else netsimutils.Service
+
+
+def mm1(engine, env, rho, sim_time, rand):
+    server_farm = _station(engine)(env, 1, SERVICE_TIME, QUEUE_SIZE, sim_time, rand=rand)
+    return [_source(engine, env, SERVICE_TIME / rho, server_farm, rand)]
+
+
+def mmn(engine, env, rho, sim_time, rand):
+    server_farm = _station(engine)(env, NUM_MACHINES, SERVICE_TIME, QUEUE_SIZE, sim_time, rand=rand)
+    return [_source(engine, env, SERVICE_TIME / (NUM_MACHINES * rho), server_farm, rand)]
+
+
+def n_mm1(engine, env, rho, sim_time, rand):
+    arrivals = []
+    for i in range(NUM_MACHINES):
+        server_farm = _station(engine)(env, 1, SERVICE_TIME, QUEUE_SIZE, sim_time, rand=rand)
+        arrivals.append(_source(engine, env, SERVICE_TIME / rho, server_farm, rand))
+    return arrivals
+
+
+def mixed(engine, env, rho, sim_time, rand):
+    """One fast server and NUM_MACHINES slow ones fed by a single PacketArrivalMod, weighted by capacity"""
+    station = _station(engine)
+    servers = [station(env, 1, SERVICE_TIME / NUM_MACHINES, QUEUE_SIZE, sim_time, rand=rand)]
+    servers += [station(env, 1, SERVICE_TIME, QUEUE_SIZE, sim_time, rand=rand) for i in range(NUM_MACHINES)]
+    weights = [NUM_MACHINES] + [1] * NUM_MACHINES
+    # capacity is NUM_MACHINES/SERVICE_TIME for the fast server plus 1/SERVICE_TIME for each slow one
+    arrival_time = SERVICE_TIME / (2 * NUM_MACHINES * rho)
+    if engine == "fast":
+        p = fastsim.HeapArrivalMod(env, arrival_time, rand=rand)
+        p.start(servers, weights)
+    else:
+        p = netsimutils.PacketArrivalMod(env, arrival_time, rand=rand)
+        env.process(p.arrival_process(servers, weights))
+    return [p]
+
+
+TOPOLOGY = {
+    "mm1": mm1,
+    "mmn": mmn,
+    "n_mm1": n_mm1,
+    "mixed": mixed,
+}
+
+
+# **********************************************************************************************************************
+# Measuring
+# **********************************************************************************************************************
+def case_name(topology, engine, rho, horizon):
+    return "%s/%s/rho=%g/T=%d" % (topology, engine, rho, horizon)
+
+
+class CountingEnvironment(simpy.Environment):
+    """simpy.Environment counting the events it schedules, as EventKernel.scheduled"""
+    def __init__(self):
+        super(CountingEnvironment, self).__init__()
+        self.scheduled = 0
+
+    def schedule(self, event, priority=simpy.core.NORMAL, delay=0):
+        self.scheduled += 1
+        super(CountingEnvironment, self).schedule(event, priority, delay)
+
+
+def _packets(arrivals):
+    total = 0
+    for a in arrivals:
+        ia = a.ia_times
+        # PacketArrivalMod keeps one list of inter-arrivals per server
+        total += sum(len(x) for x in ia) if isinstance(ia, list) else len(ia)
+    return total
+
+
+def measure(topology, engine, rho, horizon):
+    """Runs one case in this process and returns its figures"""
+    env = fastsim.EventKernel() if engine == "fast" else CountingEnvironment()
+    arrivals = TOPOLOGY[topology](engine, env, rho, horizon, random.Random(RANDOM_SEED))
+    start = time.perf_counter()
+    env.run(horizon)
+    wall = time.perf_counter() - start
+    events = env.scheduled
+    packets = _packets(arrivals)
+    return {
+        "case": case_name(topology, engine, rho, horizon),
+        "wall_time": wall,
+        "events": events,
+        "packets": packets,
+        "events_per_s": events / wall,
+        "packets_per_s": packets / wall,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / MAXRSS_PER_MB,
+    }
+
+
+def run(cases, repeat=1):
+    """Measures every (topology, engine, rho, horizon) case in its own process, best wall time of repeat runs"""
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for case in cases:
+        best = None
+        for k in range(repeat):
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                r = pool.submit(measure, *case).result()
+            if best is None or r["wall_time"] < best["wall_time"]:
+                best = r
+        results.append(best)
+        print("%-36s %9.3f s %12.0f events/s %11.0f packets/s %8.1f MB" % (
+            best["case"], best["wall_time"], best["events_per_s"], best["packets_per_s"], best["peak_rss_mb"]),
+            file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Ratios of results to baseline; returns (rows, regressions) where a row is (case, figure, old, new, ratio)"""
+    old = dict((r["case"], r) for r in baseline)
+    rows = []
+    regressions = []
+    for r in results:
+        if r["case"] not in old:
+            continue
+        b = old[r["case"]]
+        for figure, worse_if_higher in (("events_per_s", False), ("packets_per_s", False), ("peak_rss_mb", True)):
+            ratio = r[figure] / b[figure] if b[figure] else float("nan")
+            row = (r["case"], figure, b[figure], r[figure], ratio)
+            rows.append(row)
+            if (ratio > 1 + tolerance) if worse_if_higher else (ratio < 1 - tolerance):
+                regressions.append(row)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulator")
+    parser.add_argument("--topology", action="append", choices=TOPOLOGIES)
+    parser.add_argument("--engine", action="append", choices=ENGINES)
+    parser.add_argument("--rho", action="append", type=float, help="utilization, default %s" % (UTILIZATIONS,))
+    parser.add_argument("--horizon", action="append", type=int, help="SIM_TIME, default %s" % (HORIZONS,))
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case, the fastest is kept")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="compare the results with the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    cases = [(t, e, rho, h) for t in args.topology or TOPOLOGIES for e in args.engine or ENGINES
+             for rho in args.rho or UTILIZATIONS for h in args.horizon or HORIZONS]
+    results = run(cases, args.repeat)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=1)
+    if args.compare:
+        with open(args.baseline) as f:
+            rows, regressions = compare(results, json.load(f), args.tolerance)
+        for case, figure, old, new, ratio in rows:
+            flag = "  REGRESSION" if (case, figure, old, new, ratio) in regressions else ""
+            print("%-36s %-14s %14.1f -> %14.1f  x%.3f%s" % (case, figure, old, new, ratio, flag))
+        if regressions:
+            return 1
+    elif not args.save:
+        json.dump(results, sys.stdout, indent=1)
+        sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
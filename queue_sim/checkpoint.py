@@ -0,0 +1,66 @@
+import os
+import pickle
+import random
+
+# **********************************************************************************************************************
+# Checkpoints - save a running simulation to disk and resume it, with the same results as a run never interrupted
+# **********************************************************************************************************************
+#
+#   env, (p, servers) = checkpoint.run(env, (p, servers), SIM_TIME, "mixed.ckpt", every=10000)
+#
+# A checkpoint is a pickle of the fastsim.EventKernel, its pending events and every object they reach (arrivals,
+# servers, routers, collectors, variates pools with their numpy generators, the random.Random they draw from), together
+# with the state of the random module, for the objects that draw from it. SimPy processes are generators and cannot be
+# pickled: a run to checkpoint uses the event-heap engine, which draws the same random numbers in the same order as
+# PacketArrival and Service.
+
+
+class _Pickler(pickle.Pickler):
+    # the random module is saved by state: references to its generator (random.expovariate, ...) stay references
+    def persistent_id(self, obj):
+        if obj is random._inst:
+            return "random"
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        if pid == "random":
+            return random._inst
+        raise pickle.UnpicklingError("unknown persistent id %r" % (pid,))
+
+
+def save(path, state):
+    """Writes state and the random module state to path, atomically: a crash leaves the previous checkpoint"""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        _Pickler(f, pickle.HIGHEST_PROTOCOL).dump((random.getstate(), state))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load(path):
+    """Returns the state saved in path and restores the random module as it was"""
+    with open(path, "rb") as f:
+        random_state, state = _Unpickler(f).load()
+    random.setstate(random_state)
+    return state
+
+
+def run(kernel, objects, until, path, every):
+    """Runs kernel until `until`, saving (kernel, objects) to path every `every` time units.
+
+    If path holds a checkpoint the run resumes from it, and the kernel and
+    objects passed are replaced by the saved ones. The checkpoint is removed
+    once the run is complete. Returns (kernel, objects).
+    """
+    if os.path.exists(path):
+        kernel, objects = load(path)
+    while kernel.now < until:
+        kernel.run(min(kernel.now + every, until))
+        if kernel.now < until:
+            save(path, (kernel, objects))
+    if os.path.exists(path):
+        os.remove(path)
+    return kernel, objects
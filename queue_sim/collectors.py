@@ -0,0 +1,492 @@
+import math
+from array import array
+import numpy as np
+
+# **********************************************************************************************************************
+# Statistics collectors - typed, contiguous buffers in place of lists of boxed floats and ints
+# **********************************************************************************************************************
+
+
+class Collector(array):
+    """Growable typed buffer for per-packet statistics.
+
+    It behaves like the lists it replaces (append, len, indexing, iteration)
+    but stores raw machine values: 8 bytes per float instead of about 32.
+    view() returns a NumPy array sharing the same memory; the buffer can't
+    grow while such a view is alive, so take views once the run is over.
+    """
+    __slots__ = ()
+
+    def view(self):
+        return np.frombuffer(self, dtype=self.typecode)
+
+
+def times(single=False):
+    """Collector for times (inter-arrival, response...); single precision, half the memory, for the ones that are
+    only plotted or counted"""
+    return Collector('f' if single else 'd')
+
+
+def counts(limit=None):
+    """Collector for counters, using the smallest unsigned type that holds limit"""
+    if limit is not None:
+        for typecode in 'BHI':
+            if limit < 1 << (8*array(typecode).itemsize):
+                return Collector(typecode)
+    return Collector('q')
+
+
+def as_array(samples):
+    """NumPy array over a collector (zero-copy), a NumPy array or a list"""
+    if isinstance(samples, Collector):
+        return samples.view()
+    return np.asarray(samples)
+
+
+# **********************************************************************************************************************
+# Time series - event counts per time bin, for arrived_s and lost_s
+# **********************************************************************************************************************
+
+# width of the bins of arrived_s and lost_s, in time units
+ARRIVED_BIN = 1
+LOST_BIN = 50
+# type of the bin counts: half the memory of int64, and far more events than a bin ever sees
+BIN_DTYPE = np.int32
+# bins kept by the ring buffers of the streaming mode
+STREAMING_BINS = 4096
+
+
+class TimeSeries(object):
+    """Number of events in bins of the given width, for any horizon.
+
+    The bins live in a NumPy array that doubles when an event falls past its
+    end; horizon, if known, only sizes the first allocation. With capacity,
+    the array is a ring instead: only the last capacity bins are kept and
+    memory stays bounded however long the run is. Indexing, len() and
+    np.asarray() see the retained bins, oldest first, so the series can be
+    plotted like the lists it replaces; downsample() shrinks it for plots.
+    """
+    __slots__ = ('width', 'capacity', 'bins', 'offset', 'end')
+
+    def __init__(self, width=1, horizon=None, capacity=None):
+        self.width = width
+        self.capacity = capacity
+        # bins [offset, end) are retained
+        self.offset = 0
+        self.end = 0
+        if capacity is not None:
+            self.bins = np.zeros(capacity, dtype=BIN_DTYPE)
+        else:
+            self.end = int(math.ceil(horizon / width)) if horizon else 0
+            self.bins = np.zeros(max(self.end, 64), dtype=BIN_DTYPE)
+
+    def add(self, t, k=1):
+        b = int(t / self.width)
+        if b >= self.end:
+            self._extend(b + 1)
+        if self.capacity is None:
+            self.bins[b] += k
+        elif b >= self.offset:
+            self.bins[b % self.capacity] += k
+
+    def add_many(self, times):
+        """Adds one event at each of times, in any order (a ring drops the ones older than its bins)"""
+        b = (np.asarray(times) / self.width).astype(np.int64)
+        if not len(b):
+            return
+        if self.capacity is not None:
+            for t in times:
+                self.add(t)
+            return
+        self._extend(int(b.max()) + 1)
+        counts = np.bincount(b)
+        self.bins[:len(counts)] += counts
+
+    def _extend(self, end):
+        if self.capacity is None:
+            if end > len(self.bins):
+                grown = np.zeros(max(end, 2*len(self.bins)), dtype=BIN_DTYPE)
+                grown[:len(self.bins)] = self.bins
+                self.bins = grown
+            self.end = max(self.end, end)
+            return
+        # the slots of the new bins held bins older than the ring: clear them
+        if end - self.end >= self.capacity:
+            self.bins[:] = 0
+        else:
+            for b in range(self.end, end):
+                self.bins[b % self.capacity] = 0
+        self.end = end
+        self.offset = max(self.offset, end - self.capacity)
+
+    def counts(self):
+        """Counts of the retained bins, oldest first"""
+        if self.capacity is None:
+            return self.bins[:self.end]
+        return np.take(self.bins, np.arange(self.offset, self.end), mode='wrap')
+
+    def downsample(self, points):
+        """(start times, counts) of at most points bins, each one the sum of consecutive bins"""
+        counts = self.counts()
+        factor = max(1, int(math.ceil(len(counts) / float(points))))
+        padded = np.zeros(int(math.ceil(len(counts) / float(factor))) * factor, dtype=np.int64)
+        padded[:len(counts)] = counts
+        merged = padded.reshape(-1, factor).sum(axis=1)
+        return (self.offset + np.arange(len(merged)) * factor) * self.width, merged
+
+    def __len__(self):
+        return self.end - self.offset
+
+    def __getitem__(self, i):
+        return self.counts()[i]
+
+    def __iter__(self):
+        return iter(self.counts())
+
+    def __array__(self, dtype=None, copy=None):
+        counts = self.counts()
+        return counts.astype(dtype) if dtype is not None else counts
+
+
+def series(width, SIM_TIME=None, streaming=False):
+    """TimeSeries sized for SIM_TIME, or a bounded ring in streaming mode"""
+    if streaming:
+        return TimeSeries(width, capacity=STREAMING_BINS)
+    return TimeSeries(width, SIM_TIME)
+
+
+# **********************************************************************************************************************
+# Online collectors - O(1) memory, for the streaming mode of Service and PacketArrival
+# **********************************************************************************************************************
+class Moments(object):
+    """Running count, mean and variance (Welford), plus min and max
+
+    """
+    __slots__ = ('n', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def __len__(self):
+        return self.n
+
+    def append(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    def merge(self, other):
+        """Adds the samples summarized by other (Chan et al. parallel update)"""
+        n = self.n + other.n
+        if n == 0:
+            return
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.mean += delta * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else float('nan')
+
+
+class P2Quantile(object):
+    """Estimate of the p-quantile with the P-square algorithm (Jain and Chlamtac, 1985)
+
+    Five markers are kept and moved with piecewise-parabolic interpolation,
+    whatever the number of samples.
+    """
+    __slots__ = ('p', 'q', 'n', 'want', 'dn')
+
+    def __init__(self, p):
+        self.p = p
+        self.q = []
+        self.n = [0, 1, 2, 3, 4]
+        self.want = [0.0, 2*p, 4*p, 2 + 2*p, 4.0]
+        self.dn = [0.0, p/2, p, (1 + p)/2, 1.0]
+
+    def __len__(self):
+        return self.n[4] + 1 if len(self.q) == 5 else len(self.q)
+
+    def append(self, x):
+        q = self.q
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+        n = self.n
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        want = self.want
+        for i in range(5):
+            want[i] += self.dn[i]
+        for i in (1, 2, 3):
+            d = want[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < qp < q[i + 1]:
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    def value(self):
+        q = self.q
+        if len(q) == 5:
+            return q[2]
+        if not q:
+            return float('nan')
+        return q[min(len(q) - 1, int(self.p * len(q)))]
+
+
+# percentiles reported for response times, relative error of the sketches that estimate them
+PERCENTILES = (0.5, 0.95, 0.99, 0.999)
+SKETCH_ACCURACY = 0.01
+
+
+class Sketch(object):
+    """Mergeable quantile sketch with relative error (DDSketch, Masson et al., 2019)
+
+    A positive sample x is counted in the bucket ceil(log_gamma(x)), with
+    gamma = (1 + a) / (1 - a): every quantile is then known within a
+    relative error a, whatever the number of samples. Buckets are counts,
+    so sketches of different servers, replications or processes add up
+    exactly; a thousand buckets or so cover microseconds to days at 1%.
+    Samples <= 0 are counted apart, as 0.
+    """
+    __slots__ = ('accuracy', 'gamma', 'log_gamma', 'buckets', 'zeros', 'count', 'sum', 'min', 'max')
+
+    def __init__(self, accuracy=SKETCH_ACCURACY):
+        self.accuracy = accuracy
+        self.gamma = (1.0 + accuracy) / (1.0 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def __len__(self):
+        return self.count
+
+    def append(self, x):
+        self.count += 1
+        self.sum += x
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        if x > 0:
+            i = int(math.ceil(math.log(x) / self.log_gamma))
+            self.buckets[i] = self.buckets.get(i, 0) + 1
+        else:
+            self.zeros += 1
+
+    def add_many(self, samples):
+        """Adds an array of samples at once"""
+        x = as_array(samples)
+        if not len(x):
+            return
+        self.count += len(x)
+        self.sum += float(x.sum())
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        positive = x[x > 0]
+        self.zeros += len(x) - len(positive)
+        index, counts = np.unique(np.ceil(np.log(positive) / self.log_gamma).astype(np.int64), return_counts=True)
+        buckets = self.buckets
+        for i, c in zip(index.tolist(), counts.tolist()):
+            buckets[i] = buckets.get(i, 0) + c
+
+    def merge(self, other):
+        """Adds the samples counted by other, a sketch with the same accuracy"""
+        if other.accuracy != self.accuracy:
+            raise ValueError("sketches of different accuracy can't be merged")
+        for i, c in other.buckets.items():
+            self.buckets[i] = self.buckets.get(i, 0) + c
+        self.zeros += other.zeros
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else float('nan')
+
+    def quantile(self, p):
+        if not self.count:
+            return float('nan')
+        rank = p * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if rank < seen:
+                # middle of the bucket (gamma^(i-1), gamma^i], clamped to the samples seen
+                return min(max(2.0 * self.gamma ** i / (self.gamma + 1.0), self.min), self.max)
+        return self.max
+
+    def percentiles(self, ps=PERCENTILES):
+        return [(p, self.quantile(p)) for p in ps]
+
+
+def sketch(samples, accuracy=SKETCH_ACCURACY):
+    """Sketch of a collector of samples (or the sketch an OnlineStats already keeps)"""
+    if isinstance(samples, Sketch):
+        return samples
+    if isinstance(samples, OnlineStats):
+        return samples.sketch
+    s = Sketch(accuracy)
+    s.add_many(samples)
+    return s
+
+
+def merged(sketches):
+    """One sketch adding up several (of servers, replications, ...)"""
+    total = None
+    for s in sketches:
+        if total is None:
+            total = Sketch(s.accuracy)
+        total.merge(s)
+    return total if total is not None else Sketch()
+
+
+def percentiles_text(s, ps=PERCENTILES):
+    """e.g. "p50 = 1.2 p95 = 3.4 p99 = 5.6 p99.9 = 7.8" """
+    return " ".join("p%s = %.6g" % (("%g" % (p * 100)), v) for p, v in s.percentiles(ps))
+
+
+def percentile_fields(s, name, ps=PERCENTILES):
+    """{"p50_<name>": ..., "p999_<name>": ...}: percentiles of sketch s as record fields"""
+    return dict(("p%s_%s" % (("%g" % (p * 100)).replace(".", ""), name), v) for p, v in s.percentiles(ps))
+
+
+class OnlineStats(Moments):
+    """Moments plus a quantile sketch, in place of a list of samples
+
+    quantiles lists quantiles also tracked with P-square, which are
+    returned by quantile() as long as nothing has been merged in.
+    """
+    __slots__ = ('quantiles', 'sketch')
+
+    def __init__(self, quantiles=(), accuracy=SKETCH_ACCURACY):
+        super(OnlineStats, self).__init__()
+        self.quantiles = [P2Quantile(p) for p in quantiles]
+        self.sketch = Sketch(accuracy)
+
+    def append(self, x):
+        Moments.append(self, x)
+        self.sketch.append(x)
+        for quantile in self.quantiles:
+            quantile.append(x)
+
+    def merge(self, other):
+        Moments.merge(self, other)
+        self.sketch.merge(other.sketch)
+        # P-square markers can't be merged
+        self.quantiles = []
+
+    def quantile(self, p):
+        for quantile in self.quantiles:
+            if quantile.p == p:
+                return quantile.value()
+        return self.sketch.quantile(p)
+
+
+class TimeAverage(object):
+    """Time-weighted average of a piecewise constant quantity, such as the queue length
+
+    append(value) records that the quantity becomes value at clock().
+    """
+    __slots__ = ('clock', 'start', 'last_t', 'last', 'area', 'n', 'max')
+
+    def __init__(self, clock, value=0):
+        self.clock = clock
+        self.start = self.last_t = clock()
+        self.last = value
+        self.area = 0.0
+        self.n = 0
+        self.max = value
+
+    def __len__(self):
+        return self.n
+
+    def append(self, value):
+        now = self.clock()
+        self.area += self.last * (now - self.last_t)
+        self.last_t = now
+        self.last = value
+        self.n += 1
+        if value > self.max:
+            self.max = value
+
+    def mean(self):
+        now = self.clock()
+        if now == self.start:
+            return float(self.last)
+        return (self.area + self.last * (now - self.last_t)) / (now - self.start)
+
+
+class Last(object):
+    """Keeps only the last appended value and the number of values
+
+    """
+    __slots__ = ('n', 'value')
+
+    def __init__(self):
+        self.n = 0
+        self.value = None
+
+    def __len__(self):
+        return self.n
+
+    def append(self, value):
+        self.n += 1
+        self.value = value
+
+
+def running_losses(lost_arrivals, arrived):
+    """Packets lost so far after each of arrived arrivals (the dynamic_LOSS of the servers), from the arrival numbers
+    of the lost ones (their lost_arrivals)"""
+    if isinstance(lost_arrivals, Last):
+        # streaming: only the count after the last arrival is known
+        last = Last()
+        last.n = arrived
+        last.value = lost_arrivals.n
+        return last
+    indicators = np.zeros(arrived, dtype=np.int64)
+    indicators[as_array(lost_arrivals)] = 1
+    return np.cumsum(indicators)
+
+
+def mean(samples):
+    """Mean of a collector, an online collector or a plain list of samples"""
+    if isinstance(samples, Moments):
+        return samples.mean
+    return float(sum(samples) / len(samples)) if len(samples) else float('nan')
@@ -0,0 +1,371 @@
+import collections
+import functools
+import heapq
+import random
+import numpy as np
+from . import collectors
+from . import routing
+from . import variates
+from . import traces
+
+# **********************************************************************************************************************
+# Fast engines - same statistics as PacketArrival/Service, without one SimPy process per packet
+# **********************************************************************************************************************
+
+# block sizes for the batched Lindley recursion
+MIN_BLOCK = 64
+MAX_BLOCK = 1 << 16
+# after a loss the buffer is likely to stay full for a while: go packet by packet
+SCALAR_RUN = 256
+
+
+def draw_arrivals(ia_variates, SIM_TIME):
+    """Pre-draws inter-arrival times from ia_variates until the horizon is passed.
+
+    Returns the absolute arrival times before SIM_TIME and the inter-arrival
+    times, including the last one that crosses the horizon (as PacketArrival does).
+    """
+    chunk = int(SIM_TIME / ia_variates.mean * 1.05) + 1024
+    t0 = 0.0
+    ia_parts = []
+    t_parts = []
+    while True:
+        ia = ia_variates.sample(chunk)
+        t = t0 + np.cumsum(ia)
+        k = int(np.searchsorted(t, SIM_TIME, side='left'))
+        if k < chunk:
+            ia_parts.append(ia[:k + 1])
+            t_parts.append(t[:k])
+            break
+        ia_parts.append(ia)
+        t_parts.append(t)
+        t0 = t[-1]
+    return np.concatenate(t_parts), np.concatenate(ia_parts)
+
+
+class ArrivalTrace(object):
+    """Arrival side of a pre-drawn run, with the same fields as PacketArrival
+
+    """
+    def __init__(self, arrival_time, ia_times):
+        self.arrival_time = arrival_time
+        self.ia_times = ia_times
+
+
+# **********************************************************************************************************************
+# Single server FCFS queue with finite buffer - Lindley recursion in batched form
+# **********************************************************************************************************************
+class LindleyService(object):
+    """Single server FCFS queue (M/M/1/K and alike) solved on pre-drawn arrays.
+
+    Departures follow D_n = max(a_n, D_n-1) + s_n, computed one block at a time
+    with cumulative sums; the packets found in the system come from a sorted
+    search on the departures. A block is accepted up to the first arrival that
+    finds the buffer full, then the engine goes packet by packet for a while.
+    The statistics have the same names and meaning as the ones of Service.
+    """
+    def __init__(self, s_time, QUEUE_SIZE, SIM_TIME):
+        self.s_time = s_time
+        self.qsize_limit = QUEUE_SIZE
+        self.sim_time = SIM_TIME
+        self.qsize = 0
+        self.arrived = 0
+        self.lost = 0
+        self.re_times = np.empty(0)
+        self.dynamic_QS = np.empty(0, dtype=np.int64)
+        self.lost_arrivals = np.empty(0, dtype=np.int64)
+        self.arrived_s = collectors.series(collectors.ARRIVED_BIN, SIM_TIME)
+        self.lost_s = collectors.series(collectors.LOST_BIN, SIM_TIME)
+
+    @property
+    def dynamic_LOSS(self):
+        """Packets lost so far after each arrival, rebuilt from lost_arrivals"""
+        return collectors.running_losses(self.lost_arrivals, self.arrived)
+
+    def run(self, arrivals, services):
+        """Serves the packets arriving at the (sorted) times arrivals, each one asking for services[i]"""
+        n = len(arrivals)
+        limit = self.qsize_limit
+        departures = np.full(n, np.nan)
+        admitted = np.ones(n, dtype=bool)
+        found = np.zeros(n, dtype=np.int64)
+        # departure times of the last admitted packets, at most qsize_limit of them
+        busy = collections.deque()
+        last_dep = 0.0
+
+        i = 0
+        block = MIN_BLOCK
+        while i < n:
+            j = min(n, i + block)
+            ta = arrivals[i:j]
+            sa = services[i:j]
+
+            # departures assuming that every packet of the block is admitted
+            c = np.cumsum(sa)
+            d = c + np.maximum(np.maximum.accumulate(ta - (c - sa)), last_dep)
+            prev = np.fromiter(busy, dtype=float, count=len(busy))
+            all_d = np.concatenate((prev, d))
+            in_sys = np.arange(len(prev), len(all_d)) - np.searchsorted(all_d, ta, side='right')
+
+            full = np.flatnonzero(in_sys >= limit)
+            m = int(full[0]) if len(full) else j - i
+            if m:
+                departures[i:i + m] = d[:m]
+                found[i:i + m] = in_sys[:m]
+                last_dep = d[m - 1]
+                busy.extend(d[max(0, m - limit):m].tolist())
+                while len(busy) > limit:
+                    busy.popleft()
+            i += m
+            if not len(full):
+                block = min(MAX_BLOCK, 2 * block)
+                continue
+
+            stop = min(n, i + SCALAR_RUN)
+            last_dep = self._scalar_run(arrivals, services, i, stop, busy, last_dep,
+                                        departures, admitted, found)
+            i = stop
+            block = MIN_BLOCK
+
+        self._collect(arrivals, departures, admitted, found)
+
+    def _scalar_run(self, arrivals, services, start, stop, busy, last_dep, departures, admitted, found):
+        limit = self.qsize_limit
+        for k in range(start, stop):
+            t = arrivals[k]
+            while busy and busy[0] <= t:
+                busy.popleft()
+            found[k] = len(busy)
+            if len(busy) >= limit:
+                admitted[k] = False
+            else:
+                last_dep = max(t, last_dep) + services[k]
+                departures[k] = last_dep
+                busy.append(last_dep)
+        return last_dep
+
+    def _collect(self, arrivals, departures, admitted, found):
+        dropped = ~admitted
+        done = departures[admitted] < self.sim_time
+        self.arrived = len(arrivals)
+        self.lost = int(np.count_nonzero(dropped))
+        self.qsize = int(np.count_nonzero(~done))
+        self.dynamic_QS = found + admitted
+        self.lost_arrivals = np.flatnonzero(dropped)
+        self.re_times = (departures[admitted] - arrivals[admitted])[done]
+        self.arrived_s.add_many(arrivals)
+        self.lost_s.add_many(arrivals[dropped])
+
+
+def gg1k(ia_variates, s_variates, QUEUE_SIZE, SIM_TIME):
+    """Runs a G/G/1/K queue until SIM_TIME, returns (packet_arrival, server_farm) lookalikes"""
+    arrivals, ia_times = draw_arrivals(ia_variates, SIM_TIME)
+    services = s_variates.sample(len(arrivals))
+    server_farm = LindleyService(s_variates.mean, QUEUE_SIZE, SIM_TIME)
+    server_farm.run(arrivals, services)
+    return ArrivalTrace(ia_variates.mean, ia_times), server_farm
+
+
+def mm1k(arrival_time, s_time, QUEUE_SIZE, SIM_TIME, rng):
+    """Runs an M/M/1/K queue until SIM_TIME, returns (packet_arrival, server_farm) lookalikes"""
+    return gg1k(variates.exponential(arrival_time, rng), variates.exponential(s_time, rng), QUEUE_SIZE, SIM_TIME)
+
+
+# **********************************************************************************************************************
+# Event-heap kernel - M/M/c/K pools and mixed topologies without per-packet coroutines
+# **********************************************************************************************************************
+class EventKernel(object):
+    """A single heap of (time, seq, callback, arg) events, used in place of simpy.Environment
+
+    Arrivals and departures are plain callbacks: no process, generator or
+    Resource request is created per packet.
+    """
+    def __init__(self):
+        self.now = 0.0
+        self._heap = []
+        self._seq = 0
+
+    @property
+    def scheduled(self):
+        """Events scheduled so far"""
+        return self._seq
+
+    def schedule(self, t, callback, arg=None):
+        heapq.heappush(self._heap, (t, self._seq, callback, arg))
+        self._seq += 1
+
+    def run(self, until):
+        heap = self._heap
+        pop = heapq.heappop
+        while heap and heap[0][0] < until:
+            t, _, callback, arg = pop(heap)
+            self.now = t
+            callback(arg)
+        self.now = until
+
+
+class HeapService(object):
+    """Pool of n_servers FCFS servers sharing a buffer of QUEUE_SIZE packets
+
+    Arrivals are admitted directly against qsize_limit; busy servers are a
+    counter and waiting packets a FIFO of arrival times. Random numbers are
+    drawn in the same order as Service, so a run with the same seed gives
+    the same statistics: from rand, a random.Random, or the random module if
+    None.
+    """
+    __slots__ = ('kernel', 'n_servers', 'busy', 'waiting', 's_time', 'qsize', 'arrived', 'lost', 're_times',
+                 'dynamic_QS', 'lost_arrivals', 'arrived_s', 'lost_s', 'qsize_limit', 'listener', 'trace', '_draw')
+
+    def __init__(self, kernel, n_servers, s_time, QUEUE_SIZE, SIM_TIME=None, variates=None, rand=None):
+        self.kernel = kernel
+        if variates is not None:
+            self._draw = variates
+        else:
+            self._draw = functools.partial((random if rand is None else rand).expovariate, 1.0/s_time)
+        self.n_servers = n_servers
+        self.busy = 0
+        self.waiting = collections.deque()
+        self.s_time = s_time
+        self.qsize = 0
+        self.arrived = 0
+        self.lost = 0
+        self.re_times = collectors.times()
+        # packets in the system after each arrival, and the arrival numbers (from 0) of the packets lost
+        self.dynamic_QS = collectors.counts(QUEUE_SIZE)
+        self.lost_arrivals = collectors.counts()
+        self.arrived_s = collectors.series(collectors.ARRIVED_BIN, SIM_TIME)
+        self.lost_s = collectors.series(collectors.LOST_BIN, SIM_TIME)
+        self.qsize_limit = QUEUE_SIZE
+        # called with no argument whenever qsize changes (see routing)
+        self.listener = None
+        # called with (arrival, start, departure) of each packet when it is done with, if set (see traces)
+        self.trace = None
+
+    @property
+    def dynamic_LOSS(self):
+        """Packets lost so far after each arrival, rebuilt from lost_arrivals"""
+        return collectors.running_losses(self.lost_arrivals, self.arrived)
+
+    def arrive(self):
+        if self._admit():
+            self._enqueue(self.kernel.now)
+
+    def _admit(self, full=False):
+        """Counts an arrival: True if it is admitted, False if it is lost (the buffer is full, or full is True)"""
+        now = self.kernel.now
+        self.arrived += 1
+        self.arrived_s.add(now)
+        if full or self.qsize == self.qsize_limit:
+            self.lost += 1
+            self.dynamic_QS.append(self.qsize)
+            self.lost_arrivals.append(self.arrived - 1)
+            self.lost_s.add(now)
+            if self.trace is not None:
+                self.trace(now, traces.NAN, traces.NAN)
+            return False
+        self.qsize += 1
+        if self.listener is not None:
+            self.listener()
+        self.dynamic_QS.append(self.qsize)
+        return True
+
+    def _enqueue(self, packet):
+        """Starts an admitted packet on a free server, or queues it; packet is what _start takes, its arrival time"""
+        if self.busy < self.n_servers:
+            self.busy += 1
+            self._start(packet)
+        else:
+            self.waiting.append(packet)
+
+    def _start(self, t0):
+        service_time = self._draw()
+        if self.trace is not None:
+            self.kernel.schedule(self.kernel.now + service_time, self._depart_traced, (t0, self.kernel.now))
+            return
+        self.kernel.schedule(self.kernel.now + service_time, self._depart, t0)
+
+    def _depart_traced(self, times):
+        t0, start = times
+        self._depart(t0)
+        self.trace(t0, start, self.kernel.now)
+
+    def _depart(self, t0):
+        self._leave(t0)
+        self._next()
+
+    def _leave(self, t0):
+        """Counts the departure of the packet that arrived at t0"""
+        self.re_times.append(self.kernel.now - t0)
+        self.qsize -= 1
+        if self.listener is not None:
+            self.listener()
+
+    def _next(self):
+        """The server just freed takes the next waiting packet, if any"""
+        if self.waiting:
+            self._start(self.waiting.popleft())
+        else:
+            self.busy -= 1
+
+
+class HeapArrival(object):
+    """Poisson source feeding one HeapService, same fields as PacketArrival
+
+    """
+    __slots__ = ('arrival_time', 'kernel', 'ia_times', 'variates', 'rand', '_draw')
+
+    def __init__(self, kernel, arrival_time, variates=None, rand=None):
+        self.arrival_time = arrival_time
+        self.kernel = kernel
+        self.ia_times = collectors.times(single=True)
+        self.variates = variates
+        self.rand = rand
+        if variates is not None:
+            self._draw = variates
+        else:
+            self._draw = functools.partial((random if rand is None else rand).expovariate, 1.0/arrival_time)
+
+    def start(self, server_farm):
+        self._next(server_farm)
+
+    def _next(self, server_farm):
+        inter_arrival = self._draw()
+        self.ia_times.append(inter_arrival)
+        self.kernel.schedule(self.kernel.now + inter_arrival, self._arrival, server_farm)
+
+    def _arrival(self, server_farm):
+        self._next(server_farm)
+        server_farm.arrive()
+
+
+class HeapArrivalMod(HeapArrival):
+    """Single source dispatching packets over several HeapService, like PacketArrivalMod
+
+    """
+    __slots__ = ('servers', 'router')
+
+    def start(self, servers, probabilities=None, router=None):
+        self.servers = servers
+        if router is None:
+            router = routing.Weighted(probabilities, uniform=self._uniform())
+        router.attach(servers)
+        self.router = router
+        # one collector of inter-arrival times for each server
+        self.ia_times = [collectors.times(single=True) for _ in servers]
+        self._next(None)
+
+    def _uniform(self):
+        if self.variates is not None:
+            return variates.uniform(0, 1, self.variates.rng)
+        return None if self.rand is None else self.rand.random
+
+    def _next(self, _):
+        inter_arrival = self._draw()
+        self.kernel.schedule(self.kernel.now + inter_arrival, self._arrival, inter_arrival)
+
+    def _arrival(self, inter_arrival):
+        # the server is picked when the packet arrives, on the state of the queues at that time
+        i = self.router.pick()
+        self.ia_times[i].append(inter_arrival)
+        self._next(None)
+        self.servers[i].arrive()
@@ -0,0 +1,236 @@
+#!/usr/bin/python3
+
+from . import netsimutils
+from . import collectors
+from . import fastsim
+from . import plotting
+from . import checkpoint
+from . import runcontrol
+from . import traces
+from . import topology
+import os
+import random
+import numpy as np
+import simpy
+import sys
+from . import simulator
+
+
+# **********************************************************************************************************************
+# Constants
+# **********************************************************************************************************************
+RANDOM_SEED = 1234
+INTER_ARRIVAL = 2.0
+SERVICE_TIME = 16.0
+NUM_MACHINES = 4
+QUEUE_SIZE = 50
+
+SIM_TIME = 100000
+
+# "simpy" runs one process per packet, "fast" uses the event-heap kernel of fastsim
+ENGINE = "simpy"
+
+# file to checkpoint the run to, every CHECKPOINT_EVERY time units, and to resume it from (fast engine only)
+CHECKPOINT = None
+CHECKPOINT_EVERY = 10000
+
+# stop as soon as the mean response time is known within this relative precision (SIM_TIME is then the longest run),
+# after removing the warm-up from re_times; None runs until SIM_TIME
+PRECISION = None
+
+# directory to stream a per-packet trace to (see traces), None for no trace
+TRACE = None
+
+
+# **********************************************************************************************************************
+# Simulation - each run_* function sets up and performs a scenario with the constants of a simulator.Config (the ones
+# above if None), and returns (ia_times of each server, servers, runcontrol.Control of a run to PRECISION or None). It
+# draws from the RANDOM of the Config, or from a random.Random(RANDOM_SEED) of its own: never from the random module.
+# **********************************************************************************************************************
+def config(**settings):
+    """The constants of this module as a simulator.Config, overridden by settings"""
+    return simulator.Config.from_module(sys.modules[__name__]).replace(**settings)
+
+
+# one arival process for each queue with reduced arrival rate.
+def run_mixed_queues(c=None):
+    c = simulator.seeded(c if c is not None else config())
+    servers = []
+    arrivals = []
+    if c.ENGINE == "fast":
+        # a fast server and NUM_MACHINES slow servers, see topology
+        spec = topology.mixed_queues(c.INTER_ARRIVAL, c.SERVICE_TIME, c.NUM_MACHINES, c.QUEUE_SIZE)
+        env = topology.Network(spec, c.SIM_TIME, np.random.default_rng(c.RANDOM_SEED), rand=c.RANDOM)
+        arrivals = list(env.sources.values())
+        servers = env.servers()
+    else:
+        env = simpy.Environment()
+        # create a fast server
+        packet_arrival = netsimutils.PacketArrival(env, c.INTER_ARRIVAL*2, rand=c.RANDOM)
+        server_farm = netsimutils.Service(env, 1, c.SERVICE_TIME/c.NUM_MACHINES, c.QUEUE_SIZE, rand=c.RANDOM)
+        arrivals.append(packet_arrival)
+        servers.append(server_farm)
+        env.process(packet_arrival.arrival_process(server_farm))
+        #create NUM_MACHINES slow servers
+        for i in range(c.NUM_MACHINES):
+            packet_arrival = netsimutils.PacketArrival(env, c.INTER_ARRIVAL*2*c.NUM_MACHINES, rand=c.RANDOM)
+            server_farm = netsimutils.Service(env, 1, c.SERVICE_TIME, c.QUEUE_SIZE, rand=c.RANDOM)
+            arrivals.append(packet_arrival)
+            servers.append(server_farm)
+
+            # start the arrival process
+            env.process(packet_arrival.arrival_process(server_farm))
+
+    # simulate until SIM_TIME
+    arrivals, servers, control = simulate(c, env, arrivals, servers)
+    return [a.ia_times for a in arrivals], servers, control
+
+
+# one arival process. Avoid to put a process on a full queue
+def run_mixed_queues_losses_avoidance(c=None):
+    c = simulator.seeded(c if c is not None else config())
+    servers = []
+    probs = []
+    if c.ENGINE == "fast":
+        env = fastsim.EventKernel()
+        station = fastsim.HeapService
+    else:
+        env = simpy.Environment()
+        station = netsimutils.Service
+    # create a fast server
+    server_farm = station(env, 1, c.SERVICE_TIME/c.NUM_MACHINES, c.QUEUE_SIZE, c.SIM_TIME, rand=c.RANDOM)
+    probs.append(c.NUM_MACHINES)
+    servers.append(server_farm)
+    #create NUM_MACHINES slow servers
+    for i in range(c.NUM_MACHINES):
+        server_farm = station(env, 1, c.SERVICE_TIME, c.QUEUE_SIZE, c.SIM_TIME, rand=c.RANDOM)
+        servers.append(server_farm)
+        probs.append(1)
+
+    if c.ENGINE == "fast":
+        p = fastsim.HeapArrivalMod(env, c.INTER_ARRIVAL, rand=c.RANDOM)
+        p.start(servers, probs)
+    else:
+        p = netsimutils.PacketArrivalMod(env, c.INTER_ARRIVAL, rand=c.RANDOM)
+        env.process(p.arrival_process(servers, probs))
+    # simulate until SIM_TIME
+    p, servers, control = simulate(c, env, p, servers)
+    return p.ia_times, servers, control
+
+
+def simulate(c, env, arrivals, servers):
+    """Runs env until SIM_TIME, or to PRECISION, checkpointed to CHECKPOINT and traced to TRACE if set (in config c).
+
+    Returns (arrivals, servers, control): the saved arrivals and servers when
+    a run is resumed, the runcontrol.Control of a run to PRECISION.
+    """
+    control = None
+    sink = None
+    # a resumed run carries on the trace of the checkpoint instead of starting a new one
+    if c.TRACE and not (c.CHECKPOINT and os.path.exists(c.CHECKPOINT)):
+        sink = traces.TraceSink(c.TRACE)
+        sink.attach(servers)
+    if c.PRECISION:
+        if c.CHECKPOINT:
+            raise ValueError("PRECISION and CHECKPOINT can't be used together")
+        control = runcontrol.run(env, servers, c.SIM_TIME, c.PRECISION)
+    elif c.CHECKPOINT:
+        if c.ENGINE != "fast":
+            raise ValueError("CHECKPOINT needs ENGINE = \"fast\": SimPy processes cannot be saved")
+        env, (arrivals, servers, sink) = checkpoint.run(env, (arrivals, servers, sink), c.SIM_TIME, c.CHECKPOINT,
+                                                        c.CHECKPOINT_EVERY)
+    else:
+        env.run(c.SIM_TIME)
+    if sink is not None:
+        sink.close()
+    return arrivals, servers, control
+
+
+SCENARIOS = {
+    "mixed_queues": run_mixed_queues,
+    "mixed_queues_losses_avoidance": run_mixed_queues_losses_avoidance,
+}
+
+
+# **********************************************************************************************************************
+# Reporting - print the results, and plot them only if asked (matplotlib is imported on demand)
+# **********************************************************************************************************************
+def mixed_queues(plot=True, c=None):
+    report(*run_mixed_queues(c), plot=plot)
+
+
+def mixed_queues_losses_avoidance(plot=True, c=None):
+    print("Running simulation")
+    report(*run_mixed_queues_losses_avoidance(c), plot=plot)
+
+
+def report(super_ia_times, servers, control=None, plot=True):
+    if control is not None:
+        print(control)
+    #compute the average and the tail over every packet served: servers weigh by the packets they served
+    sketches = [collectors.sketch(s.re_times) for s in servers]
+    total = collectors.merged(sketches)
+    print("mean response time = " + repr(total.mean))
+    print("response time " + collectors.percentiles_text(total))
+
+    supertot = 0
+    superlost = 0
+    for i, ia_times in enumerate(super_ia_times):
+        tot = len(ia_times)
+        supertot += tot
+        superlost += servers[i].lost
+        print(repr(tot) + " total packets for queue n." + repr(i))
+        print(repr(servers[i].lost) + " packets lost for queue n." + repr(i) +
+              "(" + repr(servers[i].lost/tot * 100) + "%)")    
+        print("response time " + collectors.percentiles_text(sketches[i]) + " for queue n." + repr(i))
+        if plot:
+            plot_server(i, ia_times)
+
+    print(repr(supertot) + " total packets")
+    print(repr(superlost) + " packets lost (" + repr(superlost/supertot * 100) + "%)")    
+
+    if plot:
+        plot_all(super_ia_times)
+
+
+def plot_server(i, ia_times):
+    import matplotlib.pyplot as plt
+
+    fig, (series, pdf, cdf) = plt.subplots(3, 1)
+    fig.suptitle("server "+ repr(i))
+
+    plotting.draw_trace(series, ia_times)
+    series.set_xlabel("Sample")
+    series.set_ylabel("Inter-arrival")
+
+    plotting.draw_pdf(pdf, ia_times, range=(0, 15))
+    plotting.draw_cdf(cdf, ia_times, range=(0, 15))
+
+
+def plot_all(super_ia_times):
+    import matplotlib.pyplot as plt
+
+    fig, (pdf, cdf) = plt.subplots(2, 1)
+    for i, ia_times in enumerate(super_ia_times):
+        edges, density = plotting.histogram(ia_times, range=(0, 15))
+        pdf.step(edges[:-1], density, where='post', label="server %d" % i)
+        edges, p = plotting.cdf(ia_times, range=(0, 15))
+        cdf.step(edges[1:], p, where='post', label="server %d" % i)
+    pdf.set_xlabel("Time")
+    pdf.set_ylabel("Density")
+    pdf.legend(fontsize="small")
+    cdf.set_xlabel("Time")
+    cdf.set_ylabel("P(Arrival time <= x)")
+    cdf.set_ybound(0, 1)
+
+
+def main():
+    import matplotlib.pyplot as plt
+
+    c = config(RANDOM=random.Random(RANDOM_SEED))
+    #mixed_queues(c=c)
+    mixed_queues_losses_avoidance(c=c)
+    plt.show()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+import simpy
+import random
+import functools
+from . import collectors
+from . import routing
+from . import variates
+from . import probes
+from . import rates
+from . import traces
+# **********************************************************************************************************************
+# Packet arrival
+# **********************************************************************************************************************
+#
+class PacketArrival(object):
+    """ Questa classe genera soltanto l'arrivo dei processi
+"""
+    __slots__ = ('arrival_time', 'env', 'ia_times', 'variates', 'rand', 'probe')
+
+    # constructor
+    def __init__(self, environ, arrival_time, streaming=False, variates=None, rand=None):
+
+        # the inter-arrival time
+        self.arrival_time = arrival_time
+
+        # the environment
+        self.env = environ
+
+        # streaming: keep running statistics only, no per-packet history
+        self.ia_times = collectors.OnlineStats() if streaming else collectors.times(single=True)
+
+        # pool of inter-arrival times (see variates), exponential from rand if None
+        self.variates = variates
+
+        # random.Random to draw from, the random module if None
+        self.rand = rand
+
+        # probes.Profile timing the model code, if any
+        self.probe = None
+
+    def draw(self):
+        """Returns the function that samples the time to next arrival"""
+        if self.variates is not None:
+            return self.variates
+        return functools.partial((random if self.rand is None else self.rand).expovariate, 1.0/self.arrival_time)
+
+    # execute the process
+    def arrival_process(self, server_farm):
+        draw = self.draw()
+        probe = self.probe
+        while True:
+            if probe is not None:
+                t = probe.enter(probes.ARRIVAL)
+            # sample the time to next arrival
+            inter_arrival = draw()
+            self.ia_times.append(inter_arrival)
+            if probe is not None:
+                probe.leave(probes.ARRIVAL, t)
+
+            # yield an event to the simulator
+            yield self.env.timeout(inter_arrival)
+
+            # a car has arrived - request carwash to do its job
+            self.env.process(server_farm.service())
+
+
+# **********************************************************************************************************************
+# Packet Processing - it gets a waiting process (FCFS) and performs the service
+# **********************************************************************************************************************
+class Service(object):
+    """Questo mette in coda o scarta i pacchetti e serve le richieste
+(Segue il pacchetto dall'inserimento in coda fino alla fine del servizio)
+
+    With streaming=True no per-packet history is kept: re_times holds running
+    moments and quantile estimates, dynamic_QS the time-weighted queue length,
+    lost_arrivals the last lost arrival only, and arrived_s/lost_s the last
+    bins only.
+    SIM_TIME is only a hint to size arrived_s and lost_s.
+    """
+    __slots__ = ('environment', 'servers', 's_time', 'qsize', 'arrived', 'lost', 're_times', 'dynamic_QS',
+                 'lost_arrivals', 'arrived_s', 'lost_s', 'qsize_limit', 'streaming', 'variates', 'rand', 'n_servers',
+                 'listener', 'probe', 'trace')
+
+    def __init__(self, environment, n_servers, s_time, QUEUE_SIZE, SIM_TIME=None, streaming=False, variates=None,
+                 rand=None):
+        self.environment = environment
+        self.servers = simpy.Resource(environment, n_servers)
+        self.n_servers = n_servers
+        # called with no argument whenever qsize changes (see routing)
+        self.listener = None
+        # probes.Profile timing the model code, if any
+        self.probe = None
+        # called with (arrival, start, departure) of each packet when it is done with, if set (see traces)
+        self.trace = None
+        self.s_time = s_time
+        self.qsize = 0
+        # packets arrived, and lost among them
+        self.arrived = 0
+        self.lost = 0
+        self.qsize_limit = QUEUE_SIZE
+        # pool of service times (see variates), exponential from rand (the random module if None) otherwise
+        self.variates = variates
+        self.rand = rand
+        self.streaming = streaming
+        self.arrived_s = collectors.series(collectors.ARRIVED_BIN, SIM_TIME, streaming)
+        self.lost_s = collectors.series(collectors.LOST_BIN, SIM_TIME, streaming)
+        if streaming:
+            self.re_times = collectors.OnlineStats()
+            self.dynamic_QS = collectors.TimeAverage(lambda: environment.now)
+            self.lost_arrivals = collectors.Last()
+            return
+        self.re_times = collectors.times()
+        # packets in the system after each arrival, and the arrival numbers (from 0) of the packets lost
+        self.dynamic_QS = collectors.counts(QUEUE_SIZE)
+        self.lost_arrivals = collectors.counts()
+
+    @property
+    def dynamic_LOSS(self):
+        """Packets lost so far after each arrival, rebuilt from lost_arrivals"""
+        return collectors.running_losses(self.lost_arrivals, self.arrived)
+
+
+    def service(self, demand=None):
+        # demand: service time of this packet, drawn at the start of service if None
+        probe = self.probe
+        if probe is not None:
+            t = probe.enter(probes.ADMIT)
+        #print("Packets in queue: %d" % self.qsize)
+        self.arrived += 1
+        if self.qsize == self.qsize_limit:
+            #print("Packet lost at %f" % env.now )
+            self.lost += 1
+            self.dynamic_QS.append(self.qsize)
+            self.lost_arrivals.append(self.arrived - 1)
+            self.arrived_s.add(self.environment.now)
+            self.lost_s.add(self.environment.now)
+            if self.trace is not None:
+                self.trace(self.environment.now, traces.NAN, traces.NAN)
+            if probe is not None:
+                probe.leave(probes.DROP, t)
+        else:
+            self.qsize += 1
+            if self.listener is not None:
+                self.listener()
+            t0 = self.environment.now
+            self.dynamic_QS.append(self.qsize)
+            self.arrived_s.add(self.environment.now)
+            if probe is not None:
+                probe.leave(probes.ADMIT, t)
+            #print("Packet arrived in queue at %f" % env.now)
+            with self.servers.request() as req:
+                yield req
+                if self.trace is not None:
+                    start = self.environment.now
+                if probe is not None:
+                    t = probe.enter(probes.START)
+                if demand is not None:
+                    service_time = demand
+                elif self.variates is not None:
+                    service_time = self.variates()
+                else:
+                    service_time = (random if self.rand is None else self.rand).expovariate(1.0/self.s_time)
+                if probe is not None:
+                    probe.leave(probes.START, t)
+                yield self.environment.timeout(service_time)
+                #print("Packet left the server at %f" % env.now)
+                if probe is not None:
+                    t = probe.enter(probes.DEPART)
+                t1 = self.environment.now
+                self.re_times.append(t1-t0)
+                self.qsize -= 1
+                if self.listener is not None:
+                    self.listener()
+                if self.streaming:
+                    self.dynamic_QS.append(self.qsize)
+                if self.trace is not None:
+                    self.trace(t0, start, t1)
+                if probe is not None:
+                    probe.leave(probes.DEPART, t)
+
+
+# **********************************************************************************************************************
+# Time-varying load - arrivals with a rate function (see rates), servers added and removed at runtime (see autoscaling)
+# **********************************************************************************************************************
+class NHPPArrival(PacketArrival):
+    """PacketArrival with a time-varying rate: rate is a function of time such as rates.Diurnal or rates.Piecewise
+
+    arrival_time is the mean inter-arrival time, 1 / rate.mean. The
+    arrival times are drawn in blocks from rng (see rates.inter_arrivals),
+    counting time from when the arrival process starts.
+    """
+    __slots__ = ('rate',)
+
+    def __init__(self, environ, rate, streaming=False, rng=None, peak=None):
+        super(NHPPArrival, self).__init__(environ, 1.0 / rate.mean, streaming, rates.inter_arrivals(rate, rng, peak))
+        self.rate = rate
+
+
+class ScalableResource(simpy.Resource):
+    """simpy.Resource whose capacity can change: requests waiting get the servers added, and the users beyond a
+    reduced capacity keep their server until they release it
+
+    """
+    def resize(self, capacity):
+        self._capacity = capacity
+        self._trigger_put(None)
+
+
+class ScalableService(Service):
+    """Service whose n_servers can be changed with resize() while it runs (see autoscaling)
+
+    capacity is the time-weighted average of n_servers.
+    """
+    __slots__ = ('capacity',)
+
+    def __init__(self, environment, n_servers, s_time, QUEUE_SIZE, SIM_TIME=None, streaming=False, variates=None,
+                 rand=None):
+        super(ScalableService, self).__init__(environment, n_servers, s_time, QUEUE_SIZE, SIM_TIME, streaming, variates,
+                                              rand)
+        self.servers = ScalableResource(environment, n_servers)
+        self.capacity = collectors.TimeAverage(lambda: environment.now, n_servers)
+
+    def resize(self, n_servers):
+        self.n_servers = n_servers
+        self.capacity.append(n_servers)
+        self.servers.resize(n_servers)
+
+
+# **********************************************************************************************************************
+# Packet arrival with routing - one arrival process feeding several servers
+# **********************************************************************************************************************
+class PacketArrivalMod(PacketArrival):
+    """Single arrival process dispatching the packets over several Service (see routing)
+
+    """
+    def __init__(self, envi, int_arriv_time, variates=None, rand=None):
+        super(PacketArrivalMod, self).__init__(envi, int_arriv_time, variates=variates, rand=rand)
+        # one collector of inter-arrival times for each server
+        self.ia_times = []
+
+    def arrival_process(self, servers, probabilities=None, router=None):
+        # weighted random routing avoiding full queues, unless another policy is given (see routing)
+        if router is None:
+            uniform = None if self.rand is None else self.rand.random
+            if self.variates is not None:
+                uniform = variates.uniform(0, 1, self.variates.rng)
+            router = routing.Weighted(probabilities, uniform=uniform)
+        router.attach(servers)
+        for _ in servers:
+            self.ia_times.append(collectors.times(single=True))
+        draw = self.draw()
+        probe = self.probe
+        while True:
+            if probe is not None:
+                t = probe.enter(probes.ARRIVAL)
+            # sample the time to next arrival
+            inter_arrival = draw()
+            if probe is not None:
+                probe.leave(probes.ARRIVAL, t)
+
+            # yield an event to the simulator
+            yield self.env.timeout(inter_arrival)
+
+            # a car has arrived - pick its server on the current state of the queues
+            if probe is not None:
+                t = probe.enter(probes.ROUTE)
+            i = router.pick()
+            self.ia_times[i].append(inter_arrival)
+            if probe is not None:
+                probe.leave(probes.ROUTE, t)
+            self.env.process(servers[i].service())
+
+
+# **********************************************************************************************************************
+# Trace-driven arrivals - recorded inter-arrival times and service demands instead of random ones (see replay)
+# **********************************************************************************************************************
+class TraceArrival(PacketArrival):
+    """PacketArrival replaying the (inter_arrival, demand) pairs of packets, e.g. replay.packets(...)
+
+    The run ends its arrivals with the trace. A demand of None lets the
+    server draw the service time as usual. arrival_time is only used to
+    label and scale plots.
+    """
+    __slots__ = ('packets',)
+
+    def __init__(self, environ, packets, arrival_time=None, streaming=False):
+        super(TraceArrival, self).__init__(environ, arrival_time, streaming)
+        self.packets = packets
+
+    def arrival_process(self, server_farm):
+        for inter_arrival, demand in self.packets:
+            self.ia_times.append(inter_arrival)
+            yield self.env.timeout(inter_arrival)
+            self.env.process(server_farm.service(demand))
+
+
+class TraceArrivalMod(PacketArrivalMod):
+    """PacketArrivalMod replaying the packets of a trace: each one is dispatched with its own demand
+
+    """
+    __slots__ = ('packets',)
+
+    def __init__(self, envi, packets, int_arriv_time=None, rand=None):
+        super(TraceArrivalMod, self).__init__(envi, int_arriv_time, rand=rand)
+        self.packets = packets
+
+    def arrival_process(self, servers, probabilities=None, router=None):
+        if router is None:
+            router = routing.Weighted(probabilities, uniform=None if self.rand is None else self.rand.random)
+        router.attach(servers)
+        for _ in servers:
+            self.ia_times.append(collectors.times(single=True))
+        for inter_arrival, demand in self.packets:
+            yield self.env.timeout(inter_arrival)
+            i = router.pick()
+            self.ia_times[i].append(inter_arrival)
+            self.env.process(servers[i].service(demand))
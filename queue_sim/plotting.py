@@ -0,0 +1,119 @@
+import math
+import numpy as np
+from . import collectors
+
+# **********************************************************************************************************************
+# Plotting - samples are binned and decimated with NumPy, matplotlib only draws a few thousand points
+# **********************************************************************************************************************
+#
+# matplotlib is imported by the functions that draw, never at module load.
+
+# points drawn for a trace, bins of a histogram
+TRACE_POINTS = 2000
+BINS = 100
+
+
+def decimate(samples, points=TRACE_POINTS):
+    """(x, y) of a min/max envelope of samples in about points points.
+
+    Samples are split in buckets; each bucket contributes its minimum and its
+    maximum, so peaks survive however long the trace is.
+    """
+    y = collectors.as_array(samples)
+    n = len(y)
+    if n <= points:
+        return np.arange(n), y
+    size = int(math.ceil(n / (points / 2.0)))
+    m = n // size
+    head = y[:m * size].reshape(m, size)
+    lo = head.min(axis=1)
+    hi = head.max(axis=1)
+    x = np.repeat(np.arange(m) * size + size / 2.0, 2)
+    env = np.empty(2 * m, dtype=y.dtype)
+    env[0::2] = lo
+    env[1::2] = hi
+    if m * size < n:
+        tail = y[m * size:]
+        x = np.append(x, [m * size + len(tail) / 2.0] * 2)
+        env = np.append(env, [tail.min(), tail.max()])
+    return x, env
+
+
+def histogram(samples, bins=BINS, range=None):
+    """(edges, density) of samples"""
+    return _pair(np.histogram(collectors.as_array(samples), bins=bins, range=range, density=True))
+
+
+def cdf(samples, bins=BINS, range=None):
+    """(edges, empirical CDF at the right edge of each bin) of samples"""
+    counts, edges = np.histogram(collectors.as_array(samples), bins=bins, range=range)
+    total = counts.sum()
+    return edges, np.cumsum(counts) / float(total if total else 1)
+
+
+def _pair(hist):
+    values, edges = hist
+    return edges, values
+
+
+def rate(series, points=TRACE_POINTS):
+    """(times, events per time unit) of a collectors.TimeSeries, in at most points bins"""
+    times, counts = series.downsample(points)
+    width = (times[1] - times[0]) if len(times) > 1 else series.width
+    return times, counts / float(width)
+
+
+# **********************************************************************************************************************
+# Drawing
+# **********************************************************************************************************************
+def draw_trace(ax, samples, x_scale=1.0, points=TRACE_POINTS):
+    x, y = decimate(samples, points)
+    ax.plot(x * x_scale, y, linewidth=0.6)
+
+
+def draw_binned(ax, edges, values, **kwargs):
+    """Histogram of pre-binned values"""
+    ax.hist(edges[:-1], bins=edges, weights=values, **kwargs)
+
+
+def draw_pdf(ax, samples, bins=BINS, range=None):
+    draw_binned(ax, *histogram(samples, bins, range))
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Density")
+
+
+def draw_cdf(ax, samples, bins=BINS, range=None):
+    draw_binned(ax, *cdf(samples, bins, range))
+    ax.set_xlabel("Time")
+    ax.set_ylabel("P(Arrival time <= x)")
+    ax.set_ybound(0, 1)
+
+
+def draw_rate(ax, series, points=TRACE_POINTS):
+    times, r = rate(series, points)
+    ax.step(times, r, where='post', linewidth=0.6)
+
+
+def grid_shape(n):
+    """(rows, columns) of a grid for n panels: one row up to 4, then about square"""
+    if n < 1:
+        raise ValueError("a grid needs at least one panel, got %d" % n)
+    columns = n if n <= 4 else int(math.ceil(math.sqrt(n)))
+    return int(math.ceil(n / float(columns))), columns
+
+
+def server_grid(title, items, draw):
+    """One figure with a panel per server; draw(ax, i, item) fills each panel"""
+    import matplotlib.pyplot as plt
+
+    rows, columns = grid_shape(len(items))
+    fig, axes = plt.subplots(rows, columns, squeeze=False, figsize=(4 * columns, 2.5 * rows))
+    for k, ax in enumerate(axes.flat):
+        if k < len(items):
+            draw(ax, k, items[k])
+            ax.set_title("server %d" % k, fontsize="small")
+        else:
+            ax.set_visible(False)
+    fig.suptitle(title)
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,94 @@
+import sys
+import time
+
+# **********************************************************************************************************************
+# Probes - counters and sampled timers on the hot path of PacketArrival and Service
+# **********************************************************************************************************************
+#
+#   profile = probes.Profile()
+#   profile.attach(packet_arrival, server_farm)
+#   profile.run(env, SIM_TIME)
+#   profile.dump()
+#
+# Every phase is counted, one in every `every` is timed and the total of each phase is extrapolated from the timed
+# ones. What run() measures beyond the model code is time spent by SimPy: event scheduling, generator resumption and
+# Resource requests. Without a profile attached the hot path only tests `probe is not None`.
+
+ARRIVAL, ROUTE, ADMIT, DROP, START, DEPART = range(6)
+PHASES = ("arrival", "route", "admit", "drop", "start", "depart")
+
+# one call in SAMPLE of each phase is timed
+SAMPLE = 64
+
+
+class Profile(object):
+    """Counts and times of the model code of each phase, and wall time of the run"""
+    __slots__ = ('every', 'counts', 'timed', 'seconds', 'wall', '_ticks')
+
+    def __init__(self, every=SAMPLE):
+        self.every = every
+        self.counts = [0] * len(PHASES)
+        self.timed = [0] * len(PHASES)
+        self.seconds = [0.0] * len(PHASES)
+        self.wall = 0.0
+        self._ticks = [0] * len(PHASES)
+
+    def attach(self, *objects):
+        """Probe PacketArrival and Service objects (anything with a probe slot)"""
+        for o in objects:
+            o.probe = self
+
+    def enter(self, phase):
+        """Start of phase: returns a timestamp if this call is sampled, None otherwise"""
+        n = self._ticks[phase]
+        self._ticks[phase] = n + 1
+        if n % self.every:
+            return None
+        return time.perf_counter()
+
+    def leave(self, phase, t):
+        """End of phase: t is what enter returned (the phase may differ, e.g. admit or drop)"""
+        self.counts[phase] += 1
+        if t is not None:
+            self.seconds[phase] += time.perf_counter() - t
+            self.timed[phase] += 1
+
+    def run(self, env, until):
+        """env.run(until), timed"""
+        t = time.perf_counter()
+        env.run(until)
+        self.wall += time.perf_counter() - t
+
+    def estimate(self, phase):
+        """Seconds spent in phase, extrapolated from the timed calls"""
+        if not self.timed[phase]:
+            return 0.0
+        return self.seconds[phase] / self.timed[phase] * self.counts[phase]
+
+    def report(self):
+        """{phase: {count, timed, mean_us, seconds}} plus model, scheduling and wall seconds"""
+        phases = {}
+        for phase, name in enumerate(PHASES):
+            timed = self.timed[phase]
+            phases[name] = {
+                "count": self.counts[phase],
+                "timed": timed,
+                "mean_us": self.seconds[phase] / timed * 1e6 if timed else 0.0,
+                "seconds": self.estimate(phase),
+            }
+        model = sum(self.estimate(phase) for phase in range(len(PHASES)))
+        return {"phases": phases, "model": model, "scheduling": max(self.wall - model, 0.0), "wall": self.wall}
+
+    def dump(self, f=None):
+        f = f or sys.stdout
+        r = self.report()
+        wall = r["wall"] or 1.0
+        f.write("%-12s %12s %10s %10s %10s %7s\n" % ("phase", "count", "timed", "mean us", "seconds", "share"))
+        for name in PHASES:
+            p = r["phases"][name]
+            if p["count"]:
+                f.write("%-12s %12d %10d %10.3f %10.4f %6.1f%%\n" % (
+                    name, p["count"], p["timed"], p["mean_us"], p["seconds"], p["seconds"] / wall * 100))
+        for name in ("model", "scheduling"):
+            f.write("%-12s %12s %10s %10s %10.4f %6.1f%%\n" % (name, "", "", "", r[name], r[name] / wall * 100))
+        f.write("%-12s %12s %10s %10s %10.4f\n" % ("wall", "", "", "", r["wall"]))
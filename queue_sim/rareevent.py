@@ -0,0 +1,292 @@
+import heapq
+import math
+import numpy as np
+from . import replications
+from . import variates
+
+# **********************************************************************************************************************
+# Rare events - small loss probabilities of a G/G/c/K station, by importance sampling and by splitting
+# **********************************************************************************************************************
+#
+#   rareevent.importance_sampling(INTER_ARRIVAL, SERVICE_TIME, NUM_MACHINES, QUEUE_SIZE)         # M/M/c/K
+#   rareevent.splitting(variates.erlang(4, 2.0, rng), variates.exponential(1.0, rng), 1, 50)     # any distributions
+#
+# Both estimate the probability that an arrival is lost, Service.lost over the arrivals, as the ratio of the expected
+# losses and arrivals in a regenerative cycle (from an arrival to an empty station to the next one). Losses only
+# happen in the rare cycles that fill the buffer, and those are made frequent:
+#
+# - importance_sampling follows the jump chain of the M/M/c/K with the arrival and service rates of each state
+#   swapped (when that makes arrivals likelier) until the buffer fills, then with the true rates until the cycle ends.
+#   Each cycle is weighted by its likelihood ratio, so the estimate is unbiased; it is vectorized over cycles.
+# - splitting (fixed-effort multilevel splitting, as RESTART) runs `effort` trajectories from each level of packets in
+#   the system to the next one, restarting them from the states that made it; P(full buffer) is the product of the
+#   fractions, and the losses of a full cycle are counted from the states that reach QUEUE_SIZE. It works with any
+#   inter-arrival and service distributions, by event simulation.
+#
+# The arrivals per cycle, which are not rare, are estimated from plain cycles. The half width of the confidence
+# interval and the relative error (standard error over the estimate) come from the delta method; events counts the
+# arrivals and departures simulated, to compare with the ones a plain run would need for the same relative error.
+
+# cycles for the arrivals per cycle, and for each batch of importance sampling
+CYCLES = 10000
+# cycles importance sampling runs at most to reach its precision
+MAX_CYCLES = 100 * CYCLES
+# trajectories per level, and independent repetitions of the splitting estimate (for its confidence interval)
+EFFORT = 500
+REPETITIONS = 10
+
+
+class LossEstimate(object):
+    """Estimated loss probability of a station.
+
+    relative_error is the standard error over the estimate; brute_force_events
+    the events a plain simulation would take for the same relative error.
+    """
+    __slots__ = ('probability', 'half_width', 'relative_error', 'events', 'method')
+
+    def __init__(self, probability, half_width, relative_error, events, method):
+        self.probability = probability
+        self.half_width = half_width
+        self.relative_error = relative_error
+        self.events = events
+        self.method = method
+
+    @property
+    def brute_force_events(self):
+        p = self.probability
+        if not p or not self.relative_error:
+            return math.inf
+        # binomial: (1 - p) / (p n) = relative_error^2 for n arrivals, each arrival followed by a departure
+        return 2 * (1 - p) / (p * self.relative_error ** 2)
+
+    def __repr__(self):
+        return "LossEstimate(%s, probability=%g +- %g, relative error %.3g, %d events, %.3g times fewer than plain)" % (
+            self.method, self.probability, self.half_width, self.relative_error, self.events,
+            self.brute_force_events / self.events if self.events else math.inf)
+
+
+def _check_load(arrival_time, s_time, n_servers):
+    # at a load of 1 or more the station seldom empties, cycles never end and losses are not rare anyway
+    if s_time / (arrival_time * n_servers) >= 1:
+        raise ValueError("losses are only rare below a load of 1: use a plain run")
+
+
+def _ratio(losses, arrivals, df, level, events, method):
+    """LossEstimate of mean(losses) / mean(arrivals), from independent per-cycle (or per-repetition) samples"""
+    n, a = np.mean(losses), np.mean(arrivals)
+    p = n / a
+    if not n:
+        return LossEstimate(0.0, math.inf, math.inf, events, method)
+    rel2 = np.var(losses, ddof=1) / (len(losses) * n * n) + np.var(arrivals, ddof=1) / (len(arrivals) * a * a)
+    rel = math.sqrt(rel2)
+    return LossEstimate(p, replications.t_quantile(0.5 + level/2, df) * rel * p, rel, events, method)
+
+
+# **********************************************************************************************************************
+# Importance sampling - M/M/c/K, rates swapped
+# **********************************************************************************************************************
+def _mmck_cycles(arrival_time, s_time, n_servers, queue_size, cycles, rng, twist):
+    """(weighted losses, arrivals, events) of cycles of the jump chain, with the swapped rates until the buffer fills
+    if twist"""
+    lam = 1.0 / arrival_time
+    k = np.arange(queue_size + 1)
+    mu = np.minimum(k, n_servers) / s_time
+    up = lam / (lam + mu)
+    # arrival probabilities under the change of measure: never less likely than under the true rates
+    up_is = np.maximum(up, 1.0 - up) if twist else up
+
+    state = np.ones(cycles, dtype=np.int64)
+    weight = np.ones(cycles)
+    twisted = np.full(cycles, twist and queue_size > 1)
+    losses = np.zeros(cycles)
+    arrivals = np.ones(cycles)
+    active = np.arange(cycles)
+    events = cycles
+    while len(active):
+        s = state[active]
+        tw = twisted[active]
+        p = np.where(tw, up_is[s], up[s])
+        arrival = rng.random(len(active)) < p
+        if twist:
+            ratio = np.where(arrival, up[s] / up_is[s], (1.0 - up[s]) / (1.0 - up_is[s]))
+            weight[active] *= np.where(tw, ratio, 1.0)
+        arrivals[active] += arrival
+        losses[active] += arrival & (s == queue_size)
+        s = s + (arrival & (s < queue_size)) - ~arrival
+        state[active] = s
+        # back to the true rates once the buffer is full
+        twisted[active] = tw & (s < queue_size)
+        events += len(active)
+        active = active[s > 0]
+    return weight * losses, arrivals, events
+
+
+def importance_sampling(arrival_time, s_time, n_servers, queue_size, cycles=CYCLES, precision=None, level=0.95,
+                        rng=None, max_cycles=MAX_CYCLES):
+    """Loss probability of an M/M/c/K station (Poisson arrivals every arrival_time, exponential s_time services,
+    a load below 1).
+
+    With a precision, batches of cycles are added until the relative error
+    is within it, or max_cycles have run: the estimate is then returned as
+    it stands, with a relative error above precision (infinite if no cycle
+    lost a packet).
+    """
+    _check_load(arrival_time, s_time, n_servers)
+    rng = rng if rng is not None else np.random.default_rng()
+    losses = []
+    arrivals = []
+    events = 0
+    while True:
+        weighted, _, e = _mmck_cycles(arrival_time, s_time, n_servers, queue_size, cycles, rng, True)
+        _, plain, f = _mmck_cycles(arrival_time, s_time, n_servers, queue_size, cycles, rng, False)
+        losses.append(weighted)
+        arrivals.append(plain)
+        events += e + f
+        estimate = _ratio(np.concatenate(losses), np.concatenate(arrivals), cycles * len(losses) - 1, level, events,
+                          "importance sampling")
+        if precision is None or estimate.relative_error <= precision or cycles * len(losses) >= max_cycles:
+            return estimate
+
+
+# **********************************************************************************************************************
+# Splitting - G/G/c/K by event simulation
+# **********************************************************************************************************************
+class _Station(object):
+    """State of a G/G/c/K FCFS station: time, next arrival, departures of the packets in service, packets in system
+
+    """
+    __slots__ = ('now', 'arrival', 'departures', 'n')
+
+    def __init__(self, now, arrival, departures, n):
+        self.now = now
+        self.arrival = arrival
+        self.departures = departures
+        self.n = n
+
+    def copy(self):
+        return _Station(self.now, self.arrival, list(self.departures), self.n)
+
+
+def _advance(station, draw_ia, draw_s, n_servers, queue_size, target):
+    """Runs station until it holds target packets or empties; returns (reached target, losses, arrivals, events)"""
+    losses = arrivals = events = 0
+    departures = station.departures
+    while True:
+        events += 1
+        if departures and departures[0] < station.arrival:
+            station.now = heapq.heappop(departures)
+            station.n -= 1
+            if station.n >= n_servers:
+                heapq.heappush(departures, station.now + draw_s())
+            if station.n == 0:
+                return False, losses, arrivals, events
+        else:
+            station.now = station.arrival
+            station.arrival = station.now + draw_ia()
+            arrivals += 1
+            if station.n == queue_size:
+                losses += 1
+                continue
+            station.n += 1
+            if station.n <= n_servers:
+                heapq.heappush(departures, station.now + draw_s())
+            if station.n == target:
+                return True, losses, arrivals, events
+
+
+def _cycle_start(draw_ia, draw_s):
+    # an arrival to the empty station: a regeneration point
+    return _Station(0.0, draw_ia(), [draw_s()], 1)
+
+
+def _split(draw_ia, draw_s, n_servers, queue_size, effort, uniform):
+    """One fixed-effort splitting estimate of the expected losses in a cycle; returns (losses, events)"""
+    events = 0
+    probability = 1.0
+    starts = [_cycle_start(draw_ia, draw_s) for _ in range(effort)]
+    for level in range(2, queue_size + 1):
+        reached = []
+        for i in range(effort):
+            station = starts[i].copy() if level > 2 else starts[i]
+            ok, _, _, e = _advance(station, draw_ia, draw_s, n_servers, queue_size, level)
+            events += e
+            if ok:
+                reached.append(station)
+        if not reached:
+            return 0.0, events
+        probability *= len(reached) / float(effort)
+        # restart the next level from the states that made it, picked at random
+        starts = [reached[int(uniform() * len(reached))] for _ in range(effort)]
+    losses = 0
+    for station in starts:
+        _, lost, _, e = _advance(station.copy(), draw_ia, draw_s, n_servers, queue_size, queue_size + 1)
+        losses += lost
+        events += e
+    return probability * losses / float(effort), events
+
+
+def _pool(dist, rng):
+    """A variates pool, or an exponential one if dist is a mean"""
+    if callable(dist):
+        return dist
+    return variates.exponential(dist, rng)
+
+
+def splitting(inter_arrival, service, n_servers, queue_size, effort=EFFORT, repetitions=REPETITIONS, cycles=CYCLES,
+              level=0.95, rng=None):
+    """Loss probability of a G/G/c/K station by multilevel splitting.
+
+    inter_arrival and service are variates pools (see variates), or means
+    of exponential distributions; the load must be below 1. Each of the repetitions runs effort
+    trajectories per level, and cycles plain cycles for the arrivals.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    draw_ia = _pool(inter_arrival, rng)
+    draw_s = _pool(service, rng)
+    _check_load(draw_ia.mean, draw_s.mean, n_servers)
+    uniform = variates.uniform(0, 1, rng)
+    losses = []
+    arrivals = []
+    events = 0
+    for _ in range(repetitions):
+        lost, e = _split(draw_ia, draw_s, n_servers, queue_size, effort, uniform)
+        losses.append(lost)
+        events += e
+        total = 0
+        for _ in range(cycles // repetitions):
+            _, _, a, e = _advance(_cycle_start(draw_ia, draw_s), draw_ia, draw_s, n_servers, queue_size,
+                                  queue_size + 1)
+            # the first arrival of the cycle, and the ones that follow
+            total += 1 + a
+            events += e + 1
+        arrivals.append(total / float(cycles // repetitions))
+    return _ratio(np.array(losses), np.array(arrivals), repetitions - 1, level, events, "splitting")
+
+
+# **********************************************************************************************************************
+# Buffer sizing
+# **********************************************************************************************************************
+def buffer_size(estimate, target, largest=1 << 12):
+    """Smallest QUEUE_SIZE with a loss probability below target, at the upper end of its confidence interval.
+
+    estimate(queue_size) returns a LossEstimate, e.g.
+    functools.partial(rareevent.importance_sampling, INTER_ARRIVAL, SERVICE_TIME, NUM_MACHINES).
+    The loss probability falls as the buffer grows: the size is found by
+    doubling, then bisection. Returns None if largest is not enough.
+    """
+    def small_enough(queue_size):
+        e = estimate(queue_size)
+        return e.probability + e.half_width <= target
+
+    low, high = 0, 1
+    while not small_enough(high):
+        low, high = high, 2 * high
+        if high > largest:
+            return None
+    while high - low > 1:
+        mid = (low + high) // 2
+        if small_enough(mid):
+            high = mid
+        else:
+            low = mid
+    return high
@@ -0,0 +1,191 @@
+import math
+import numpy as np
+from . import variates
+
+# **********************************************************************************************************************
+# Time-varying arrival rates - non-homogeneous Poisson arrivals, sampled in blocks by inversion or thinning
+# **********************************************************************************************************************
+#
+#   rate = rates.Diurnal(0.5, 0.8, period=86400, peak=14*3600)
+#   packet_arrival = NHPPArrival(env, rate)                             # SimPy
+#   packet_arrival = fastsim.HeapArrival(env, 1/rate.mean, rates.inter_arrivals(rate, rng))   # event heap
+#
+# A rate function gives the arrival rate (packets per time unit) at time t, for a scalar or an array of times.
+# Piecewise rates have a closed-form integral and are sampled by inversion: unit-rate exponential gaps are mapped
+# through the inverse of the integrated rate. Other rates are sampled by thinning (Lewis and Shedler, 1979): candidates
+# are drawn at the peak rate and kept with probability rate(t) / peak. Either way arrivals are drawn a block at a time
+# with numpy, so a multi-day horizon costs about one array operation per block.
+
+
+class Piecewise(object):
+    """Rate values[i] from edges[i] until edges[i+1], values[-1] after the last edge (edges[0] must be 0).
+
+    With a period, the steps repeat every period time units (edges must lie
+    within it), e.g. hourly rates of a day.
+    """
+    __slots__ = ('edges', 'values', 'period', 'area', 'max', 'mean')
+
+    def __init__(self, edges, values, period=None):
+        self.edges = np.asarray(edges, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+        if len(self.edges) != len(self.values) or not len(self.edges) or self.edges[0] != 0:
+            raise ValueError("edges and values must have the same length, and edges must start at 0")
+        if (np.diff(self.edges) <= 0).any() or (self.values < 0).any():
+            raise ValueError("edges must increase and rates must not be negative")
+        if period is not None and self.edges[-1] >= period:
+            raise ValueError("edges must lie within the period")
+        if period is not None and not (self.values > 0).any():
+            raise ValueError("a periodic rate must not be 0 all along")
+        self.period = period
+        end = period if period is not None else self.edges[-1]
+        # integral of the rate up to each edge, and up to the end of the steps
+        lengths = np.diff(np.append(self.edges, end))
+        self.area = np.concatenate(([0.0], np.cumsum(self.values * lengths)))
+        self.max = float(self.values.max())
+        # mean rate over a period, or over the steps before the last one (a hint if the rate is not periodic)
+        self.mean = self.area[-1] / end if end > 0 else float(self.values[-1])
+
+    def __call__(self, t):
+        t = np.asarray(t, dtype=float)
+        if self.period is not None:
+            t = np.mod(t, self.period)
+        return self.values[np.searchsorted(self.edges, t, side='right') - 1]
+
+    def cumulative(self, t):
+        """Integral of the rate from 0 to t"""
+        t = np.asarray(t, dtype=float)
+        base = 0.0
+        if self.period is not None:
+            k = np.floor(t / self.period)
+            base = k * self.area[-1]
+            t = t - k * self.period
+        i = np.searchsorted(self.edges, t, side='right') - 1
+        return base + self.area[i] + self.values[i] * (t - self.edges[i])
+
+    def inverse(self, y):
+        """Earliest time t with cumulative(t) = y"""
+        y = np.asarray(y, dtype=float)
+        base = 0.0
+        if self.period is not None:
+            k = np.floor(y / self.area[-1])
+            base = k * self.period
+            y = y - k * self.area[-1]
+        # the step where the integral reaches y: steps with a zero rate are skipped over
+        i = np.minimum(np.searchsorted(self.area, y, side='left'), len(self.values)) - 1
+        i = np.maximum(i, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = self.edges[i] + np.where(self.values[i] > 0, (y - self.area[i]) / self.values[i], 0.0)
+        if self.period is None and self.values[-1] == 0:
+            # no more arrivals once the rate drops to 0 for good
+            t = np.where(y > self.area[-1], np.inf, t)
+        return base + t
+
+
+class Diurnal(object):
+    """Day/night cycle: mean * (1 + amplitude * cos(2 pi (t - peak) / period)), 0 <= amplitude <= 1
+
+    """
+    __slots__ = ('mean', 'amplitude', 'period', 'peak', 'max')
+
+    def __init__(self, mean, amplitude, period, peak=0.0):
+        if not 0 <= amplitude <= 1:
+            raise ValueError("amplitude must be between 0 and 1")
+        self.mean = mean
+        self.amplitude = amplitude
+        self.period = period
+        self.peak = peak
+        self.max = mean * (1 + amplitude)
+
+    def __call__(self, t):
+        return self.mean * (1 + self.amplitude * np.cos(2 * math.pi * (np.asarray(t, dtype=float) - self.peak)
+                                                        / self.period))
+
+
+def fit(timestamps, width, period=None):
+    """Piecewise rate fitted to recorded arrival timestamps: arrivals per bin of width time units.
+
+    With a period (a multiple of width), bins at the same phase of every
+    period are averaged together, e.g. the hourly profile of a week of
+    traffic with width=3600 and period=86400.
+    """
+    t = np.asarray(timestamps, dtype=float)
+    t = t - t[0]
+    end = t[-1] if len(t) > 1 else width
+    if period is None:
+        bins = max(1, int(math.ceil(end / width)))
+        counts = np.bincount(np.minimum((t // width).astype(np.int64), bins - 1), minlength=bins)
+        return Piecewise(np.arange(bins) * float(width), counts / float(width))
+    bins = int(round(period / width))
+    if not np.isclose(bins * width, period):
+        raise ValueError("period must be a multiple of width")
+    counts = np.bincount(((t % period) // width).astype(np.int64) % bins, minlength=bins)
+    # time observed at each phase: the whole periods, plus the phases covered by the last partial one
+    seen = np.full(bins, (end // period) * width)
+    seen += np.clip(end % period - np.arange(bins) * width, 0, width)
+    return Piecewise(np.arange(bins) * float(width), counts / np.maximum(seen, width), period)
+
+
+# **********************************************************************************************************************
+# Sampling
+# **********************************************************************************************************************
+class Inhomogeneous(object):
+    """draw(n) of a variates pool: the next n inter-arrival times of a Poisson process with a time-varying rate
+
+    Rates with an inverse (Piecewise) are sampled by inversion, others by
+    thinning against peak (rate.max by default), which must bound the rate.
+    The time of the last arrival drawn is kept, so successive blocks follow
+    each other; candidates kept beyond n wait for the next block.
+    """
+    __slots__ = ('rate', 'rng', 'peak', 'last', 'pending', 'frontier')
+
+    def __init__(self, rate, rng, peak=None):
+        self.rate = rate
+        self.rng = rng
+        self.peak = peak if peak is not None else getattr(rate, 'max', None)
+        if not hasattr(rate, 'inverse') and not self.peak:
+            raise ValueError("thinning needs an upper bound of the rate (peak)")
+        self.last = 0.0
+        # thinning: arrivals kept but not returned yet, and the time up to which candidates were drawn
+        self.pending = np.empty(0)
+        self.frontier = 0.0
+
+    def __call__(self, n):
+        if hasattr(self.rate, 'inverse'):
+            times = self._inversion(n)
+        else:
+            times = self._thinning(n)
+        with np.errstate(invalid='ignore'):
+            gaps = np.diff(times, prepend=self.last)
+        # inf - inf once a rate has dropped to 0 for good: no more arrivals
+        gaps[np.isnan(gaps)] = np.inf
+        self.last = times[-1]
+        return gaps
+
+    def _inversion(self, n):
+        if self.last == np.inf:
+            return np.full(n, np.inf)
+        y = self.rate.cumulative(self.last) + np.cumsum(self.rng.exponential(1.0, n))
+        return self.rate.inverse(y)
+
+    def _thinning(self, n):
+        parts = [self.pending]
+        kept = len(self.pending)
+        start = self.frontier
+        while kept < n:
+            # enough candidates for the rest of the block, if the rate is about its mean
+            m = int((n - kept) * self.peak / max(getattr(self.rate, 'mean', self.peak), 1e-12) * 1.1) + 64
+            t = start + np.cumsum(self.rng.exponential(1.0 / self.peak, m))
+            start = t[-1]
+            t = t[self.rng.uniform(0.0, self.peak, m) < self.rate(t)]
+            parts.append(t)
+            kept += len(t)
+        self.frontier = start
+        times = np.concatenate(parts)
+        self.pending = times[n:]
+        return times[:n]
+
+
+def inter_arrivals(rate, rng=None, peak=None):
+    """Pool of the inter-arrival times of a Poisson process of the given rate function (see variates.Variates)"""
+    rng = rng if rng is not None else np.random.default_rng()
+    return variates.Variates(Inhomogeneous(rate, rng, peak), 1.0 / rate.mean, rng)
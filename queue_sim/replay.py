@@ -0,0 +1,87 @@
+import csv
+import itertools
+import numpy as np
+
+# **********************************************************************************************************************
+# Trace replay - recorded arrival timestamps (and service demands) read lazily, chunk by chunk
+# **********************************************************************************************************************
+#
+#   packets = replay.packets(replay.csv_chunks("requests.csv", skiprows=1), time=0, demand=2)
+#   env.process(TraceArrival(env, packets).arrival_process(server_farm))
+#
+# A reader yields chunks of records: 2-D float arrays for CSV, arrays of the given dtype for binary files and .npy
+# files (opened as memmaps). packets() turns them into (inter_arrival, demand) pairs; only one chunk is in memory.
+
+CHUNK = 1 << 16
+
+
+def csv_chunks(path, chunk=CHUNK, delimiter=",", skiprows=0):
+    """Chunks of the rows of a CSV file of numbers, as (rows, columns) float arrays"""
+    with open(path, newline="") as f:
+        rows = csv.reader(f, delimiter=delimiter)
+        for _ in range(skiprows):
+            next(rows, None)
+        while True:
+            block = list(itertools.islice(rows, chunk))
+            if not block:
+                return
+            yield np.array(block, dtype=float)
+
+
+def binary_chunks(path, dtype=np.float64, chunk=CHUNK):
+    """Chunks of a raw file of fixed-size records (e.g. a structured dtype, or a column of traces)"""
+    dtype = np.dtype(dtype)
+    with open(path, "rb") as f:
+        while True:
+            block = np.fromfile(f, dtype=dtype, count=chunk)
+            if not len(block):
+                return
+            yield block
+
+
+def array_chunks(a, chunk=CHUNK):
+    """Chunks of an array, e.g. a memmap: slices, nothing is read before it is needed"""
+    for i in range(0, len(a), chunk):
+        yield a[i:i + chunk]
+
+
+def npy_chunks(path, chunk=CHUNK):
+    """Chunks of a .npy file, memory-mapped"""
+    return array_chunks(np.load(path, mmap_mode="r"), chunk)
+
+
+def _column(chunk, key):
+    """Field key of a structured chunk, column key of a 2-D one, the chunk itself if it is 1-D"""
+    if chunk.dtype.names is not None:
+        return chunk[key]
+    if chunk.ndim == 2:
+        return chunk[:, key]
+    return chunk
+
+
+def packets(chunks, time=0, demand=None, timestamps=True):
+    """(inter_arrival, service demand) of each packet of a trace, demand None if there is no demand column.
+
+    time and demand name a column of the chunks (an index, or a field of a
+    structured dtype). Timestamps must be sorted; they are shifted so that
+    the first packet arrives at time 0. With timestamps=False the time
+    column already holds inter-arrival times.
+    """
+    last = None
+    for chunk in chunks:
+        t = np.asarray(_column(chunk, time), dtype=float)
+        if not len(t):
+            continue
+        if timestamps:
+            if last is None:
+                last = t[0]
+            ia = np.diff(t, prepend=last)
+            last = t[-1]
+        else:
+            ia = t
+        if (ia < 0).any():
+            raise ValueError("arrival timestamps must be sorted")
+        if demand is None:
+            yield from zip(ia.tolist(), itertools.repeat(None))
+        else:
+            yield from zip(ia.tolist(), np.asarray(_column(chunk, demand), dtype=float).tolist())
@@ -0,0 +1,245 @@
+import functools
+import heapq
+import random
+
+# **********************************************************************************************************************
+# Routing - policies that pick the server of each arrival for PacketArrivalMod and its fastsim counterpart
+# **********************************************************************************************************************
+#
+# A router is attached to the list of servers before the first arrival. Routers that depend on the state of the
+# queues install a listener on each server, called whenever its qsize changes, and keep an index up to date
+# instead of scanning the servers at every arrival.
+
+
+class IndexSet(object):
+    """Set of server indexes with O(1) add, discard and uniform choice
+
+    """
+    __slots__ = ('items', 'pos')
+
+    def __init__(self, items=()):
+        self.items = []
+        self.pos = {}
+        for i in items:
+            self.add(i)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, i):
+        return i in self.pos
+
+    def add(self, i):
+        if i not in self.pos:
+            self.pos[i] = len(self.items)
+            self.items.append(i)
+
+    def discard(self, i):
+        k = self.pos.pop(i, None)
+        if k is None:
+            return
+        last = self.items.pop()
+        if last != i:
+            self.items[k] = last
+            self.pos[last] = k
+
+    def choice(self, u):
+        """Element picked by the uniform sample u in [0, 1)"""
+        return self.items[int(u * len(self.items))]
+
+
+class AliasTable(object):
+    """Walker's alias method: O(1) sampling of an index with real-valued weights
+
+    """
+    __slots__ = ('n', 'prob', 'alias')
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("weights must contain at least one positive value")
+        scaled = [w * n / total for w in weights]
+        self.n = n
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, w in enumerate(scaled) if w < 1.0]
+        large = [i for i, w in enumerate(scaled) if w >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+
+    def sample(self, u):
+        """Index picked by the uniform sample u in [0, 1)"""
+        x = u * self.n
+        i = int(x)
+        return i if x - i < self.prob[i] else self.alias[i]
+
+
+def _capacity(server):
+    return getattr(server, 'n_servers', 1)
+
+
+class Router(object):
+    """Base class: uniform is the source of U(0, 1) samples, random.random by default
+
+    """
+    def __init__(self, uniform=None):
+        self.uniform = uniform if uniform is not None else random.random
+        self.servers = []
+
+    def attach(self, servers):
+        self.servers = servers
+
+    def listen(self):
+        """Installs a listener on every server, called with its index when its qsize changes"""
+        for i, server in enumerate(self.servers):
+            server.listener = functools.partial(self.changed, i)
+
+    def changed(self, i):
+        pass
+
+    def pick(self):
+        raise NotImplementedError
+
+
+class Weighted(Router):
+    """Random routing with (real-valued) weights.
+
+    With avoid_full, an arrival that would land on a full queue is redrawn a
+    few times, then sent to a uniformly chosen non-full queue. The non-full
+    queues are kept in an IndexSet, so nothing is scanned.
+    """
+    RETRIES = 3
+
+    def __init__(self, weights, avoid_full=True, uniform=None):
+        super(Weighted, self).__init__(uniform)
+        self.table = AliasTable(weights)
+        self.avoid_full = avoid_full
+        self.non_full = IndexSet()
+
+    def attach(self, servers):
+        super(Weighted, self).attach(servers)
+        if self.avoid_full:
+            self.non_full = IndexSet(i for i, s in enumerate(servers) if s.qsize < s.qsize_limit)
+            self.listen()
+
+    def changed(self, i):
+        server = self.servers[i]
+        if server.qsize < server.qsize_limit:
+            self.non_full.add(i)
+        else:
+            self.non_full.discard(i)
+
+    def pick(self):
+        i = self.table.sample(self.uniform())
+        if not self.avoid_full or i in self.non_full:
+            return i
+        for _ in range(self.RETRIES):
+            i = self.table.sample(self.uniform())
+            if i in self.non_full:
+                return i
+        return self.non_full.choice(self.uniform()) if self.non_full else i
+
+
+class JoinShortestQueue(Router):
+    """Sends each arrival to a queue with the fewest packets, ties broken at random.
+
+    Queues are kept in buckets by qsize; since qsize moves by one at a time
+    the lowest non-empty bucket is found in O(1) amortized time. Buckets are
+    added as queues grow, so an unbounded buffer (qsize_limit inf) costs
+    only the longest queue seen.
+    """
+    def attach(self, servers):
+        super(JoinShortestQueue, self).attach(servers)
+        self.level = [s.qsize for s in servers]
+        self.buckets = []
+        for i, q in enumerate(self.level):
+            self._bucket(q).add(i)
+        self.lowest = min(self.level)
+        self.listen()
+
+    def _bucket(self, q):
+        while len(self.buckets) <= q:
+            self.buckets.append(IndexSet())
+        return self.buckets[q]
+
+    def changed(self, i):
+        q = self.servers[i].qsize
+        self.buckets[self.level[i]].discard(i)
+        self._bucket(q).add(i)
+        self.level[i] = q
+        if q < self.lowest:
+            self.lowest = q
+
+    def pick(self):
+        while not self.buckets[self.lowest]:
+            self.lowest += 1
+        return self.buckets[self.lowest].choice(self.uniform())
+
+
+class PowerOfD(Router):
+    """Samples d queues (by weights, uniformly if None) and joins the shortest of them
+
+    """
+    def __init__(self, d=2, weights=None, uniform=None):
+        super(PowerOfD, self).__init__(uniform)
+        self.d = d
+        self.weights = weights
+        self.table = None
+
+    def attach(self, servers):
+        super(PowerOfD, self).attach(servers)
+        self.table = AliasTable(self.weights if self.weights is not None else [1.0] * len(servers))
+
+    def pick(self):
+        servers = self.servers
+        best = self.table.sample(self.uniform())
+        for _ in range(self.d - 1):
+            i = self.table.sample(self.uniform())
+            if servers[i].qsize < servers[best].qsize:
+                best = i
+        return best
+
+
+class LeastLoaded(Router):
+    """Sends each arrival where its expected delay, (qsize + 1) * s_time / n_servers, is the smallest.
+
+    Loads sit in a heap with lazy invalidation: a change pushes a new entry
+    and stale ones are dropped when they reach the top.
+    """
+    def attach(self, servers):
+        super(LeastLoaded, self).attach(servers)
+        self.version = [0] * len(servers)
+        self.heap = [(self.load(i), i, 0) for i in range(len(servers))]
+        heapq.heapify(self.heap)
+        self.listen()
+
+    def load(self, i):
+        server = self.servers[i]
+        return (server.qsize + 1) * server.s_time / _capacity(server)
+
+    def changed(self, i):
+        self.version[i] += 1
+        heapq.heappush(self.heap, (self.load(i), i, self.version[i]))
+        if len(self.heap) > 4 * len(self.servers) + 64:
+            self.heap = [(self.load(k), k, self.version[k]) for k in range(len(self.servers))]
+            heapq.heapify(self.heap)
+
+    def pick(self):
+        heap = self.heap
+        while heap[0][2] != self.version[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0][1]
+
+
+POLICIES = {
+    "weighted": Weighted,
+    "jsq": JoinShortestQueue,
+    "power_of_d": PowerOfD,
+    "least_loaded": LeastLoaded,
+}
@@ -0,0 +1,157 @@
+import math
+import numpy as np
+from . import collectors
+from . import replications
+
+# **********************************************************************************************************************
+# Run control - warm-up detection (MSER-5) and early stopping on the relative precision of a confidence interval
+# **********************************************************************************************************************
+#
+#   control = runcontrol.run(env, servers, SIM_TIME, precision=0.01)
+#
+# runs env (a simpy.Environment or a fastsim.EventKernel) until the confidence interval of the mean response time is
+# within 1% of the mean, or until SIM_TIME at most. The initial transient found by MSER-5 is removed from the
+# re_times of every server. Servers must keep their per-packet history (streaming=False).
+
+# MSER-5: the response times are averaged in batches of 5 before looking for the truncation point
+MSER_BATCH = 5
+# batch means after the warm-up, for the confidence interval of a single run
+BATCHES = 20
+# fewest samples in a batch mean before a confidence interval is trusted
+MIN_BATCH = 10
+# first check after CHECK_EVERY time units, then at times growing by GROWTH, so checking costs O(n) in all
+CHECK_EVERY = 1000
+GROWTH = 1.5
+
+
+def mser(samples, batch=MSER_BATCH):
+    """Truncation point of samples by MSER-batch, a multiple of batch.
+
+    Batch means Y_j are formed, and the point d minimizing the squared
+    standard error of the mean of Y_d..Y_k is chosen among the first half
+    of the series; a point at the end of that half means that the series is
+    still in its transient.
+    """
+    y = collectors.as_array(samples)
+    k = len(y) // batch
+    if k < 2:
+        return 0
+    b = y[:k * batch].reshape(k, batch).mean(axis=1)
+    s1 = np.cumsum(b[::-1])[::-1]
+    s2 = np.cumsum((b * b)[::-1])[::-1]
+    n = np.arange(k, 0, -1, dtype=float)
+    stat = (s2 - s1 * s1 / n) / (n * n)
+    return int(np.argmin(stat[:k // 2 + 1])) * batch
+
+
+def losses(server_farm):
+    """1 for each lost arrival, 0 for each admitted one, in arrival order"""
+    indicators = np.zeros(server_farm.arrived, dtype=np.int64)
+    indicators[collectors.as_array(server_farm.lost_arrivals)] = 1
+    return indicators
+
+
+def after_warmup(indicators, d):
+    """Loss indicators of the arrivals that follow the d-th admitted one, the packets of re_times[d:] and the losses
+    among them"""
+    if not d:
+        return indicators
+    return indicators[np.searchsorted(np.cumsum(1 - indicators), d) + 1:]
+
+
+def _batch_sums(samples, batches):
+    """(sum, count) of each of batches consecutive batches of samples"""
+    edges = np.linspace(0, len(samples), batches + 1).astype(np.int64)
+    sums = np.add.reduceat(samples, edges[:-1]) if len(samples) else np.zeros(batches)
+    counts = np.diff(edges)
+    return np.where(counts > 0, sums, 0.0), counts
+
+
+def _pooled(series, batches, level):
+    """Confidence interval of the mean of several series, from packet-weighted batch means across servers"""
+    sums = np.zeros(batches)
+    counts = np.zeros(batches)
+    for samples in series:
+        s, c = _batch_sums(samples, batches)
+        sums += s
+        counts += c
+    if counts.min() < MIN_BATCH:
+        return replications.Estimate(sums.sum() / counts.sum() if counts.sum() else math.nan, math.inf)
+    return replications.Estimate(sums.sum() / counts.sum(),
+                                 replications.confidence_interval(list(sums / counts), level).half_width)
+
+
+class Control(object):
+    """Outcome of a controlled run.
+
+    warmup is the number of response times found to be transient on each
+    server, response_time and loss_rate are replications.Estimate of what
+    follows it; time is when the run stopped and converged whether the
+    precision target was met by then.
+    """
+    __slots__ = ('warmup', 'response_time', 'loss_rate', 'time', 'converged')
+
+    def __init__(self, warmup, response_time, loss_rate, time=None, converged=False):
+        self.warmup = warmup
+        self.response_time = response_time
+        self.loss_rate = loss_rate
+        self.time = time
+        self.converged = converged
+
+    def precision(self, target):
+        """Half width relative to the mean of the target estimate ("response_time" or "loss_rate")"""
+        e = getattr(self, target)
+        return e.half_width / abs(e.mean) if e.mean else math.inf
+
+    def __repr__(self):
+        return "Control(time=%g, warmup=%r, response_time=%g +- %g, loss_rate=%g +- %g%s)" % (
+            self.time, self.warmup, self.response_time.mean, self.response_time.half_width,
+            self.loss_rate.mean, self.loss_rate.half_width, "" if self.converged else ", not converged")
+
+
+def analyze(servers, level=0.95, batches=BATCHES):
+    """Warm-up and confidence intervals of the statistics collected so far by servers"""
+    warmup = []
+    re_times = []
+    lost = []
+    settled = True
+    for s in servers:
+        y = collectors.as_array(s.re_times)
+        d = mser(y)
+        # a truncation point at the end of the first half: still in the transient
+        if d and d >= (len(y) // MSER_BATCH) // 2 * MSER_BATCH:
+            settled = False
+        warmup.append(d)
+        re_times.append(y[d:])
+        lost.append(after_warmup(losses(s), d))
+    control = Control(warmup, _pooled(re_times, batches, level), _pooled(lost, batches, level))
+    if not settled:
+        control.response_time = control.response_time._replace(half_width=math.inf)
+        control.loss_rate = control.loss_rate._replace(half_width=math.inf)
+    return control
+
+
+def truncate(servers, warmup):
+    """Removes the first warmup[i] response times of servers[i]"""
+    for s, d in zip(servers, warmup):
+        del s.re_times[:d]
+
+
+def run(env, servers, until, precision, targets=("response_time",), level=0.95, check_every=CHECK_EVERY):
+    """Runs env until every target reaches the relative precision, or until `until`; returns a Control.
+
+    The warm-up of each server is removed from its re_times. A target with
+    a zero mean (e.g. a loss rate with no losses) never converges, and the
+    run goes on to `until`.
+    """
+    step = check_every
+    while True:
+        env.run(min(env.now + step, until))
+        control = analyze(servers, level)
+        control.converged = all(control.precision(t) <= precision for t in targets)
+        if control.converged or env.now >= until:
+            break
+        step *= GROWTH
+    control.time = env.now
+    truncate(servers, control.warmup)
+    return control
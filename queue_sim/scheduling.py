@@ -0,0 +1,360 @@
+import collections
+import functools
+import heapq
+import random
+from . import collectors
+from . import fastsim
+
+# **********************************************************************************************************************
+# Scheduling - packet classes, and disciplines other than FCFS, on the event-heap kernel of fastsim
+# **********************************************************************************************************************
+#
+#   classes = [scheduling.TrafficClass("interactive", 0.5), scheduling.TrafficClass("bulk", 4.0)]
+#   server_farm = scheduling.ClassService(env, 1, QUEUE_SIZE, classes, "preemptive", SIM_TIME)
+#   fastsim.HeapArrival(env, 2.0).start(server_farm.port(0))
+#   fastsim.HeapArrival(env, 8.0).start(server_farm.port(1))
+#
+# Disciplines: "fcfs", "priority" (non-preemptive, class 0 first), "preemptive" (preemptive-resume priority), "sjf"
+# (shortest job first, non-preemptive), "wfq" (weighted fair queuing between classes, self-clocked) and "ps"
+# (processor sharing). A packet's service demand is drawn when it arrives, so that sjf and wfq can look at it.
+#
+# Classes and disciplines exist on the event-heap kernel only: the SimPy Service of netsimutils serves its packets
+# FCFS, and a ClassService built on a simpy.Environment raises a TypeError. Scenarios that need a discipline run with
+# ENGINE = "fast".
+#
+# Each class keeps its own re_times, arrivals and losses. The server is a HeapService with a ready queue in place of
+# its FIFO: it keeps the aggregate statistics (re_times, lost, dynamic_QS, lost_arrivals, arrived_s, lost_s), counted
+# by the same admission and departure steps, and its qsize, qsize_limit and listener, so it can be routed to like any
+# other server. A preempted packet's departure stays in the kernel heap and is skipped when it
+# comes up, as are the departures that processor sharing reschedules.
+
+
+class TrafficClass(object):
+    """A class of packets: mean service time (exponential from rand, or the random module if None, unless variates
+    is given), WFQ weight and statistics
+
+    queue_size caps the packets of the class in the system, on top of the
+    QUEUE_SIZE of the server; fair queuing needs it, or the class served
+    least ends up holding the whole buffer.
+    """
+    __slots__ = ('name', 's_time', 'weight', 'queue_size', 'qsize', 're_times', 'arrived', 'lost', '_draw')
+
+    def __init__(self, name, s_time, weight=1.0, variates=None, queue_size=None, rand=None):
+        self.name = name
+        self.s_time = s_time
+        self.weight = weight
+        self.queue_size = queue_size
+        self.qsize = 0
+        self.re_times = collectors.times()
+        self.arrived = 0
+        self.lost = 0
+        if variates is not None:
+            self._draw = variates
+        else:
+            self._draw = functools.partial((random if rand is None else rand).expovariate, 1.0/s_time)
+
+    def __repr__(self):
+        return "TrafficClass(%r, %d arrived, %d lost)" % (self.name, self.arrived, self.lost)
+
+
+class Job(object):
+    __slots__ = ('cls', 'arrival', 'demand', 'remaining', 'start', 'end', 'epoch')
+
+    def __init__(self, cls, arrival, demand):
+        self.cls = cls
+        self.arrival = arrival
+        self.demand = demand
+        self.remaining = demand
+        self.start = None
+        self.end = None
+        # bumped when the job is (re)started or preempted: departures of older epochs are stale
+        self.epoch = 0
+
+
+# **********************************************************************************************************************
+# Ready queues
+# **********************************************************************************************************************
+class FCFSQueue(object):
+    __slots__ = ('jobs',)
+
+    def __init__(self, classes):
+        self.jobs = collections.deque()
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def push(self, job):
+        self.jobs.append(job)
+
+    def pop(self):
+        return self.jobs.popleft()
+
+
+class PriorityQueue(object):
+    """One FIFO bucket per class, class 0 served first; preempted jobs go back to the head of their bucket
+
+    """
+    __slots__ = ('buckets', 'size')
+
+    def __init__(self, classes):
+        self.buckets = [collections.deque() for _ in classes]
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, job):
+        self.buckets[job.cls].append(job)
+        self.size += 1
+
+    def push_front(self, job):
+        self.buckets[job.cls].appendleft(job)
+        self.size += 1
+
+    def pop(self):
+        for bucket in self.buckets:
+            if bucket:
+                self.size -= 1
+                return bucket.popleft()
+        raise IndexError("pop from an empty queue")
+
+
+class SJFQueue(object):
+    """Heap of jobs by service demand, FIFO among equal demands
+
+    """
+    __slots__ = ('heap', 'seq')
+
+    def __init__(self, classes):
+        self.heap = []
+        self.seq = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, job):
+        heapq.heappush(self.heap, (job.demand, self.seq, job))
+        self.seq += 1
+
+    def pop(self):
+        return heapq.heappop(self.heap)[2]
+
+
+class WFQQueue(object):
+    """Self-clocked fair queuing: jobs are served by finish tag, max(V, last tag of the class) + demand / weight.
+
+    V is the tag of the job last taken into service, so a class that was
+    idle does not get credit for the time it did not use.
+    """
+    __slots__ = ('heap', 'seq', 'weights', 'last', 'virtual')
+
+    def __init__(self, classes):
+        self.heap = []
+        self.seq = 0
+        self.weights = [float(c.weight) for c in classes]
+        self.last = [0.0] * len(classes)
+        self.virtual = 0.0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def tag(self, job):
+        """Finish tag of a job that has just arrived; it counts for its class whether the job waits or not"""
+        tag = max(self.virtual, self.last[job.cls]) + job.demand / self.weights[job.cls]
+        self.last[job.cls] = tag
+        return tag
+
+    def push(self, job):
+        heapq.heappush(self.heap, (self.tag(job), self.seq, job))
+        self.seq += 1
+
+    def pop(self):
+        tag, _, job = heapq.heappop(self.heap)
+        self.virtual = tag
+        return job
+
+    def serve(self, job):
+        """Tags a job that has just arrived and goes into service at once, as if it had been pushed and popped"""
+        self.virtual = self.tag(job)
+
+
+READY_QUEUES = {
+    "fcfs": FCFSQueue,
+    "priority": PriorityQueue,
+    "preemptive": PriorityQueue,
+    "sjf": SJFQueue,
+    "wfq": WFQQueue,
+}
+
+
+# **********************************************************************************************************************
+# Servers
+# **********************************************************************************************************************
+class Port(object):
+    """Entry of one class into a ClassService: what a HeapArrival is started on
+
+    """
+    __slots__ = ('server_farm', 'cls')
+
+    def __init__(self, server_farm, cls):
+        self.server_farm = server_farm
+        self.cls = cls
+
+    def arrive(self, demand=None):
+        self.server_farm.arrive(self.cls, demand)
+
+
+class ClassService(fastsim.HeapService):
+    """Pool of n_servers serving the packets of several classes with a discipline (see above)
+
+    s_time is the mean service time over the classes, for routing.LeastLoaded.
+    """
+    __slots__ = ('classes', 'discipline', 'ready', 'running')
+
+    def __init__(self, kernel, n_servers, QUEUE_SIZE, classes, discipline="fcfs", SIM_TIME=None):
+        if not isinstance(kernel, fastsim.EventKernel):
+            raise TypeError("scheduling disciplines run on a fastsim.EventKernel, not on %s: the SimPy Service is "
+                            "FCFS only" % type(kernel).__name__)
+        super(ClassService, self).__init__(kernel, n_servers, sum(c.s_time for c in classes) / len(classes),
+                                           QUEUE_SIZE, SIM_TIME)
+        self.classes = classes
+        self.discipline = discipline
+        self.ready = self._ready_queue(discipline)
+        # jobs in service
+        self.running = []
+
+    def port(self, cls):
+        return Port(self, cls)
+
+    def _ready_queue(self, discipline):
+        if discipline not in READY_QUEUES:
+            raise ValueError("unknown discipline %r for a ClassService (processor sharing is ProcessorSharing, or "
+                             "service(..., \"ps\"))" % (discipline,))
+        return READY_QUEUES[discipline](self.classes)
+
+    def _admit_job(self, cls, demand):
+        """Counts an arrival of class cls; returns its Job, or None if it is lost"""
+        c = self.classes[cls]
+        c.arrived += 1
+        if not self._admit(c.qsize == c.queue_size):
+            c.lost += 1
+            return None
+        c.qsize += 1
+        return Job(cls, self.kernel.now, c._draw() if demand is None else demand)
+
+    def _done(self, job):
+        now = self.kernel.now
+        c = self.classes[job.cls]
+        c.re_times.append(now - job.arrival)
+        c.qsize -= 1
+        self._leave(job.arrival)
+        if self.trace is not None:
+            self.trace(job.arrival, job.start, now)
+
+    def arrive(self, cls=0, demand=None):
+        job = self._admit_job(cls, demand)
+        if job is None:
+            return
+        if len(self.running) < self.n_servers:
+            if self.discipline == "wfq":
+                self.ready.serve(job)
+            self._start(job)
+            return
+        if self.discipline == "preemptive":
+            victim = max(self.running, key=lambda j: (j.cls, j.start))
+            if victim.cls > cls:
+                self._preempt(victim)
+                self._start(job)
+                return
+        self.ready.push(job)
+
+    def _start(self, job):
+        now = self.kernel.now
+        if job.start is None:
+            job.start = now
+        job.epoch += 1
+        job.end = now + job.remaining
+        self.running.append(job)
+        self.kernel.schedule(job.end, self._depart, (job, job.epoch))
+
+    def _preempt(self, job):
+        job.remaining = job.end - self.kernel.now
+        job.epoch += 1
+        self.running.remove(job)
+        self.ready.push_front(job)
+
+    def _depart(self, event):
+        job, epoch = event
+        if epoch != job.epoch:
+            return
+        self.running.remove(job)
+        self._done(job)
+        if self.ready:
+            self._start(self.ready.pop())
+
+
+class ProcessorSharing(ClassService):
+    """Every packet in the system is served at once, at rate min(1, n_servers / packets in the system).
+
+    Work is measured on a shared clock, the service a packet would have
+    received if it had been there from the start; each packet finishes
+    when the clock reaches its tag, clock at arrival + demand, so only the
+    smallest tag needs a departure event. Arrivals and departures change
+    the rate, and the departure is rescheduled (the old one is skipped).
+    """
+    __slots__ = ('jobs', 'work', 'updated', 'version', 'seq')
+
+    def __init__(self, kernel, n_servers, QUEUE_SIZE, classes, SIM_TIME=None):
+        super(ProcessorSharing, self).__init__(kernel, n_servers, QUEUE_SIZE, classes, "ps", SIM_TIME)
+        self.jobs = []
+        self.work = 0.0
+        self.updated = 0.0
+        self.version = 0
+        self.seq = 0
+
+    def _ready_queue(self, discipline):
+        # every packet is in service at once: nothing waits
+        return None
+
+    def _rate(self):
+        return min(1.0, self.n_servers / float(len(self.jobs))) if self.jobs else 0.0
+
+    def _advance(self):
+        now = self.kernel.now
+        self.work += self._rate() * (now - self.updated)
+        self.updated = now
+
+    def _reschedule(self):
+        self.version += 1
+        if self.jobs:
+            tag = self.jobs[0][0]
+            self.kernel.schedule(self.kernel.now + max(tag - self.work, 0.0) / self._rate(), self._depart,
+                                 self.version)
+
+    def arrive(self, cls=0, demand=None):
+        job = self._admit_job(cls, demand)
+        if job is None:
+            return
+        self._advance()
+        job.start = self.kernel.now
+        heapq.heappush(self.jobs, (self.work + job.demand, self.seq, job))
+        self.seq += 1
+        self._reschedule()
+
+    def _depart(self, version):
+        if version != self.version:
+            return
+        self._advance()
+        _, _, job = heapq.heappop(self.jobs)
+        self._done(job)
+        self._reschedule()
+
+
+def service(kernel, n_servers, QUEUE_SIZE, classes, discipline="fcfs", SIM_TIME=None):
+    """ClassService (or ProcessorSharing for "ps") with the given discipline, on kernel, a fastsim.EventKernel"""
+    if discipline == "ps":
+        return ProcessorSharing(kernel, n_servers, QUEUE_SIZE, classes, SIM_TIME)
+    return ClassService(kernel, n_servers, QUEUE_SIZE, classes, discipline, SIM_TIME)
+
+
+DISCIPLINES = tuple(READY_QUEUES) + ("ps",)
@@ -0,0 +1,187 @@
+import collections
+import importlib
+import random
+from . import collectors
+
+# **********************************************************************************************************************
+# Simulator - the scenarios of MM1.py and mixing_services.py as functions of a Config, returning a Result
+# **********************************************************************************************************************
+#
+#   result = simulator.run("n_services", ENGINE="fast", SIM_TIME=100000)
+#   result.total.mean_response_time, result.total.loss_rate, result.total.sketch.quantile(0.99)
+#   result.records()                      # the rows of batch.py
+#
+#   config = simulator.config("mixed_queues", NUM_MACHINES=8)
+#   results = [simulator.run("mixed_queues", config.replace(RANDOM_SEED=seed)) for seed in range(10)]
+#
+# Nothing is printed or plotted, and the constants of the scenario modules are read, never changed: a Config holds
+# them for one run. Importing this module loads neither matplotlib nor scipy, and the scenario modules (and SimPy) are
+# only imported by the first run. A run draws from its own random.Random, the RANDOM of its Config (a new one seeded
+# with RANDOM_SEED if None), and numpy generators seeded with RANDOM_SEED: the random module is left alone, so runs
+# in threads, or next to other code drawing from it, do not change each other's results.
+
+# the constants a scenario may read; a scenario module only defines those it uses
+FIELDS = ("RANDOM_SEED", "INTER_ARRIVAL", "SERVICE_TIME", "NUM_MACHINES", "QUEUE_SIZE", "SIM_TIME", "ENGINE",
+          "PRECISION", "PARALLEL_QUEUES", "DAY", "DIURNAL_AMPLITUDE", "SCALE_EVERY", "BOOT_TIME", "MAX_MACHINES",
+          "CHECKPOINT", "CHECKPOINT_EVERY", "TRACE", "RANDOM")
+
+# the modules the scenarios are defined in (in their SCENARIOS)
+MODULES = ("MM1", "mixing_services")
+
+
+class Config(object):
+    """The constants of a scenario for one run, by their module names (INTER_ARRIVAL, SIM_TIME, ...)
+
+    Fields not given are None; config() starts from the constants of the
+    scenario's module instead. RANDOM is the random.Random the run draws
+    from (the rand of the engines); with None the run makes its own,
+    seeded with RANDOM_SEED (see seeded()), and never draws from the
+    random module. A new RANDOM_SEED drops the RANDOM of a copy (unless
+    RANDOM is given too), as that stream no longer matches the seed.
+    """
+    __slots__ = FIELDS
+
+    def __init__(self, **settings):
+        for name in FIELDS:
+            setattr(self, name, None)
+        self._set(settings)
+
+    def _set(self, settings):
+        for name, value in settings.items():
+            if name not in FIELDS:
+                raise KeyError("no constant %s in a scenario config" % name)
+            setattr(self, name, value)
+
+    @classmethod
+    def from_module(cls, module):
+        """Config of the constants a module defines"""
+        return cls(**dict((k, getattr(module, k)) for k in FIELDS if hasattr(module, k)))
+
+    def replace(self, **changes):
+        """A copy with some fields changed"""
+        config = Config(**self.as_dict())
+        if "RANDOM_SEED" in changes and "RANDOM" not in changes:
+            config.RANDOM = None
+        config._set(changes)
+        return config
+
+    def as_dict(self):
+        return collections.OrderedDict((k, getattr(self, k)) for k in FIELDS)
+
+    def __eq__(self, other):
+        return isinstance(other, Config) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        return "Config(%s)" % ", ".join("%s=%r" % kv for kv in self.as_dict().items() if kv[1] is not None)
+
+
+# **********************************************************************************************************************
+# Results
+# **********************************************************************************************************************
+
+# statistics of a server, or of all of them: sketch is the collectors.Sketch of the response times
+Stats = collections.namedtuple("Stats", "packets lost served loss_rate mean_response_time sketch")
+
+
+def stats(server_farm):
+    """Stats of a server"""
+    sketch = collectors.sketch(server_farm.re_times)
+    packets = server_farm.arrived
+    lost = server_farm.lost
+    return Stats(packets, lost, sketch.count, lost / packets if packets else 0.0, sketch.mean, sketch)
+
+
+def pooled(stations):
+    """Stats of every packet of several servers (their sketches merged)"""
+    sketch = collectors.merged(s.sketch for s in stations)
+    packets = sum(s.packets for s in stations)
+    lost = sum(s.lost for s in stations)
+    return Stats(packets, lost, sketch.count, lost / packets if packets else 0.0, sketch.mean, sketch)
+
+
+class Result(object):
+    """Outcome of run().
+
+    arrivals and servers are the objects the scenario ran (for mixing_services
+    arrivals are the inter-arrival times of each server), control the
+    runcontrol.Control of a run with PRECISION, None otherwise; stations has
+    the Stats of each server, total those of every packet. config is the
+    one the run was given, without the RANDOM it made for itself: running
+    it again gives the same result.
+    """
+    __slots__ = ('scenario', 'config', 'arrivals', 'servers', 'control', 'stations', 'total')
+
+    def __init__(self, scenario, config, arrivals, servers, control=None):
+        self.scenario = scenario
+        self.config = config
+        self.arrivals = arrivals
+        self.servers = servers
+        self.control = control
+        self.stations = [stats(s) for s in servers]
+        self.total = pooled(self.stations)
+
+    def records(self):
+        """One flat record per server, plus an "all" record that pools every packet"""
+        return summarize(self.scenario, self.stations, self.total)
+
+    def __repr__(self):
+        return "Result(%s, %d servers, mean response time = %g, loss rate = %g)" % (
+            self.scenario, len(self.servers), self.total.mean_response_time, self.total.loss_rate)
+
+
+def summarize(scenario, stations, total):
+    """Records of Result.records(), from the Stats of each server and of all of them"""
+    records = []
+    for i, s in enumerate(list(stations) + [total]):
+        record = {
+            "scenario": scenario,
+            "server": "all" if i == len(stations) else i,
+            "packets": s.packets,
+            "lost": s.lost,
+            "loss_rate": s.loss_rate,
+            "served": s.served,
+            "mean_response_time": s.mean_response_time,
+        }
+        record.update(collectors.percentile_fields(s.sketch, "response_time"))
+        records.append(record)
+    return records
+
+
+# **********************************************************************************************************************
+# Runs
+# **********************************************************************************************************************
+def module(scenario):
+    """The module defining scenario"""
+    for name in MODULES:
+        m = importlib.import_module("." + name, __package__)
+        if scenario in m.SCENARIOS:
+            return m
+    raise KeyError("unknown scenario %s" % scenario)
+
+
+def scenarios():
+    return sorted(s for name in MODULES for s in importlib.import_module("." + name, __package__).SCENARIOS)
+
+
+def config(scenario, **settings):
+    """Config of scenario: the constants of its module, overridden by settings"""
+    return Config.from_module(module(scenario)).replace(**settings)
+
+
+def seeded(config):
+    """config itself if it has a RANDOM, otherwise a copy with a new random.Random seeded with RANDOM_SEED"""
+    if config.RANDOM is not None:
+        return config
+    return config.replace(RANDOM=random.Random(config.RANDOM_SEED))
+
+
+def run(scenario, config=None, **settings):
+    """Runs scenario with config (the constants of its module if None), overridden by settings; returns a Result
+
+    Unless config or settings give one, the run gets a RANDOM of its own,
+    seeded with RANDOM_SEED.
+    """
+    m = module(scenario)
+    c = (config if config is not None else Config.from_module(m)).replace(**settings)
+    arrivals, servers, control = m.SCENARIOS[scenario](seeded(c))
+    return Result(scenario, c, arrivals, servers, control)
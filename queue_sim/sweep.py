@@ -0,0 +1,127 @@
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import math
+import os
+import numpy as np
+from . import collectors
+from . import replications
+
+# **********************************************************************************************************************
+# Parameter sweeps - a scenario run over a grid of INTER_ARRIVAL, SERVICE_TIME, NUM_MACHINES, QUEUE_SIZE values
+# **********************************************************************************************************************
+#
+# Every point of the grid is cached on disk, keyed by the scenario, its parameters, the seed, the number of
+# replications and the code version, so running a sweep again only simulates the points that changed.
+
+CACHE_DIR = ".sweep_cache"
+
+# directory whose Python sources make up the code version: the whole simulator, this module included
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def code_version():
+    """Hash of the source of the simulator: any change to any of its modules invalidates the cache"""
+    h = hashlib.sha1()
+    for name in sorted(os.listdir(CODE_DIR)):
+        if name.endswith(".py"):
+            h.update(name.encode())
+            with open(os.path.join(CODE_DIR, name), "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+
+def grid(base, **axes):
+    """Every combination of the values in axes, on top of the base parameters
+
+    e.g. grid(params, INTER_ARRIVAL=[1, 2, 3], QUEUE_SIZE=[10, 50])
+    """
+    names = sorted(axes)
+    points = []
+    for values in itertools.product(*[axes[k] for k in names]):
+        p = dict(base)
+        p.update(zip(names, values))
+        points.append(p)
+    return points
+
+
+def point_key(scenario, params, seed, n, version):
+    text = json.dumps([scenario, sorted(params.items()), seed, n, version], default=str)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+# infinite and NaN figures (e.g. the half width of a run that did not converge), written as strings: standard JSON
+# has no literal for them
+NON_FINITE = {"Infinity": math.inf, "-Infinity": -math.inf, "NaN": math.nan}
+
+
+def _encode(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return "NaN" if math.isnan(value) else ("Infinity" if value > 0 else "-Infinity")
+    return value
+
+
+def _decode(value):
+    return NON_FINITE[value] if isinstance(value, str) and value in NON_FINITE else value
+
+
+def _load(path):
+    """The record cached in path, or None if there is none or it can't be read (a miss, simulated again)"""
+    try:
+        with open(path) as f:
+            return dict((k, _decode(v)) for k, v in json.load(f).items())
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _save(path, record):
+    """Writes record to path atomically, as checkpoint.save: readers never see half a file"""
+    tmp = "%s.%d.tmp" % (path, os.getpid())
+    with open(tmp, "w") as f:
+        json.dump(dict((k, _encode(v)) for k, v in record.items()), f, allow_nan=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _record(params, samples, level):
+    rt = replications.confidence_interval([s[0] for s in samples], level)
+    lr = replications.confidence_interval([s[1] for s in samples], level)
+    record = dict(params)
+    record.update(response_time=rt.mean, response_time_hw=rt.half_width,
+                  loss_rate=lr.mean, loss_rate_hw=lr.half_width, replications=len(samples))
+    record.update(collectors.percentile_fields(collectors.merged(s[2] for s in samples), "response_time"))
+    return record
+
+
+def sweep(scenario, points, n=1, seed=0, workers=None, cache_dir=CACHE_DIR, level=0.95):
+    """Runs n replications of scenario at each point, in parallel, reusing cached points.
+
+    All points use the same seeds (common random numbers), so differences
+    between neighbouring points are not blurred by sampling noise. Returns
+    one record per point: its parameters plus response_time, loss_rate,
+    their half widths (_hw), the number of replications and the percentiles
+    of the response times of all replications (p50_response_time, ...).
+    """
+    version = code_version()
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    records = [None] * len(points)
+    missing = []
+    for k, params in enumerate(points):
+        path = os.path.join(cache_dir, point_key(scenario, params, seed, n, version) + ".json") if cache_dir else None
+        records[k] = _load(path) if path else None
+        if records[k] is None:
+            missing.append((k, path))
+
+    if missing:
+        seeds = np.random.SeedSequence(seed).spawn(n)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            jobs = dict(((k, path), [pool.submit(replications.replica, scenario, points[k], s) for s in seeds])
+                        for k, path in missing)
+            for (k, path), futures in jobs.items():
+                records[k] = _record(points[k], [f.result() for f in futures], level)
+                if path:
+                    _save(path, records[k])
+    return records
@@ -0,0 +1,273 @@
+import collections
+import functools
+import random
+import numpy as np
+from . import collectors
+from . import fastsim
+from . import routing
+from . import variates
+
+# **********************************************************************************************************************
+# Topologies - networks of queues described as data and compiled onto the event-heap kernel of fastsim
+# **********************************************************************************************************************
+#
+#   spec = {
+#       "sources": {"in": {"inter_arrival": 2.0, "to": "lb"}},
+#       "routers": {"lb": {"policy": "jsq", "to": ["web0", "web1"]}},
+#       "stations": {
+#           "web0": {"service_time": 3.0, "queue_size": 50, "to": "db"},
+#           "web1": {"service_time": 3.0, "queue_size": 50, "to": "db"},
+#           "db": {"servers": 2, "service_time": 1.0, "queue_size": 100, "to": {"db": 0.1, "exit": 0.9}},
+#       },
+#   }
+#   net = topology.Network(spec)
+#   net.run(SIM_TIME)
+#
+# "to" is where a packet goes next: a node name, {name: probability} for a random branch (tandem and feedback
+# routing alike), or "exit" (the default) to leave the network. Routers pick one of their stations with a policy of
+# routing, on the state of the queues at arrival time. inter_arrival and service_time are the means of exponential
+# distributions drawn from the random.Random of the network (the random module by default), as in HeapArrival and
+# HeapService; a (name, args...) tuple instead
+# draws from variates.make(name, *args) on the numpy generator of the network.
+#
+# There is no process per packet or per station: sources, stations and routers are plain objects calling each
+# other, and only arrivals and departures go through the kernel's heap, so thousands of stations cost nothing
+# until they have packets.
+
+EXIT = "exit"
+
+
+class Station(fastsim.HeapService):
+    """HeapService that forwards its packets when they depart, remembering when they entered the network
+
+    """
+    __slots__ = ('name', 'next')
+
+    def __init__(self, kernel, name, n_servers, s_time, QUEUE_SIZE, SIM_TIME=None, variates=None, rand=None):
+        super(Station, self).__init__(kernel, n_servers, s_time, QUEUE_SIZE, SIM_TIME, variates, rand)
+        self.name = name
+        self.next = None
+
+    def arrive(self, born=None):
+        if self._admit():
+            now = self.kernel.now
+            self._enqueue((now, now if born is None else born))
+
+    def _start(self, packet):
+        now = self.kernel.now
+        self.kernel.schedule(now + self._draw(), self._depart, packet + (now,))
+
+    def _depart(self, packet):
+        t0, born, start = packet
+        self._leave(t0)
+        self._next()
+        if self.trace is not None:
+            self.trace(t0, start, self.kernel.now)
+        self.next.arrive(born)
+
+
+class Source(object):
+    """Stream of packets entering the network at one node, like HeapArrival
+
+    """
+    __slots__ = ('kernel', 'name', 'ia_times', 'next', '_draw')
+
+    def __init__(self, kernel, name, draw):
+        self.kernel = kernel
+        self.name = name
+        self.ia_times = collectors.times(single=True)
+        self.next = None
+        self._draw = draw
+
+    def start(self):
+        self._schedule()
+
+    def _schedule(self):
+        inter_arrival = self._draw()
+        self.ia_times.append(inter_arrival)
+        self.kernel.schedule(self.kernel.now + inter_arrival, self._arrival, None)
+
+    def _arrival(self, _):
+        self._schedule()
+        self.next.arrive(self.kernel.now)
+
+
+class Dispatch(object):
+    """Router node: sends each packet to the station picked by a routing policy
+
+    """
+    __slots__ = ('name', 'router', 'targets')
+
+    def __init__(self, name, router, targets):
+        self.name = name
+        self.router = router
+        self.targets = targets
+        router.attach(targets)
+
+    def arrive(self, born):
+        self.targets[self.router.pick()].arrive(born)
+
+
+class Branch(object):
+    """Random split with fixed probabilities, e.g. feedback to a station or exit
+
+    """
+    __slots__ = ('table', 'targets', 'uniform')
+
+    def __init__(self, targets, weights, uniform):
+        self.table = routing.AliasTable(weights)
+        self.targets = targets
+        self.uniform = uniform
+
+    def arrive(self, born):
+        self.targets[self.table.sample(self.uniform())].arrive(born)
+
+
+class Exit(object):
+    """Packets leaving the network: their end-to-end response times
+
+    """
+    __slots__ = ('kernel', 'sojourn')
+
+    def __init__(self, kernel):
+        self.kernel = kernel
+        self.sojourn = collectors.times()
+
+    def arrive(self, born):
+        self.sojourn.append(self.kernel.now - born)
+
+
+class Network(object):
+    """A spec (see above) compiled onto a fastsim.EventKernel
+
+    sources, routers and stations map names to the compiled nodes; exit
+    collects the end-to-end response times. rng is the numpy generator
+    used by (name, args...) distributions and by the random branches and
+    routers; the exponential defaults draw from rand, a random.Random, or
+    the random module if None. Without rng, a generator is seeded from
+    rand (or the random module) the first time one is needed, so a
+    seeded rand makes the whole network reproducible.
+    """
+    def __init__(self, spec, SIM_TIME=None, rng=None, kernel=None, rand=None):
+        self.kernel = kernel if kernel is not None else fastsim.EventKernel()
+        self.rng = rng
+        self.rand = rand
+        self.exit = Exit(self.kernel)
+        self.stations = collections.OrderedDict()
+        self.routers = collections.OrderedDict()
+        self.sources = collections.OrderedDict()
+        self.started = False
+        nodes = {EXIT: self.exit}
+
+        for name, s in spec.get("stations", {}).items():
+            pool = self._pool(s["service_time"])
+            s_time = pool.mean if pool is not None else s["service_time"]
+            self.stations[name] = nodes[name] = Station(self.kernel, name, s.get("servers", 1), s_time,
+                                                        s["queue_size"], SIM_TIME, pool, rand)
+        for name, r in spec.get("routers", {}).items():
+            targets = [self.stations[t] for t in r["to"]]
+            args = dict((k, v) for k, v in r.items() if k not in ("policy", "to"))
+            args.setdefault("uniform", self._uniform())
+            policy = r.get("policy", "weighted")
+            if policy == "weighted":
+                args.setdefault("weights", [1] * len(targets))
+            # a station has one listener: only one router may follow the state of its queue
+            before = [t.listener for t in targets]
+            self.routers[name] = nodes[name] = Dispatch(name, routing.POLICIES[policy](**args), targets)
+            if any(b is not None and t.listener is not b for b, t in zip(before, targets)):
+                raise ValueError("router %s watches a station already watched by another router" % name)
+        for name, s in spec.get("sources", {}).items():
+            draw = self._pool(s["inter_arrival"])
+            if draw is None:
+                draw = functools.partial((random if rand is None else rand).expovariate, 1.0/s["inter_arrival"])
+            self.sources[name] = Source(self.kernel, name, draw)
+
+        for name, s in spec.get("stations", {}).items():
+            self.stations[name].next = self._target(s.get("to", EXIT), nodes)
+        for name, s in spec.get("sources", {}).items():
+            self.sources[name].next = self._target(s["to"], nodes)
+
+    def _generator(self):
+        if self.rng is None:
+            self.rng = np.random.default_rng((random if self.rand is None else self.rand).getrandbits(64))
+        return self.rng
+
+    def _pool(self, dist):
+        """variates pool of a (name, args...) tuple, None for a mean (drawn from rand)"""
+        if isinstance(dist, (tuple, list)):
+            return variates.make(dist[0], *dist[1:], rng=self._generator())
+        return None
+
+    def _uniform(self):
+        return variates.uniform(0, 1, self._generator())
+
+    def _target(self, to, nodes):
+        if isinstance(to, dict):
+            return Branch([nodes[k] for k in to], list(to.values()), self._uniform())
+        return nodes[to]
+
+    @property
+    def now(self):
+        return self.kernel.now
+
+    def run(self, until):
+        if not self.started:
+            self.started = True
+            for source in self.sources.values():
+                source.start()
+        self.kernel.run(until)
+
+    @property
+    def lost(self):
+        return sum(s.lost for s in self.stations.values())
+
+    def servers(self):
+        return list(self.stations.values())
+
+
+# **********************************************************************************************************************
+# Specs - the layouts of mixing_services, and multi-tier meshes
+# **********************************************************************************************************************
+def mixed_queues(INTER_ARRIVAL, SERVICE_TIME, NUM_MACHINES, QUEUE_SIZE):
+    """mixing_services.mixed_queues: a fast server and NUM_MACHINES slow ones, each with its own source"""
+    spec = {"sources": {}, "stations": {}}
+    for i in range(NUM_MACHINES + 1):
+        fast = i == 0
+        spec["sources"]["in%d" % i] = {"inter_arrival": INTER_ARRIVAL*2*(1 if fast else NUM_MACHINES),
+                                       "to": "server%d" % i}
+        spec["stations"]["server%d" % i] = {"service_time": SERVICE_TIME/NUM_MACHINES if fast else SERVICE_TIME,
+                                            "queue_size": QUEUE_SIZE}
+    return spec
+
+
+def mixed_queues_losses_avoidance(INTER_ARRIVAL, SERVICE_TIME, NUM_MACHINES, QUEUE_SIZE):
+    """mixing_services.mixed_queues_losses_avoidance: one source, weighted routing avoiding full queues"""
+    names = ["server%d" % i for i in range(NUM_MACHINES + 1)]
+    return {
+        "sources": {"in": {"inter_arrival": INTER_ARRIVAL, "to": "lb"}},
+        "routers": {"lb": {"policy": "weighted", "weights": [NUM_MACHINES] + [1]*NUM_MACHINES, "to": names}},
+        "stations": dict((name, {"service_time": SERVICE_TIME/NUM_MACHINES if i == 0 else SERVICE_TIME,
+                                 "queue_size": QUEUE_SIZE}) for i, name in enumerate(names)),
+    }
+
+
+def tiers(inter_arrival, layers, policy="jsq", feedback=0.0):
+    """Mesh of tiers traversed in order: layers is a list of (stations, service_time, queue_size).
+
+    Each tier is a router (policy) over its stations; with feedback, a
+    packet leaving the last tier goes back to the first with that
+    probability.
+    """
+    spec = {"sources": {"in": {"inter_arrival": inter_arrival, "to": "tier0"}}, "routers": {}, "stations": {}}
+    for k, (n, s_time, queue_size) in enumerate(layers):
+        names = ["tier%d.%d" % (k, i) for i in range(n)]
+        spec["routers"]["tier%d" % k] = {"policy": policy, "to": names}
+        if k + 1 < len(layers):
+            to = "tier%d" % (k + 1)
+        elif feedback:
+            to = {"tier0": feedback, EXIT: 1.0 - feedback}
+        else:
+            to = EXIT
+        for name in names:
+            spec["stations"][name] = {"service_time": s_time, "queue_size": queue_size, "to": to}
+    return spec
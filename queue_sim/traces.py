@@ -0,0 +1,117 @@
+import functools
+import os
+import numpy as np
+
+# **********************************************************************************************************************
+# Packet traces - per-packet records streamed to append-only column files, read back zero-copy with numpy.memmap
+# **********************************************************************************************************************
+#
+#   sink = traces.TraceSink("run.trace")
+#   sink.attach(servers)                 # Service or fastsim.HeapService, record queue = index in servers
+#   env.run(SIM_TIME)
+#   sink.close()
+#   t = traces.load("run.trace")          # {"arrival": memmap, "queue": memmap, ...}
+#
+# A trace is a directory with one raw little-endian file per column. A packet is written when it is done with: at its
+# departure, or at its arrival if it is dropped (start and departure are then NaN), so records are in completion
+# order. Records are buffered and written BLOCK at a time; load() can read a trace while it is still being written,
+# and sees every block flushed so far.
+
+COLUMNS = (
+    ("arrival", np.dtype("<f8")),
+    ("queue", np.dtype("<i4")),
+    ("admitted", np.dtype("u1")),
+    ("start", np.dtype("<f8")),
+    ("departure", np.dtype("<f8")),
+)
+
+BLOCK = 1 << 16
+
+NAN = float("nan")
+
+
+class TraceSink(object):
+    """Buffers (queue, arrival, start, departure) tuples and appends them to the column files of path
+
+    A sink can be pickled with the simulation (see checkpoint): the files
+    are then cut back to the records written at that time when the
+    simulation is loaded, so a resumed run writes the same trace.
+    """
+    __slots__ = ('path', 'block', 'written', '_rows', '_files')
+
+    def __init__(self, path, block=BLOCK):
+        self.path = path
+        self.block = block
+        self.written = 0
+        self._rows = []
+        os.makedirs(path, exist_ok=True)
+        self._files = [open(_column(path, name), "wb") for name, _ in COLUMNS]
+
+    def attach(self, servers):
+        """Traces the packets of servers, queue i being servers[i]"""
+        for i, server_farm in enumerate(servers):
+            server_farm.trace = functools.partial(self.record, i)
+
+    def record(self, queue, arrival, start, departure):
+        rows = self._rows
+        rows.append((queue, arrival, start, departure))
+        if len(rows) >= self.block:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        a = np.array(self._rows, dtype=float)
+        self._rows = []
+        columns = {
+            "arrival": a[:, 1],
+            "queue": a[:, 0],
+            "admitted": ~np.isnan(a[:, 2]),
+            "start": a[:, 2],
+            "departure": a[:, 3],
+        }
+        for (name, dtype), f in zip(COLUMNS, self._files):
+            f.write(columns[name].astype(dtype).tobytes())
+            f.flush()
+        self.written += len(a)
+
+    def close(self):
+        self.flush()
+        for f in self._files:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        self.flush()
+        return self.path, self.block, self.written
+
+    def __setstate__(self, state):
+        self.path, self.block, self.written = state
+        self._rows = []
+        self._files = []
+        for name, dtype in COLUMNS:
+            f = open(_column(self.path, name), "r+b")
+            f.truncate(self.written * dtype.itemsize)
+            f.seek(0, os.SEEK_END)
+            self._files.append(f)
+
+
+def _column(path, name):
+    return os.path.join(path, name)
+
+
+def load(path):
+    """{column: read-only memmap} of the records of the trace in path flushed so far"""
+    n = min(os.path.getsize(_column(path, name)) // dtype.itemsize for name, dtype in COLUMNS)
+    columns = {}
+    for name, dtype in COLUMNS:
+        if n:
+            columns[name] = np.memmap(_column(path, name), dtype=dtype, mode="r", shape=(n,))
+        else:
+            columns[name] = np.empty(0, dtype=dtype)
+    return columns
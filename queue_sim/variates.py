@@ -0,0 +1,124 @@
+import functools
+import numpy as np
+
+# **********************************************************************************************************************
+# Random variates - samples drawn in large blocks from a numpy Generator and served one at a time
+# **********************************************************************************************************************
+
+BLOCK = 1 << 14
+
+
+class Variates(object):
+    """Pool of samples of one distribution.
+
+    Calling the object returns the next sample; the pool is refilled with
+    draw(BLOCK) when it runs out, so the per-event cost is an iterator step
+    instead of a call into the random module. sample(n) returns n samples
+    at once, as an array, for the batched engines.
+
+    draw is a partial of a Generator method (not a lambda), so that a pool,
+    its generator and the samples left in it can be pickled (see checkpoint).
+    """
+    __slots__ = ('draw', 'mean', 'rng', 'block', '_next')
+
+    def __init__(self, draw, mean, rng=None, block=BLOCK):
+        self.draw = draw
+        self.mean = mean
+        self.rng = rng
+        self.block = block
+        self._next = iter(()).__next__
+
+    def __call__(self):
+        try:
+            return self._next()
+        except StopIteration:
+            self._next = iter(self.draw(self.block).tolist()).__next__
+            return self._next()
+
+    def sample(self, n):
+        return self.draw(n)
+
+    def __getstate__(self):
+        # the bound __next__ of the pool cannot be pickled, its iterator (and position) can
+        return self.draw, self.mean, self.rng, self.block, self._next.__self__
+
+    def __setstate__(self, state):
+        self.draw, self.mean, self.rng, self.block, pool = state
+        self._next = pool.__next__
+
+
+def _rng(rng):
+    return rng if rng is not None else np.random.default_rng()
+
+
+def exponential(mean, rng=None):
+    rng = _rng(rng)
+    return Variates(functools.partial(rng.exponential, mean), mean, rng)
+
+
+def _constant(value, n):
+    return np.full(n, value)
+
+
+def deterministic(value, rng=None):
+    return Variates(functools.partial(_constant, float(value)), value, rng)
+
+
+def uniform(low, high, rng=None):
+    rng = _rng(rng)
+    return Variates(functools.partial(rng.uniform, low, high), (low + high)/2.0, rng)
+
+
+def erlang(k, mean, rng=None):
+    """Sum of k exponential phases, with the given overall mean"""
+    rng = _rng(rng)
+    return Variates(functools.partial(rng.gamma, k, mean/k), mean, rng)
+
+
+def _mixture(rng, p, m, n):
+    return rng.exponential(m[rng.choice(len(m), n, p=p)])
+
+
+def hyperexponential(probabilities, means, rng=None):
+    """Exponential with mean means[i], chosen with probability probabilities[i]"""
+    rng = _rng(rng)
+    p = np.asarray(probabilities, dtype=float)
+    p /= p.sum()
+    m = np.asarray(means, dtype=float)
+    return Variates(functools.partial(_mixture, rng, p, m), float(p @ m), rng)
+
+
+def lognormal(mean, sigma, rng=None):
+    """Lognormal with the given mean; sigma is the standard deviation of the underlying normal"""
+    rng = _rng(rng)
+    mu = np.log(mean) - sigma*sigma/2.0
+    return Variates(functools.partial(rng.lognormal, mu, sigma), mean, rng)
+
+
+def _pareto(rng, alpha, scale, n):
+    return scale * (1.0 + rng.pareto(alpha, n))
+
+
+def pareto(alpha, mean, rng=None):
+    """Pareto (type I) with shape alpha > 1 and the given mean"""
+    if alpha <= 1:
+        raise ValueError("the mean of a Pareto distribution is finite only for alpha > 1")
+    rng = _rng(rng)
+    scale = mean * (alpha - 1) / alpha
+    return Variates(functools.partial(_pareto, rng, alpha, scale), mean, rng)
+
+
+DISTRIBUTIONS = {
+    "exponential": exponential,
+    "deterministic": deterministic,
+    "uniform": uniform,
+    "erlang": erlang,
+    "hyperexponential": hyperexponential,
+    "lognormal": lognormal,
+    "pareto": pareto,
+}
+
+
+def make(name, *args, **kwargs):
+    """Variates of the distribution called name, e.g. make("erlang", 3, SERVICE_TIME, rng=rng)"""
+    return DISTRIBUTIONS[name](*args, **kwargs)
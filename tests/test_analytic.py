@@ -0,0 +1,51 @@
+import math
+import pytest
+from queue_sim import analytic, replications
+
+
+def test_mm1k_matches_the_geometric_distribution():
+    rho, K = 0.8, 10
+    s = analytic.mm1k(1.0, rho, K)
+    p = [(1 - rho) * rho ** n / (1 - rho ** (K + 1)) for n in range(K + 1)]
+    assert s.blocking == pytest.approx(p[K])
+    assert s.mean_in_system == pytest.approx(sum(n * pn for n, pn in enumerate(p)))
+    assert s.response_time == pytest.approx(s.mean_in_system / (1 - p[K]))
+    assert s.response_time - s.waiting_time == pytest.approx(rho)
+
+
+def test_mmck_tends_to_erlang_c():
+    c, a = 3, 2.4
+    s = analytic.mmck(1.0, a, c, 400)
+    rho = a / c
+    tail = a ** c / math.factorial(c) / (1 - rho)
+    erlang_c = tail / (sum(a ** k / math.factorial(k) for k in range(c)) + tail)
+    assert s.blocking == pytest.approx(0.0, abs=1e-12)
+    assert s.mean_queue == pytest.approx(erlang_c * rho / (1 - rho))
+    assert s.waiting_time == pytest.approx(erlang_c * a / (c - a))
+
+
+def test_unit_scales_times_and_rates():
+    s, us = analytic.mmck(2.0, 3.0, 2, 6), analytic.mmck(2.0, 3.0, 2, 6, unit=1000.0)
+    assert us.blocking == s.blocking
+    assert us.mean_in_system == pytest.approx(s.mean_in_system)
+    assert us.response_time == pytest.approx(1000.0 * s.response_time)
+    assert us.throughput == pytest.approx(s.throughput / 1000.0)
+
+
+def test_no_room_loses_every_arrival():
+    s = analytic.mmck(1.0, 0.5, 2, 0)
+    assert s.blocking == 1.0 and s.throughput == 0.0
+    assert math.isnan(s.response_time)
+    with pytest.raises(ValueError):
+        analytic.mmck(1.0, 0.5, 0, 5)
+    with pytest.raises(ValueError):
+        analytic.mmck(1.0, 0.5, 1, -1)
+
+
+@pytest.mark.parametrize("scenario", sorted(analytic.CLOSED_FORMS))
+def test_simulator_agrees_with_every_closed_form(scenario):
+    assert scenario in replications.SCENARIOS
+    params = {"INTER_ARRIVAL": 1.0, "SERVICE_TIME": 1.6, "NUM_MACHINES": 2, "QUEUE_SIZE": 6, "SIM_TIME": 20000}
+    report = analytic.validate(scenario, params, n=8, seed=3, workers=1)
+    for exact, simulated, half_width, within in report.values():
+        assert within or abs(exact - simulated) <= 2 * half_width
@@ -0,0 +1,38 @@
+import csv
+import json
+import pytest
+from queue_sim import batch
+
+
+@pytest.mark.parametrize("text, value", [("100000", 100000), ("0.5", 0.5), ("None", None), ("False", False),
+                                         ("'x'", "x"), ("[1, 2]", [1, 2]), ("fast", "fast")])
+def test_parse_value(text, value):
+    assert batch.parse_value(text) == value
+
+
+def test_unknown_constant_is_an_error(capsys):
+    with pytest.raises(SystemExit):
+        batch.main(["n_services", "--set", "SIM_TYME=10"])
+    assert "SIM_TYME" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        batch.main(["n_services", "--set", "RANDOM=1"])
+
+
+def test_same_seed_writes_the_same_results(tmp_path):
+    out = [str(tmp_path / "a.json"), str(tmp_path / "b.json")]
+    for path in out:
+        batch.main(["n_services", "--engine", "fast", "--seed", "7", "--set", "SIM_TIME=2000", "--output", path])
+    with open(out[0]) as a, open(out[1]) as b:
+        records = json.load(a)
+        assert json.load(b) == records
+    assert records[-1]["server"] == "all" and records[-1]["packets"] > 0
+
+
+def test_csv_has_a_row_per_record(tmp_path):
+    path = str(tmp_path / "r.csv")
+    records = batch.run("n_services", "fast", 7, {"SIM_TIME": 2000})
+    batch.write(records, "csv", path)
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == len(records)
+    assert [int(r["packets"]) for r in rows] == [r["packets"] for r in records]
@@ -0,0 +1,33 @@
+import pytest
+from queue_sim import bench
+
+
+@pytest.mark.parametrize("topology", bench.TOPOLOGIES)
+def test_engines_see_the_same_packets(topology):
+    fast = bench.measure(topology, "fast", 0.8, 2000)
+    simpy = bench.measure(topology, "simpy", 0.8, 2000)
+    assert fast["packets"] == simpy["packets"] > 0
+    # the heap schedules an arrival and at most a departure per packet, SimPy several events per process step
+    assert fast["packets"] <= fast["events"] <= 2 * fast["packets"] + 2 * bench.NUM_MACHINES
+    assert simpy["events"] > fast["events"]
+    assert fast["case"] == "%s/fast/rho=0.8/T=2000" % topology
+
+
+def test_run_measures_in_a_fresh_process():
+    (r,) = bench.run([("mm1", "fast", 0.5, 1000)])
+    assert r == dict(r, case="mm1/fast/rho=0.5/T=1000", packets=bench.measure("mm1", "fast", 0.5, 1000)["packets"])
+    assert r["peak_rss_mb"] > 0
+
+
+def _result(case, events_per_s, packets_per_s, peak_rss_mb):
+    return {"case": case, "events_per_s": events_per_s, "packets_per_s": packets_per_s, "peak_rss_mb": peak_rss_mb}
+
+
+def test_compare_flags_slower_and_bigger_cases():
+    baseline = [_result("a", 100.0, 50.0, 20.0), _result("b", 100.0, 50.0, 20.0)]
+    results = [_result("a", 95.0, 50.0, 21.0), _result("b", 80.0, 50.0, 30.0), _result("new", 1.0, 1.0, 1.0)]
+    rows, regressions = bench.compare(results, baseline)
+    assert len(rows) == 6
+    assert [(case, figure) for case, figure, old, new, ratio in regressions] == [("b", "events_per_s"),
+                                                                                 ("b", "peak_rss_mb")]
+    assert bench.compare(results, baseline, tolerance=0.6)[1] == []
@@ -0,0 +1,62 @@
+import os
+import random
+import numpy as np
+import pytest
+from queue_sim import checkpoint, fastsim, variates
+
+SIM_TIME = 3000
+
+
+def _model(source):
+    """A mixed farm drawing from the random module, a random.Random or variates pools"""
+    kernel = fastsim.EventKernel()
+    rand = random.Random(5) if source == "rand" else None
+    rng = np.random.default_rng(5) if source == "pools" else None
+    servers = [fastsim.HeapService(kernel, 1, 0.25, 10, SIM_TIME, rand=rand,
+                                   variates=variates.exponential(0.25, rng) if rng else None)]
+    servers += [fastsim.HeapService(kernel, 1, 1.0, 10, SIM_TIME, rand=rand,
+                                    variates=variates.exponential(1.0, rng) if rng else None) for _ in range(4)]
+    p = fastsim.HeapArrivalMod(kernel, 0.14, rand=rand, variates=variates.exponential(0.14, rng) if rng else None)
+    p.start(servers, [4, 1, 1, 1, 1])
+    return kernel, (p, servers)
+
+
+def _outcome(objects):
+    p, servers = objects
+    return [(list(s.re_times), s.lost, s.arrived) for s in servers]
+
+
+class Crash(Exception):
+    pass
+
+
+@pytest.mark.parametrize("source", ["random", "rand", "pools"])
+def test_resumed_run_is_the_uninterrupted_one(source, tmp_path, monkeypatch):
+    random.seed(1)
+    kernel, objects = _model(source)
+    kernel.run(SIM_TIME)
+    expected = _outcome(objects)
+
+    path = str(tmp_path / "run.ckpt")
+    save = checkpoint.save
+    saved = []
+
+    def crash_on_second_save(*args):
+        save(*args)
+        saved.append(args[0])
+        if len(saved) == 2:
+            raise Crash()
+
+    random.seed(1)
+    monkeypatch.setattr(checkpoint, "save", crash_on_second_save)
+    with pytest.raises(Crash):
+        checkpoint.run(*_model(source), until=SIM_TIME, path=path, every=500)
+    monkeypatch.setattr(checkpoint, "save", save)
+    assert os.path.exists(path)
+
+    # a different state of the random module and fresh objects: both are replaced by the checkpoint
+    random.seed(99)
+    kernel, objects = checkpoint.run(*_model(source), until=SIM_TIME, path=path, every=500)
+    assert kernel.now == SIM_TIME
+    assert _outcome(objects) == expected
+    assert not os.path.exists(path)
@@ -0,0 +1,61 @@
+import random
+import numpy as np
+import pytest
+import simpy
+from queue_sim import collectors, fastsim, netsimutils, runcontrol
+
+
+def test_collectors_use_the_smallest_type():
+    assert collectors.times().itemsize == 8
+    assert collectors.times(single=True).itemsize == 4
+    assert collectors.counts(50).itemsize == 1
+    assert collectors.counts(1000).itemsize == 2
+    c = collectors.counts(50)
+    c.extend([3, 1, 4])
+    assert c.view().tolist() == [3, 1, 4]
+
+
+def test_per_packet_statistics_fit_in_a_few_bytes():
+    env = simpy.Environment()
+    rand = random.Random(1)
+    server_farm = netsimutils.Service(env, 1, 0.95, 10, 50000, rand=rand)
+    packet_arrival = netsimutils.PacketArrival(env, 1.0, rand=rand)
+    env.process(packet_arrival.arrival_process(server_farm))
+    env.run(50000)
+
+    held = sum(c.itemsize * len(c) for c in (server_farm.re_times, server_farm.dynamic_QS, server_farm.lost_arrivals,
+                                             packet_arrival.ia_times))
+    # response time, queue length and inter-arrival time; the few losses take their own index
+    assert held / server_farm.arrived < 14
+    lost = runcontrol.losses(server_farm)
+    assert len(lost) == server_farm.arrived
+    assert lost.sum() == server_farm.lost > 0
+    # a lost arrival found the buffer full
+    assert np.all(collectors.as_array(server_farm.dynamic_QS)[lost == 1] == 10)
+
+
+@pytest.mark.parametrize("engine", ["simpy", "fast"])
+def test_dynamic_loss_keeps_the_running_count_per_arrival(engine):
+    # dynamic_LOSS is the lost count after each arrival, as it always was; lost_arrivals is what is stored
+    rand = random.Random(2)
+    if engine == "fast":
+        env = fastsim.EventKernel()
+        server_farm = fastsim.HeapService(env, 1, 1.2, 5, rand=rand)
+        fastsim.HeapArrival(env, 1.0, rand=rand).start(server_farm)
+    else:
+        env = simpy.Environment()
+        server_farm = netsimutils.Service(env, 1, 1.2, 5, rand=rand)
+        env.process(netsimutils.PacketArrival(env, 1.0, rand=rand).arrival_process(server_farm))
+    env.run(2000)
+    running = server_farm.dynamic_LOSS
+    assert len(running) == server_farm.arrived and running[-1] == server_farm.lost > 0
+    np.testing.assert_array_equal(np.flatnonzero(np.diff(running, prepend=0)), server_farm.lost_arrivals)
+
+
+def test_streaming_dynamic_loss_is_the_last_count():
+    env = simpy.Environment()
+    server_farm = netsimutils.Service(env, 1, 1.2, 5, streaming=True, rand=random.Random(2))
+    env.process(netsimutils.PacketArrival(env, 1.0, rand=random.Random(3)).arrival_process(server_farm))
+    env.run(2000)
+    assert len(server_farm.dynamic_LOSS) == server_farm.arrived
+    assert server_farm.dynamic_LOSS.value == server_farm.lost > 0
@@ -0,0 +1,52 @@
+import random
+import simpy
+from queue_sim import fastsim, netsimutils
+
+
+def simpy_run(n_servers, arrival_time, s_time, queue_size, until, seed):
+    env = simpy.Environment()
+    rand = random.Random(seed)
+    server_farm = netsimutils.Service(env, n_servers, s_time, queue_size, until, rand=rand)
+    env.process(netsimutils.PacketArrival(env, arrival_time, rand=rand).arrival_process(server_farm))
+    env.run(until)
+    return server_farm
+
+
+def heap_run(n_servers, arrival_time, s_time, queue_size, until, seed):
+    env = fastsim.EventKernel()
+    rand = random.Random(seed)
+    server_farm = fastsim.HeapService(env, n_servers, s_time, queue_size, until, rand=rand)
+    fastsim.HeapArrival(env, arrival_time, rand=rand).start(server_farm)
+    env.run(until)
+    return server_farm
+
+
+def test_heap_kernel_reproduces_simpy_for_the_same_seed():
+    for n_servers in (1, 4):
+        a = simpy_run(n_servers, 2.0, 9.0, 50, 20000, 45)
+        b = heap_run(n_servers, 2.0, 9.0, 50, 20000, 45)
+        assert (a.arrived, a.lost, a.qsize) == (b.arrived, b.lost, b.qsize)
+        assert a.lost > 0
+        assert list(a.re_times) == list(b.re_times)
+        assert list(a.dynamic_QS) == list(b.dynamic_QS)
+
+
+def test_routed_arrivals_reproduce_simpy():
+    weights = [4, 1, 1, 1, 1]
+    simpy_env = simpy.Environment()
+    rand = random.Random(3)
+    slow = [netsimutils.Service(simpy_env, 1, 9.0 / 4 if i == 0 else 9.0, 20, 5000, rand=rand) for i in range(5)]
+    simpy_env.process(netsimutils.PacketArrivalMod(simpy_env, 1.0, rand=rand).arrival_process(slow, weights))
+    simpy_env.run(5000)
+
+    env = fastsim.EventKernel()
+    rand = random.Random(3)
+    fast = [fastsim.HeapService(env, 1, 9.0 / 4 if i == 0 else 9.0, 20, 5000, rand=rand) for i in range(5)]
+    fastsim.HeapArrivalMod(env, 1.0, rand=rand).start(fast, weights)
+    env.run(5000)
+
+    def outcome(servers):
+        return [(s.arrived, s.lost, list(s.re_times)) for s in servers]
+
+    assert outcome(slow) == outcome(fast)
+    assert env.scheduled > 0
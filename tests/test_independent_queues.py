@@ -0,0 +1,34 @@
+from queue_sim import analytic, simulator
+
+
+def run(engine):
+    return simulator.run("n_independent_queues", ENGINE=engine, PARALLEL_QUEUES=True, SIM_TIME=20000,
+                         INTER_ARRIVAL=0.8, SERVICE_TIME=3.0, QUEUE_SIZE=10)
+
+
+def test_parallel_queues_are_reproducible_and_independent():
+    for engine in ("fast", "simpy"):
+        first, second = run(engine), run(engine)
+        assert [s[:4] for s in first.stations] == [s[:4] for s in second.stations]
+        # each worker has a stream of its own
+        assert len(set(s.packets for s in first.stations)) == len(first.stations)
+
+
+def test_parallel_queues_agree_with_the_closed_form():
+    result = run("fast")
+    exact = analytic.n_independent_queues(simulator.config("n_independent_queues", INTER_ARRIVAL=0.8,
+                                                           SERVICE_TIME=3.0, QUEUE_SIZE=10).as_dict())
+    assert abs(result.total.loss_rate - exact.blocking) < 0.01
+
+
+def test_queue_size_is_plotted_on_the_time_scale_of_the_config(monkeypatch):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from queue_sim import MM1, plotting
+    periods = []
+    monkeypatch.setattr(plt, "show", lambda: plt.close("all"))
+    monkeypatch.setattr(plotting, "draw_trace", lambda ax, y, x_scale=1.0: periods.append(x_scale))
+    c = MM1.config(ENGINE="fast", SIM_TIME=500, NUM_MACHINES=3, INTER_ARRIVAL=0.5)
+    MM1.n_independent_queues(c=c)
+    assert set(periods) == {1.0, 1.5}
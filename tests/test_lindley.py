@@ -0,0 +1,47 @@
+import collections
+import numpy as np
+from queue_sim import analytic, fastsim
+
+
+def reference(arrivals, services, limit):
+    """Packet by packet FCFS single server with limit places: (departures, admitted, packets found)"""
+    busy = collections.deque()
+    last = 0.0
+    departures, admitted, found = [], [], []
+    for t, s in zip(arrivals, services):
+        while busy and busy[0] <= t:
+            busy.popleft()
+        found.append(len(busy))
+        if len(busy) >= limit:
+            admitted.append(False)
+            departures.append(np.nan)
+            continue
+        last = max(t, last) + s
+        busy.append(last)
+        admitted.append(True)
+        departures.append(last)
+    return np.array(departures), np.array(admitted), np.array(found)
+
+
+def test_batched_recursion_matches_packet_by_packet():
+    rng = np.random.default_rng(7)
+    # a load above 1, so that blocks are cut by losses and the scalar runs are exercised too
+    arrivals = np.cumsum(rng.exponential(1.0, 20000))
+    services = rng.exponential(1.1, 20000)
+    server_farm = fastsim.LindleyService(1.1, 10, arrivals[-1] + 1e9)
+    server_farm.run(arrivals, services)
+
+    departures, admitted, found = reference(arrivals, services, 10)
+    assert server_farm.lost == np.count_nonzero(~admitted) > 0
+    assert server_farm.arrived == len(arrivals)
+    np.testing.assert_array_equal(server_farm.lost_arrivals, np.flatnonzero(~admitted))
+    np.testing.assert_array_equal(server_farm.dynamic_LOSS, np.cumsum(~admitted))
+    np.testing.assert_array_equal(server_farm.dynamic_QS, found + admitted)
+    np.testing.assert_allclose(server_farm.re_times, (departures - arrivals)[admitted])
+
+
+def test_mm1k_agrees_with_the_closed_form():
+    _, server_farm = fastsim.mm1k(1.0, 0.9, 5, 200000, np.random.default_rng(3))
+    exact = analytic.mm1k(1.0, 0.9, 5)
+    assert abs(server_farm.lost / server_farm.arrived - exact.blocking) < 0.01
+    assert abs(np.mean(server_farm.re_times) - exact.response_time) < 0.05 * exact.response_time
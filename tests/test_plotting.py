@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from queue_sim import collectors, plotting
+
+
+def test_decimate_keeps_the_peaks():
+    y = np.random.default_rng(1).exponential(1.0, 100003)
+    x, env = plotting.decimate(y, 2000)
+    assert len(env) <= 2002 and len(x) == len(env)
+    assert env.max() == y.max() and env.min() == y.min()
+    assert np.all(np.diff(x) >= 0)
+    short = np.arange(10.0)
+    np.testing.assert_array_equal(plotting.decimate(short, 2000)[1], short)
+
+
+def test_histogram_and_cdf_match_the_samples():
+    y = np.random.default_rng(2).exponential(1.0, 50000)
+    edges, density = plotting.histogram(y, 50)
+    assert (density * np.diff(edges)).sum() == pytest.approx(1.0)
+    edges, f = plotting.cdf(y, 50)
+    assert f[-1] == pytest.approx(1.0)
+    np.testing.assert_allclose(f, [np.mean(y <= e) for e in edges[1:]], atol=1e-12)
+
+
+def test_rate_keeps_the_number_of_events():
+    series = collectors.TimeSeries(1)
+    series.add_many(np.sort(np.random.default_rng(3).uniform(0, 10000, 20000)))
+    times, r = plotting.rate(series, 100)
+    assert len(r) <= 100
+    assert (r * (times[1] - times[0])).sum() == pytest.approx(20000)
+
+
+@pytest.mark.parametrize("n, shape", [(1, (1, 1)), (4, (1, 4)), (5, (2, 3)), (9, (3, 3)), (10, (3, 4))])
+def test_grid_shape(n, shape):
+    assert plotting.grid_shape(n) == shape
+
+
+def test_server_grid_draws_a_panel_per_server():
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    drawn = []
+    fig = plotting.server_grid("t", ["a", "b", "c", "d", "e"], lambda ax, i, item: drawn.append((i, item)))
+    assert drawn == list(enumerate("abcde"))
+    assert sum(ax.get_visible() for ax in fig.axes) == 5
+
+
+@pytest.mark.parametrize("n", [0, -1])
+def test_no_panel_is_an_error(n):
+    with pytest.raises(ValueError):
+        plotting.grid_shape(n)
+    with pytest.raises(ValueError):
+        plotting.server_grid("t", [None] * max(n, 0), lambda ax, i, item: None)
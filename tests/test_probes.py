@@ -0,0 +1,57 @@
+import io
+import random
+import simpy
+from queue_sim import netsimutils, probes
+
+
+def _run(profile=None):
+    env = simpy.Environment()
+    rand = random.Random(3)
+    server_farm = netsimutils.Service(env, 1, 1.2, 5, 1000, rand=rand)
+    packet_arrival = netsimutils.PacketArrival(env, 1.0, rand=rand)
+    env.process(packet_arrival.arrival_process(server_farm))
+    if profile is None:
+        env.run(1000)
+    else:
+        profile.attach(packet_arrival, server_farm)
+        profile.run(env, 1000)
+    return packet_arrival, server_farm
+
+
+def test_profile_counts_every_phase_and_leaves_the_run_unchanged():
+    profile = probes.Profile(every=8)
+    packet_arrival, server_farm = _run(profile)
+    counts = dict(zip(probes.PHASES, profile.counts))
+    assert counts["arrival"] == len(packet_arrival.ia_times)
+    assert counts["drop"] == server_farm.lost > 0
+    assert counts["admit"] == server_farm.arrived - server_farm.lost
+    assert counts["depart"] == len(server_farm.re_times)
+    assert counts["start"] - counts["depart"] in (0, 1)
+    assert counts["route"] == 0
+
+    plain = _run()[1]
+    assert list(plain.re_times) == list(server_farm.re_times)
+    assert plain.lost == server_farm.lost
+
+
+def test_one_call_in_every_is_timed():
+    profile = probes.Profile(every=4)
+    for k in range(10):
+        profile.leave(probes.ARRIVAL, profile.enter(probes.ARRIVAL))
+    assert profile.counts[probes.ARRIVAL] == 10
+    assert profile.timed[probes.ARRIVAL] == 3
+    assert profile.estimate(probes.ARRIVAL) >= 0.0
+    assert profile.estimate(probes.DEPART) == 0.0
+
+
+def test_report_splits_the_wall_time():
+    profile = probes.Profile(every=1)
+    _run(profile)
+    r = profile.report()
+    assert r["wall"] > 0
+    assert r["model"] == sum(p["seconds"] for p in r["phases"].values())
+    assert r["scheduling"] == max(r["wall"] - r["model"], 0.0)
+    out = io.StringIO()
+    profile.dump(out)
+    assert [line.split()[0] for line in out.getvalue().splitlines()] == [
+        "phase", "arrival", "admit", "drop", "start", "depart", "model", "scheduling", "wall"]
@@ -0,0 +1,56 @@
+import functools
+import numpy as np
+import pytest
+from queue_sim import analytic, rareevent, variates
+
+
+@pytest.mark.parametrize("n_servers, queue_size", [(1, 20), (3, 25)])
+def test_importance_sampling_matches_mmck(n_servers, queue_size):
+    arrival_time, s_time = 1.0, 0.5 * n_servers
+    exact = analytic.mmck(arrival_time, s_time, n_servers, queue_size).blocking
+    assert exact < 1e-5
+    e = rareevent.importance_sampling(arrival_time, s_time, n_servers, queue_size, precision=0.05,
+                                      rng=np.random.default_rng(1))
+    assert e.relative_error <= 0.05
+    assert abs(e.probability - exact) <= 3 * e.half_width
+    assert e.brute_force_events > 100 * e.events
+
+
+def test_splitting_matches_mmck():
+    exact = analytic.mm1k(1.0, 0.6, 12).blocking
+    rng = np.random.default_rng(2)
+    e = rareevent.splitting(variates.exponential(1.0, rng), variates.exponential(0.6, rng), 1, 12, effort=200,
+                            repetitions=10, cycles=5000, rng=rng)
+    assert abs(e.probability - exact) <= max(3 * e.half_width, 0.2 * exact)
+    assert e.method == "splitting"
+
+
+def test_overload_is_not_a_rare_event():
+    with pytest.raises(ValueError):
+        rareevent.importance_sampling(1.0, 2.0, 2, 10)
+    with pytest.raises(ValueError):
+        rareevent.splitting(1.0, 1.5, 1, 10)
+
+
+def test_buffer_size_is_the_smallest_that_meets_the_target():
+    def exact(queue_size):
+        p = analytic.mmck(1.0, 1.6, 2, queue_size).blocking
+        return rareevent.LossEstimate(p, 0.0, 0.0, 0, "exact")
+
+    k = rareevent.buffer_size(exact, 1e-6)
+    assert exact(k).probability <= 1e-6 < exact(k - 1).probability
+    assert rareevent.buffer_size(exact, 1e-6, largest=8) is None
+
+    estimated = rareevent.buffer_size(functools.partial(rareevent.importance_sampling, 1.0, 1.6, 2, precision=0.1,
+                                                        rng=np.random.default_rng(3)), 1e-6)
+    assert k <= estimated <= k + 2
+
+
+def test_importance_sampling_stops_at_max_cycles():
+    # the likelihood ratios of a buffer this large underflow: no cycle ever weighs a loss, and precision is never met
+    e = rareevent.importance_sampling(1.0, 0.5, 1, 2000, cycles=10, precision=0.05, rng=np.random.default_rng(1),
+                                      max_cycles=30)
+    assert e.probability == 0 and e.relative_error == e.half_width == np.inf
+    e = rareevent.importance_sampling(1.0, 0.5, 1, 20, cycles=10, precision=1e-6, rng=np.random.default_rng(1),
+                                      max_cycles=30)
+    assert 1e-6 < e.relative_error < np.inf
@@ -0,0 +1,100 @@
+import random
+import numpy as np
+import pytest
+import simpy
+from queue_sim import autoscaling, fastsim, netsimutils, rates, variates
+
+
+def _arrival_times(rate, n, seed):
+    return np.cumsum(rates.inter_arrivals(rate, np.random.default_rng(seed)).sample(n))
+
+
+def test_piecewise_integral_and_inverse():
+    rate = rates.Piecewise([0, 10, 30], [2.0, 0.0, 0.5], period=40)
+    assert rate.mean == pytest.approx((20 + 5) / 40.0)
+    t = np.array([0.0, 5.0, 10.0, 25.0, 39.0, 45.0, 123.0])
+    np.testing.assert_allclose(rate.inverse(rate.cumulative(t)), np.where(t == 25.0, 10.0, t))
+    np.testing.assert_array_equal(rate([5, 15, 35, 45]), [2.0, 0.0, 0.5, 2.0])
+    with pytest.raises(ValueError):
+        rates.Piecewise([1, 2], [1.0, 1.0])
+
+
+@pytest.mark.parametrize("rate", [rates.Piecewise([0, 100, 250], [0.5, 3.0, 1.0], period=400),
+                                  rates.Diurnal(1.5, 0.8, period=400, peak=100)], ids=["inversion", "thinning"])
+def test_arrivals_follow_the_rate(rate):
+    t = _arrival_times(rate, 200000, 1)
+    periods = int(t[-1] // 400)
+    t = t[t < 400 * periods]
+    counts = np.bincount((t % 400 // 20).astype(int), minlength=20) / float(periods)
+    # integral of the rate over each bin of 20 time units, by the midpoint rule
+    expected = rate(np.arange(0, 400, 0.1) + 0.05).reshape(20, 200).sum(axis=1) * 0.1
+    # Poisson counts over many periods: within a few standard deviations of the integral of the rate
+    assert np.all(np.abs(counts - expected) <= 4 * np.sqrt(expected / periods) + 1e-9)
+
+
+def test_fit_recovers_a_periodic_rate():
+    rate = rates.Piecewise([0, 100, 250], [0.5, 3.0, 1.0], period=400)
+    fitted = rates.fit(np.concatenate(([0.0], _arrival_times(rate, 100000, 2))), 50, period=400)
+    np.testing.assert_allclose(fitted(np.arange(25, 400, 50)), rate(np.arange(25, 400, 50)), rtol=0.05)
+
+
+def test_nhpp_arrival_on_simpy_draws_the_same_times():
+    rate = rates.Diurnal(1.0, 0.5, period=100)
+    env = simpy.Environment()
+    server_farm = netsimutils.Service(env, 50, 0.1, 1000)
+    packet_arrival = netsimutils.NHPPArrival(env, rate, rng=np.random.default_rng(3))
+    env.process(packet_arrival.arrival_process(server_farm))
+    env.run(1000)
+    # the pool draws a whole block at a time: thinning draws as many candidates as a block needs
+    expected = rates.inter_arrivals(rate, np.random.default_rng(3)).sample(variates.BLOCK)
+    n = len(packet_arrival.ia_times)
+    assert n == pytest.approx(rate.mean * 1000, rel=0.1)
+    np.testing.assert_allclose(list(packet_arrival.ia_times), expected[:n], rtol=1e-6)
+
+
+def test_fixed_pool_is_the_heap_service():
+    results = []
+    for station in (fastsim.HeapService, autoscaling.HeapPool):
+        kernel = fastsim.EventKernel()
+        rand = random.Random(5)
+        server_farm = station(kernel, 2, 1.5, 8, rand=rand)
+        fastsim.HeapArrival(kernel, 1.0, rand=rand).start(server_farm)
+        kernel.run(3000)
+        results.append((list(server_farm.re_times), server_farm.lost))
+    assert results[0] == results[1]
+
+
+@pytest.mark.parametrize("engine", ["fast", "simpy"])
+def test_autoscaler_follows_a_schedule(engine):
+    env = fastsim.EventKernel() if engine == "fast" else simpy.Environment()
+    rand = random.Random(6)
+    if engine == "fast":
+        pool = autoscaling.HeapPool(env, 1, 1.0, 50, rand=rand)
+        fastsim.HeapArrival(env, 0.5, rand=rand).start(pool)
+    else:
+        pool = netsimutils.ScalableService(env, 1, 1.0, 50, rand=rand)
+        env.process(netsimutils.PacketArrival(env, 0.5, rand=rand).arrival_process(pool))
+    policy = autoscaling.Schedule([0, 500, 1500], [1, 4, 2], period=2000)
+    scaler = autoscaling.Autoscaler(env, pool, policy, every=10, boot=5)
+    scaler.start()
+    env.run(1990)
+    assert list(scaler.counts) == [1, 4, 2]
+    assert pool.n_servers == 2
+    # one server for 515 time units, four for 1000, two for the last 475
+    assert pool.capacity.mean() == pytest.approx((515 + 4 * 1000 + 2 * 475) / 1990.0)
+    assert pool.arrived - pool.lost - pool.qsize == len(pool.re_times)
+
+
+def test_queue_length_policy_scales_up_and_down():
+    kernel = fastsim.EventKernel()
+    rand = random.Random(7)
+    pool = autoscaling.HeapPool(kernel, 1, 4.0, 200, rand=rand)
+    fastsim.HeapArrival(kernel, 1.0, variates=rates.inter_arrivals(
+        rates.Piecewise([0, 1000], [1.0, 0.05]), np.random.default_rng(7))).start(pool)
+    scaler = autoscaling.Autoscaler(kernel, pool, autoscaling.QueueLength(2.0, 0.5), every=20, max_servers=8)
+    scaler.start()
+    kernel.run(1000)
+    assert pool.n_servers >= 4
+    kernel.run(3000)
+    assert pool.n_servers == 1
+    assert max(scaler.counts) <= 8
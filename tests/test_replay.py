@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+import simpy
+from queue_sim import netsimutils, replay
+
+
+def _trace(n=500, seed=6):
+    rng = np.random.default_rng(seed)
+    return 10.0 + np.cumsum(rng.exponential(1.0, n)), rng.exponential(0.8, n)
+
+
+def test_csv_chunks_give_the_inter_arrivals_across_chunks(tmp_path):
+    arrival, demand = _trace()
+    path = str(tmp_path / "requests.csv")
+    with open(path, "w") as f:
+        f.write("time,demand\n")
+        f.writelines("%r,%r\n" % row for row in zip(arrival.tolist(), demand.tolist()))
+    pairs = list(replay.packets(replay.csv_chunks(path, chunk=64, skiprows=1), time=0, demand=1))
+    ia, d = np.array(pairs).T
+    assert ia[0] == 0.0
+    np.testing.assert_allclose(np.cumsum(ia), arrival - arrival[0])
+    np.testing.assert_array_equal(d, demand)
+
+
+def test_structured_binary_and_npy_files(tmp_path):
+    arrival, demand = _trace()
+    records = np.zeros(len(arrival), dtype=[("t", "<f8"), ("s", "<f4")])
+    records["t"], records["s"] = arrival, demand
+    records.tofile(str(tmp_path / "r.bin"))
+    np.save(str(tmp_path / "r.npy"), records)
+    from_bin = list(replay.packets(replay.binary_chunks(str(tmp_path / "r.bin"), records.dtype, 100), "t", "s"))
+    from_npy = list(replay.packets(replay.npy_chunks(str(tmp_path / "r.npy"), 100), "t", "s"))
+    assert from_bin == from_npy
+    assert len(from_bin) == len(arrival)
+    gaps = list(replay.packets(replay.array_chunks(np.diff(arrival), 7), timestamps=False))
+    assert [g for g, _ in gaps] == np.diff(arrival).tolist()
+
+
+def test_unsorted_timestamps_are_rejected():
+    with pytest.raises(ValueError):
+        list(replay.packets(replay.array_chunks(np.array([1.0, 3.0, 2.0]))))
+
+
+def test_replayed_trace_matches_the_lindley_recursion():
+    arrival, demand = _trace()
+    env = simpy.Environment()
+    server_farm = netsimutils.Service(env, 1, 0.8, 10 ** 6)
+    packets = replay.packets(replay.array_chunks(np.stack([arrival, demand], axis=1), 50), time=0, demand=1)
+    env.process(netsimutils.TraceArrival(env, packets).arrival_process(server_farm))
+    env.run()
+    assert server_farm.arrived == len(arrival)
+    wait, expected = 0.0, []
+    for k in range(len(arrival)):
+        if k:
+            wait = max(0.0, wait + demand[k - 1] - (arrival[k] - arrival[k - 1]))
+        expected.append(wait + demand[k])
+    np.testing.assert_allclose(list(server_farm.re_times), expected, rtol=1e-9)
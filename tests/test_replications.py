@@ -0,0 +1,24 @@
+import pytest
+from queue_sim import analytic, replications
+
+PARAMS = {"INTER_ARRIVAL": 1.0, "SERVICE_TIME": 0.8, "NUM_MACHINES": 1, "QUEUE_SIZE": 10, "SIM_TIME": 20000}
+
+
+@pytest.mark.parametrize("df, t", [(1, 12.706204736), (2, 4.302652730), (5, 2.570581836), (10, 2.228138852),
+                                   (30, 2.042272456), (100, 1.983971519)])
+def test_t_quantile_matches_the_tables(df, t):
+    assert replications.t_quantile(0.975, df) == pytest.approx(t, abs=1e-8)
+    assert replications.t_quantile(0.025, df) == pytest.approx(-t, abs=1e-8)
+
+
+def test_outcome_does_not_depend_on_the_workers():
+    one = replications.replicate("n_services", PARAMS, 4, 11, workers=1)
+    two = replications.replicate("n_services", PARAMS, 4, 11, workers=2)
+    assert [s[:2] for s in one.samples] == [s[:2] for s in two.samples]
+
+
+def test_confidence_interval_covers_the_closed_form():
+    r = replications.replicate("n_services", PARAMS, 8, 5)
+    exact = analytic.n_services(PARAMS)
+    assert abs(r.response_time.mean - exact.response_time) <= r.response_time.half_width
+    assert abs(r.loss_rate.mean - exact.blocking) <= r.loss_rate.half_width
@@ -0,0 +1,60 @@
+import random
+import numpy as np
+import pytest
+from queue_sim import routing
+
+
+class Server(object):
+    def __init__(self, qsize_limit, s_time=1.0):
+        self.qsize = 0
+        self.qsize_limit = qsize_limit
+        self.s_time = s_time
+        self.listener = None
+
+    def resize(self, qsize):
+        self.qsize = qsize
+        if self.listener is not None:
+            self.listener()
+
+
+def test_alias_table_samples_by_weight():
+    weights = [5.0, 1.0, 0.5, 3.5]
+    table = routing.AliasTable(weights)
+    rand = random.Random(1)
+    counts = np.bincount([table.sample(rand.random()) for _ in range(200000)], minlength=4)
+    np.testing.assert_allclose(counts / counts.sum(), np.array(weights) / sum(weights), atol=0.005)
+
+
+def test_weighted_routing_avoids_full_queues():
+    servers = [Server(2) for _ in range(3)]
+    router = routing.Weighted([10, 1, 1], uniform=random.Random(2).random)
+    router.attach(servers)
+    servers[0].resize(2)
+    assert all(router.pick() != 0 for _ in range(1000))
+    servers[0].resize(1)
+    assert any(router.pick() == 0 for _ in range(100))
+
+
+@pytest.mark.parametrize("policy", ["jsq", "least_loaded"])
+def test_state_aware_routers_pick_the_shortest_queue(policy):
+    rand = random.Random(3)
+    servers = [Server(20) for _ in range(6)]
+    router = routing.POLICIES[policy](uniform=rand.random)
+    router.attach(servers)
+    for _ in range(2000):
+        servers[rand.randrange(6)].resize(rand.randrange(20))
+        i = router.pick()
+        assert servers[i].qsize == min(s.qsize for s in servers)
+
+
+def test_jsq_buckets_grow_with_the_longest_queue():
+    servers = [Server(float("inf")) for _ in range(3)]
+    router = routing.JoinShortestQueue(uniform=random.Random(4).random)
+    router.attach(servers)
+    assert len(router.buckets) == 1
+    servers[0].resize(40)
+    servers[1].resize(7)
+    assert len(router.buckets) == 41
+    assert router.pick() == 2
+    servers[2].resize(100)
+    assert router.pick() == 1
@@ -0,0 +1,54 @@
+import math
+import random
+import numpy as np
+from queue_sim import analytic, fastsim, runcontrol
+
+
+def _mm1k(queue_size, seed=2):
+    kernel = fastsim.EventKernel()
+    server_farm = fastsim.HeapService(kernel, 1, 0.8, queue_size, rand=random.Random(seed))
+    fastsim.HeapArrival(kernel, 1.0, rand=random.Random(seed + 1)).start(server_farm)
+    return kernel, server_farm
+
+
+def test_mser_finds_the_transient():
+    rng = np.random.default_rng(4)
+    transient = np.linspace(40.0, 1.0, 1000) + rng.normal(0, 0.5, 1000)
+    samples = np.concatenate([transient, 1.0 + rng.normal(0, 0.5, 9000)])
+    d = runcontrol.mser(samples)
+    assert d % runcontrol.MSER_BATCH == 0
+    assert 800 <= d <= 1500
+    assert runcontrol.mser(1.0 + rng.normal(0, 0.5, 10000)) < 500
+    assert runcontrol.mser([1.0, 2.0]) == 0
+
+
+def test_run_stops_at_the_precision_and_covers_the_closed_form():
+    kernel, server_farm = _mm1k(10)
+    control = runcontrol.run(kernel, [server_farm], 10 ** 6, precision=0.02)
+    assert control.converged and control.time < 10 ** 6
+    assert control.precision("response_time") <= 0.02
+    served = server_farm.arrived - server_farm.lost - server_farm.qsize
+    assert len(server_farm.re_times) == served - control.warmup[0]
+    exact = analytic.mm1k(1.0, 0.8, 10)
+    assert abs(control.response_time.mean - exact.response_time) <= 3 * control.response_time.half_width
+    assert runcontrol.losses(server_farm).sum() == server_farm.lost
+
+
+def test_target_with_no_losses_runs_to_the_end():
+    kernel, server_farm = _mm1k(10 ** 6)
+    control = runcontrol.run(kernel, [server_farm], 20000, precision=0.5, targets=("response_time", "loss_rate"))
+    assert server_farm.lost == 0
+    assert not control.converged and control.time == 20000
+    assert math.isinf(control.precision("loss_rate"))
+
+
+def test_loss_series_starts_where_the_response_times_do():
+    # arrivals: admitted (0) and lost (1); response times are cut after the first d admitted packets
+    ind = np.array([0, 1, 0, 0, 1, 1, 0, 1, 0, 0])
+    admitted = np.flatnonzero(ind == 0)
+    for d in range(len(admitted) + 1):
+        kept = runcontrol.after_warmup(ind, d)
+        assert np.count_nonzero(kept == 0) == len(admitted) - d
+        # every arrival after the d-th admitted one is kept, the losses that follow it included
+        assert len(kept) == (len(ind) - admitted[d - 1] - 1 if d else len(ind))
+    np.testing.assert_array_equal(runcontrol.after_warmup(ind, 3), [1, 1, 0, 1, 0, 0])
@@ -0,0 +1,77 @@
+import random
+import numpy as np
+import pytest
+import simpy
+from queue_sim import fastsim, scheduling, variates
+
+SIM_TIME = 60000
+BIG = 10 ** 6
+
+
+def _run(discipline, classes, inter_arrivals, seed=1, queue_size=BIG, until=SIM_TIME):
+    kernel = fastsim.EventKernel()
+    server_farm = scheduling.service(kernel, 1, queue_size, classes, discipline)
+    for k, ia in enumerate(inter_arrivals):
+        fastsim.HeapArrival(kernel, ia, rand=random.Random(seed + k)).start(server_farm.port(k))
+    kernel.run(until)
+    return server_farm
+
+
+@pytest.mark.parametrize("discipline", ["fcfs", "ps", "priority", "preemptive"])
+def test_mm1_mean_response_does_not_depend_on_the_discipline(discipline):
+    # exponential demands that the discipline does not look at: the number in system is the one of M/M/1
+    classes = [scheduling.TrafficClass(c, 1.0, rand=random.Random(7 + k)) for k, c in enumerate("ab")]
+    server_farm = _run(discipline, classes, [1 / 0.3, 1 / 0.4])
+    assert np.mean(server_farm.re_times) == pytest.approx(1 / (1 - 0.7), rel=0.06)
+
+
+def test_sjf_beats_fcfs():
+    fcfs = _run("fcfs", [scheduling.TrafficClass("a", 1.0, rand=random.Random(2))], [1 / 0.8])
+    sjf = _run("sjf", [scheduling.TrafficClass("a", 1.0, rand=random.Random(2))], [1 / 0.8])
+    assert np.mean(sjf.re_times) < 0.7 * np.mean(fcfs.re_times)
+
+
+def test_processor_sharing_is_insensitive():
+    # M/G/1-PS: a job of size x stays x / (1 - rho), deterministic demands included
+    classes = [scheduling.TrafficClass("a", 1.0, variates=variates.deterministic(1.0))]
+    server_farm = _run("ps", classes, [1 / 0.6])
+    assert np.mean(server_farm.re_times) == pytest.approx(1 / (1 - 0.6), rel=0.05)
+
+
+def test_priority_classes_match_cobham():
+    lam, s = [0.3, 0.4], [1.0, 1.0]
+    rho = [l * x for l, x in zip(lam, s)]
+    classes = [scheduling.TrafficClass(c, x, rand=random.Random(3 + k)) for k, (c, x) in enumerate(zip("ab", s))]
+    server_farm = _run("priority", classes, [1 / l for l in lam])
+    residual = sum(l * 2 * x * x for l, x in zip(lam, s)) / 2
+    waits = [residual / (1 - rho[0]), residual / ((1 - rho[0]) * (1 - rho[0] - rho[1]))]
+    for c, w, x in zip(classes, waits, s):
+        assert np.mean(c.re_times) == pytest.approx(w + x, rel=0.06)
+
+    classes = [scheduling.TrafficClass(c, x, rand=random.Random(3 + k)) for k, (c, x) in enumerate(zip("ab", s))]
+    _run("preemptive", classes, [1 / l for l in lam])
+    # preemptive-resume: the first class does not see the second at all
+    assert np.mean(classes[0].re_times) == pytest.approx(s[0] / (1 - rho[0]), rel=0.05)
+
+
+def test_wfq_shares_the_server_by_weight():
+    classes = [scheduling.TrafficClass("a", 1.0, weight=3.0, queue_size=20, rand=random.Random(5)),
+               scheduling.TrafficClass("b", 1.0, weight=1.0, queue_size=20, rand=random.Random(6))]
+    _run("wfq", classes, [1.0, 1.0], until=50000)
+    served = [len(c.re_times) for c in classes]
+    assert served[0] / float(served[1]) == pytest.approx(3.0, rel=0.08)
+
+
+def test_counts_and_unknown_discipline():
+    classes = [scheduling.TrafficClass("a", 1.0, rand=random.Random(1))]
+    server_farm = _run("fcfs", classes, [0.8], queue_size=5, until=5000)
+    assert classes[0].arrived == server_farm.arrived and classes[0].lost == server_farm.lost > 0
+    with pytest.raises(ValueError):
+        scheduling.service(fastsim.EventKernel(), 1, 5, classes, "lifo")
+
+
+@pytest.mark.parametrize("discipline", scheduling.DISCIPLINES)
+def test_simpy_environment_is_rejected(discipline):
+    classes = [scheduling.TrafficClass("a", 1.0)]
+    with pytest.raises(TypeError):
+        scheduling.service(simpy.Environment(), 1, 5, classes, discipline)
@@ -0,0 +1,68 @@
+import random
+import threading
+import pytest
+from queue_sim import MM1, simulator
+
+
+def test_config_holds_the_constants_of_one_run():
+    c = simulator.config("n_services", SIM_TIME=1234)
+    assert c.SIM_TIME == 1234 and c.INTER_ARRIVAL == MM1.INTER_ARRIVAL
+    assert simulator.config("n_services").SIM_TIME == MM1.SIM_TIME
+    d = c.replace(QUEUE_SIZE=3)
+    assert (c.QUEUE_SIZE, d.QUEUE_SIZE) == (MM1.QUEUE_SIZE, 3)
+    assert d == c.replace(QUEUE_SIZE=3) and d != c
+    with pytest.raises(KeyError):
+        simulator.Config(SIM_TYME=1)
+    with pytest.raises(KeyError):
+        simulator.run("no_such_scenario")
+
+
+@pytest.mark.parametrize("engine", ["simpy", "fast"])
+@pytest.mark.parametrize("scenario", simulator.scenarios())
+def test_every_scenario_runs_on_both_engines(scenario, engine):
+    state = random.getstate()
+    result = simulator.run(scenario, ENGINE=engine, SIM_TIME=2000, RANDOM_SEED=3)
+    assert random.getstate() == state
+    assert result.total.packets == sum(s.arrived for s in result.servers) > 0
+    assert result.total.served + result.total.lost <= result.total.packets
+    assert result.records() == simulator.run(scenario, ENGINE=engine, SIM_TIME=2000, RANDOM_SEED=3).records()
+
+
+def test_runs_in_threads_do_not_disturb_each_other():
+    c = simulator.config("mixed_queues", ENGINE="fast", SIM_TIME=3000)
+    expected = [simulator.run("mixed_queues", c.replace(RANDOM_SEED=seed)).records() for seed in range(4)]
+    got = [None] * 4
+
+    def work(seed):
+        got[seed] = simulator.run("mixed_queues", c.replace(RANDOM_SEED=seed)).records()
+
+    threads = [threading.Thread(target=work, args=(seed,)) for seed in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert got == expected
+    assert expected[0] != expected[1]
+
+
+@pytest.mark.parametrize("scenario", simulator.scenarios())
+def test_run_functions_seed_their_own_random(scenario):
+    # called directly with no RANDOM, a scenario draws from random.Random(RANDOM_SEED), not from the random module
+    run = simulator.module(scenario).SCENARIOS[scenario]
+    c = simulator.config(scenario, ENGINE="fast", SIM_TIME=2000, RANDOM_SEED=5)
+    state = random.getstate()
+    first = simulator.Result(scenario, c, *run(c)).records()
+    assert random.getstate() == state
+    assert simulator.Result(scenario, c, *run(c)).records() == first
+    assert first == simulator.run(scenario, c).records()
+
+
+def test_a_config_run_again_gives_the_same_result():
+    first = simulator.run("n_services", ENGINE="fast", SIM_TIME=2000, RANDOM_SEED=4)
+    assert first.config.RANDOM is None
+    assert simulator.run("n_services", first.config).records() == first.records()
+    # a new seed drops the stream of the old one
+    c = simulator.config("n_services", ENGINE="fast", SIM_TIME=2000, RANDOM=random.Random(9))
+    assert c.replace(RANDOM_SEED=4).RANDOM is None and c.replace(QUEUE_SIZE=3).RANDOM is c.RANDOM
+    simulator.run("n_services", c)
+    assert simulator.run("n_services", c.replace(RANDOM_SEED=4)).records() == first.records()
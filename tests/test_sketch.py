@@ -0,0 +1,56 @@
+import math
+import random
+import numpy as np
+import pytest
+from queue_sim import collectors, fastsim
+
+
+def _exact(x, p):
+    return np.sort(x)[int(p * (len(x) - 1))]
+
+
+@pytest.mark.parametrize("p", [0.01, 0.5, 0.9, 0.95, 0.99, 0.999])
+def test_quantiles_within_the_relative_accuracy(p):
+    x = np.random.default_rng(1).lognormal(0.0, 2.0, 100000)
+    s = collectors.sketch(x)
+    assert abs(s.quantile(p) - _exact(x, p)) <= collectors.SKETCH_ACCURACY * _exact(x, p)
+
+
+def test_merge_is_exact():
+    rng = np.random.default_rng(2)
+    parts = [rng.exponential(1.0, 5000), np.zeros(300), rng.pareto(2.5, 7000)]
+    one = collectors.sketch(np.concatenate(parts))
+    m = collectors.merged(collectors.sketch(x) for x in parts)
+    assert m.buckets == one.buckets and m.zeros == one.zeros == 300 and m.count == one.count
+    assert (m.min, m.max) == (one.min, one.max) and m.mean == pytest.approx(one.mean)
+
+    looped = collectors.Sketch()
+    for v in parts[0].tolist():
+        looped.append(v)
+    assert looped.buckets == collectors.sketch(parts[0]).buckets
+    with pytest.raises(ValueError):
+        looped.merge(collectors.Sketch(0.05))
+    assert math.isnan(collectors.merged([]).quantile(0.5))
+
+
+def test_online_stats_answer_any_quantile():
+    x = np.random.default_rng(3).exponential(1.0, 20000)
+    stats = collectors.OnlineStats(quantiles=(0.5,))
+    for v in x.tolist():
+        stats.append(v)
+    assert stats.quantile(0.5) == pytest.approx(math.log(2), rel=0.05)
+    assert stats.quantile(0.99) == pytest.approx(_exact(x, 0.99), rel=collectors.SKETCH_ACCURACY)
+    fields = collectors.percentile_fields(stats.sketch, "response_time")
+    assert sorted(fields) == ["p50_response_time", "p95_response_time", "p999_response_time", "p99_response_time"]
+
+
+def test_mm1_response_time_percentiles():
+    # the response time of M/M/1 FCFS is exponential with rate mu - lambda
+    kernel = fastsim.EventKernel()
+    rand = random.Random(4)
+    server_farm = fastsim.HeapService(kernel, 1, 1.0, 10 ** 6, rand=rand)
+    fastsim.HeapArrival(kernel, 1 / 0.5, rand=rand).start(server_farm)
+    kernel.run(200000)
+    s = collectors.sketch(server_farm.re_times)
+    for p in (0.5, 0.95, 0.99):
+        assert s.quantile(p) == pytest.approx(-math.log(1 - p) / 0.5, rel=0.06)
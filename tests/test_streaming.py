@@ -0,0 +1,37 @@
+import random
+import numpy as np
+import pytest
+import simpy
+from queue_sim import analytic, collectors, netsimutils
+
+
+def run(streaming, until=50000):
+    env = simpy.Environment()
+    rand = random.Random(8)
+    server_farm = netsimutils.Service(env, 1, 0.8, 10, until, streaming=streaming, rand=rand)
+    env.process(netsimutils.PacketArrival(env, 1.0, streaming=streaming, rand=rand).arrival_process(server_farm))
+    env.run(until)
+    return server_farm
+
+
+def test_streaming_statistics_match_the_full_history():
+    full, online = run(False), run(True)
+    re_times = np.asarray(full.re_times)
+    assert (online.arrived, online.lost) == (full.arrived, full.lost)
+    assert online.re_times.n == len(re_times)
+    assert online.re_times.mean == pytest.approx(re_times.mean(), rel=1e-9)
+    assert online.re_times.variance == pytest.approx(re_times.var(ddof=1), rel=1e-6)
+    assert online.re_times.max == re_times.max()
+    assert online.re_times.quantile(0.99) == pytest.approx(np.quantile(re_times, 0.99), rel=0.02)
+    # the time-average queue length is L of the closed form
+    assert online.dynamic_QS.mean() == pytest.approx(analytic.mm1k(1.0, 0.8, 10).mean_in_system, rel=0.05)
+    # the time series keep their last bins only
+    assert len(online.arrived_s) == collectors.STREAMING_BINS < len(full.arrived_s)
+
+
+def test_p_square_tracks_a_quantile():
+    samples = np.random.default_rng(2).exponential(1.0, 50000)
+    q = collectors.P2Quantile(0.9)
+    for x in samples:
+        q.append(x)
+    assert q.value() == pytest.approx(np.quantile(samples, 0.9), rel=0.02)
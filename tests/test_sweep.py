@@ -0,0 +1,67 @@
+import json
+import math
+import os
+import pytest
+from queue_sim import sweep
+
+BASE = {"INTER_ARRIVAL": 1.0, "SERVICE_TIME": 0.8, "NUM_MACHINES": 1, "QUEUE_SIZE": 10, "SIM_TIME": 2000}
+
+
+class NoPool(object):
+    def __init__(self, *args, **kwargs):
+        raise AssertionError("a cached sweep must not simulate")
+
+
+def test_grid_covers_every_combination():
+    points = sweep.grid(BASE, INTER_ARRIVAL=[1, 2, 3], QUEUE_SIZE=[5, 10])
+    assert len(points) == 6
+    assert set((p["INTER_ARRIVAL"], p["QUEUE_SIZE"]) for p in points) == set((a, q) for a in (1, 2, 3) for q in (5, 10))
+    assert all(p["SERVICE_TIME"] == 0.8 for p in points)
+
+
+def test_second_sweep_is_read_from_the_cache(tmp_path, monkeypatch):
+    points = sweep.grid(BASE, INTER_ARRIVAL=[1.0, 2.0])
+    first = sweep.sweep("n_services", points, n=2, seed=4, workers=1, cache_dir=str(tmp_path))
+    assert len(os.listdir(str(tmp_path))) == 2
+    monkeypatch.setattr(sweep.concurrent.futures, "ProcessPoolExecutor", NoPool)
+    assert sweep.sweep("n_services", points, n=2, seed=4, workers=1, cache_dir=str(tmp_path)) == first
+    with pytest.raises(AssertionError):
+        sweep.sweep("n_services", points, n=2, seed=5, workers=1, cache_dir=str(tmp_path))
+
+
+def test_corrupt_entry_is_simulated_again(tmp_path):
+    points = [dict(BASE)]
+    first = sweep.sweep("n_services", points, n=2, seed=4, workers=1, cache_dir=str(tmp_path))
+    (entry,) = os.listdir(str(tmp_path))
+    with open(os.path.join(str(tmp_path), entry), "w") as f:
+        f.write('{"response_time": 1.')
+    assert sweep.sweep("n_services", points, n=2, seed=4, workers=1, cache_dir=str(tmp_path)) == first
+    assert os.listdir(str(tmp_path)) == [entry]
+
+
+def test_key_depends_on_the_code_version():
+    assert sweep.point_key("n_services", BASE, 0, 2, "a") != sweep.point_key("n_services", BASE, 0, 2, "b")
+    assert sweep.point_key("n_services", BASE, 0, 2, "a") == sweep.point_key("n_services", dict(BASE), 0, 2, "a")
+
+
+def _strict(text):
+    raise ValueError("non-standard JSON constant %s" % text)
+
+
+def test_non_finite_figures_are_standard_json(tmp_path):
+    path = str(tmp_path / "r.json")
+    sweep._save(path, {"QUEUE_SIZE": 10, "response_time_hw": math.inf, "loss_rate_hw": math.nan, "x": -math.inf})
+    with open(path) as f:
+        json.load(f, parse_constant=_strict)
+    record = sweep._load(path)
+    assert record["QUEUE_SIZE"] == 10 and record["response_time_hw"] == math.inf and record["x"] == -math.inf
+    assert math.isnan(record["loss_rate_hw"])
+
+
+def test_single_replication_is_cached_as_standard_json(tmp_path):
+    (record,) = sweep.sweep("n_services", [dict(BASE)], n=1, seed=4, workers=1, cache_dir=str(tmp_path))
+    (entry,) = os.listdir(str(tmp_path))
+    with open(os.path.join(str(tmp_path), entry)) as f:
+        cached = json.load(f, parse_constant=_strict)
+    assert set(cached) == set(record)
+    assert sweep._load(os.path.join(str(tmp_path), entry))["response_time"] == record["response_time"]
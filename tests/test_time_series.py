@@ -0,0 +1,53 @@
+import numpy as np
+from queue_sim import collectors, fastsim
+
+
+def test_bins_count_events_past_the_horizon_given():
+    times = np.sort(np.random.default_rng(1).uniform(0, 1000, 5000))
+    series = collectors.TimeSeries(5, horizon=100)
+    for t in times:
+        series.add(t)
+    expected = np.bincount((times // 5).astype(int))
+    np.testing.assert_array_equal(series.counts(), expected)
+
+    batched = collectors.TimeSeries(5)
+    batched.add_many(times)
+    np.testing.assert_array_equal(batched.counts(), expected)
+
+
+def test_ring_keeps_the_last_bins():
+    times = np.sort(np.random.default_rng(2).uniform(0, 1000, 5000))
+    full = collectors.TimeSeries(1)
+    ring = collectors.TimeSeries(1, capacity=64)
+    for t in times:
+        full.add(t)
+        ring.add(t)
+    assert len(ring) == 64
+    np.testing.assert_array_equal(ring.counts(), full.counts()[-64:])
+
+
+def test_downsample_keeps_the_total():
+    series = collectors.TimeSeries(1)
+    series.add_many(np.sort(np.random.default_rng(3).uniform(0, 10000, 20000)))
+    start, merged = series.downsample(300)
+    assert len(merged) <= 300
+    assert merged.sum() == 20000
+    assert start[0] == 0
+
+
+def test_server_series_add_up_to_its_counters():
+    env = fastsim.EventKernel()
+    # SIM_TIME only sizes the series: running twice as long must not lose counts
+    server_farm = fastsim.HeapService(env, 1, 1.2, 5, 1000)
+    fastsim.HeapArrival(env, 1.0).start(server_farm)
+    env.run(2000)
+    assert server_farm.arrived_s.counts().sum() == server_farm.arrived
+    assert server_farm.lost_s.counts().sum() == server_farm.lost > 0
+
+
+def test_add_many_takes_unsorted_times():
+    # pooled arrivals of several sources are not sorted
+    times = np.random.default_rng(4).uniform(0, 500, 3000)
+    series = collectors.TimeSeries(5, horizon=10)
+    series.add_many(times)
+    np.testing.assert_array_equal(series.counts(), np.bincount((times // 5).astype(int)))
@@ -0,0 +1,78 @@
+import random
+import numpy as np
+import pytest
+from queue_sim import fastsim, topology
+
+
+def test_network_of_one_station_is_the_heap_engine():
+    net = topology.Network({"sources": {"in": {"inter_arrival": 1.0, "to": "s"}},
+                            "stations": {"s": {"servers": 2, "service_time": 2.5, "queue_size": 6}}},
+                           rand=random.Random(12))
+    net.run(5000)
+
+    kernel = fastsim.EventKernel()
+    rand = random.Random(12)
+    server_farm = fastsim.HeapService(kernel, 2, 2.5, 6, rand=rand)
+    fastsim.HeapArrival(kernel, 1.0, rand=rand).start(server_farm)
+    kernel.run(5000)
+
+    station = net.stations["s"]
+    assert list(station.re_times) == list(server_farm.re_times)
+    assert station.lost == server_farm.lost > 0
+    assert list(net.exit.sojourn) == list(station.re_times)
+
+
+def test_mixed_queues_spec_is_the_mixing_services_layout():
+    spec = topology.mixed_queues(1.0, 2.0, 3, 10)
+    net = topology.Network(spec, rand=random.Random(4))
+    net.run(3000)
+
+    kernel = fastsim.EventKernel()
+    rand = random.Random(4)
+    servers = [fastsim.HeapService(kernel, 1, 2.0 / 3 if i == 0 else 2.0, 10, rand=rand) for i in range(4)]
+    for i, s in enumerate(servers):
+        fastsim.HeapArrival(kernel, 2.0 * (1 if i == 0 else 3), rand=rand).start(s)
+    kernel.run(3000)
+    assert [list(s.re_times) for s in net.servers()] == [list(s.re_times) for s in servers]
+    assert net.lost == sum(s.lost for s in servers)
+
+
+def test_tandem_with_feedback_matches_jackson():
+    # two M/M/1 in tandem, a packet leaving the second goes back to the first with probability 0.2
+    lam, p, s1, s2 = 0.4, 0.2, 1.0, 0.8
+    spec = {"sources": {"in": {"inter_arrival": 1.0 / lam, "to": "a"}},
+            "stations": {"a": {"service_time": s1, "queue_size": 10 ** 6, "to": "b"},
+                         "b": {"service_time": s2, "queue_size": 10 ** 6, "to": {"a": p, topology.EXIT: 1 - p}}}}
+    net = topology.Network(spec, rng=np.random.default_rng(3), rand=random.Random(3))
+    net.run(200000)
+    visit = lam / (1 - p)
+    expected = (1 / (1 / s1 - visit) + 1 / (1 / s2 - visit)) / (1 - p)
+    assert np.mean(net.exit.sojourn) == pytest.approx(expected, rel=0.05)
+    assert net.lost == 0
+
+
+def test_tiers_and_a_station_watched_twice():
+    spec = topology.tiers(0.5, [(3, 1.0, 20), (2, 0.6, 20)], feedback=0.1)
+    net = topology.Network(spec, rng=np.random.default_rng(1), rand=random.Random(1))
+    net.run(2000)
+    assert sorted(net.routers) == ["tier0", "tier1"] and len(net.stations) == 5
+    assert len(net.exit.sojourn) > 0
+    spec["routers"]["again"] = {"policy": "jsq", "to": ["tier0.0"]}
+    with pytest.raises(ValueError):
+        topology.Network(spec)
+
+
+def _branching_network(rand):
+    spec = topology.tiers(("erlang", 2, 0.5), [(3, ("lognormal", 1.0, 0.5), 20), (2, 0.6, 20)], feedback=0.2)
+    net = topology.Network(spec, rand=rand)
+    net.run(2000)
+    return list(net.exit.sojourn), net.lost
+
+
+def test_seeded_rand_makes_every_draw_reproducible():
+    assert _branching_network(random.Random(9)) == _branching_network(random.Random(9))
+    assert _branching_network(random.Random(9)) != _branching_network(random.Random(10))
+    random.seed(9)
+    first = _branching_network(None)
+    random.seed(9)
+    assert _branching_network(None) == first
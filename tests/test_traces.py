@@ -0,0 +1,58 @@
+import pickle
+import random
+import numpy as np
+from queue_sim import fastsim, traces
+
+
+def _farm(kernel):
+    rand = random.Random(8)
+    servers = [fastsim.HeapService(kernel, 1, 1.2, 5, rand=rand), fastsim.HeapService(kernel, 2, 1.5, 8, rand=rand)]
+    p = fastsim.HeapArrivalMod(kernel, 0.6, rand=rand)
+    p.start(servers, [1, 1])
+    return servers
+
+
+def test_trace_holds_every_packet(tmp_path):
+    kernel = fastsim.EventKernel()
+    servers = _farm(kernel)
+    with traces.TraceSink(str(tmp_path / "run.trace"), block=100) as sink:
+        sink.attach(servers)
+        kernel.run(2000)
+    t = traces.load(str(tmp_path / "run.trace"))
+    assert len(t["arrival"]) == sink.written == sum(s.arrived - s.qsize for s in servers)
+    for i, s in enumerate(servers):
+        mine = t["queue"] == i
+        assert (~t["admitted"][mine].astype(bool)).sum() == s.lost
+        done = mine & (t["admitted"] == 1)
+        np.testing.assert_allclose(t["departure"][done] - t["arrival"][done], list(s.re_times))
+        assert np.all(t["start"][done] >= t["arrival"][done])
+        assert np.all(np.isnan(t["start"][mine & (t["admitted"] == 0)]))
+    assert np.all(np.diff(np.where(t["admitted"] == 1, t["departure"], t["arrival"])) >= 0)
+
+
+def test_load_sees_the_flushed_blocks(tmp_path):
+    path = str(tmp_path / "live.trace")
+    sink = traces.TraceSink(path, block=10)
+    for k in range(25):
+        sink.record(0, float(k), float(k), k + 1.0)
+    assert len(traces.load(path)["arrival"]) == 20
+    sink.close()
+    np.testing.assert_array_equal(traces.load(path)["arrival"], np.arange(25.0))
+
+
+def test_unpickled_sink_cuts_the_files_back(tmp_path):
+    path = str(tmp_path / "ckpt.trace")
+    sink = traces.TraceSink(path, block=10)
+    for k in range(15):
+        sink.record(0, float(k), float(k), k + 1.0)
+    state = pickle.dumps(sink)
+    for k in range(15, 40):
+        sink.record(0, float(k), float(k), k + 1.0)
+    sink.close()
+    resumed = pickle.loads(state)
+    assert len(traces.load(path)["arrival"]) == 15
+    resumed.record(1, 100.0, traces.NAN, traces.NAN)
+    resumed.close()
+    t = traces.load(path)
+    np.testing.assert_array_equal(t["arrival"], list(range(15)) + [100.0])
+    assert list(t["admitted"][-2:]) == [1, 0]
@@ -0,0 +1,39 @@
+import pickle
+import numpy as np
+import pytest
+from queue_sim import analytic, fastsim, variates
+
+
+def test_pool_serves_the_generator_stream_in_blocks():
+    pool = variates.exponential(2.0, np.random.default_rng(4))
+    drawn = [pool() for _ in range(3 * variates.BLOCK + 5)]
+    expected = np.random.default_rng(4).exponential(2.0, 4 * variates.BLOCK)[:len(drawn)]
+    assert drawn == expected.tolist()
+
+
+@pytest.mark.parametrize("name, args", [("exponential", (2.0,)), ("uniform", (1.0, 3.0)), ("erlang", (3, 2.0)),
+                                        ("hyperexponential", ([0.9, 0.1], [1.0, 11.0])), ("lognormal", (2.0, 0.5)),
+                                        ("pareto", (3.0, 2.0)), ("deterministic", (2.0,))])
+def test_distributions_have_the_stated_mean(name, args):
+    pool = variates.make(name, *args, rng=np.random.default_rng(1))
+    assert pool.mean == pytest.approx(2.0)
+    assert np.mean(pool.sample(400000)) == pytest.approx(2.0, rel=0.02)
+
+
+def test_a_pickled_pool_resumes_where_it_was():
+    pool = variates.exponential(1.0, np.random.default_rng(9))
+    for _ in range(10):
+        pool()
+    copy = pickle.loads(pickle.dumps(pool))
+    assert [copy() for _ in range(variates.BLOCK)] == [pool() for _ in range(variates.BLOCK)]
+
+
+def test_pools_drive_the_heap_kernel():
+    rng = np.random.default_rng(6)
+    env = fastsim.EventKernel()
+    server_farm = fastsim.HeapService(env, 2, 1.8, 8, 100000, variates=variates.exponential(1.8, rng))
+    fastsim.HeapArrival(env, 1.0, variates.exponential(1.0, rng)).start(server_farm)
+    env.run(100000)
+    exact = analytic.mmck(1.0, 1.8, 2, 8)
+    assert server_farm.lost / server_farm.arrived == pytest.approx(exact.blocking, abs=0.01)
+    assert np.mean(server_farm.re_times) == pytest.approx(exact.response_time, rel=0.05)